@@ -0,0 +1,103 @@
+# Copyright (c) 2016-present, Facebook, Inc.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree. An additional grant
+# of patent rights can be found in the PATENTS file in the same directory.
+
+'''
+Micro-benchmark of the per-step round trip between the environment and a
+learner in another process, over the zmq transports (text and binary
+protocols) and the shared-memory one.
+
+Usage (from the src directory)::
+
+    python -m benchmarks.learner_transport [--steps N] [--port P]
+'''
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from optparse import OptionParser
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+
+from learners.base import RemoteLearner
+import learners.remote_protocol as remote_protocol
+from learners.shared_memory import SharedMemoryRemoteLearner, \
+    SharedMemoryEnvironmentConnection
+
+
+def zmq_learner(endpoint, version, steps):
+    import zmq
+    context = zmq.Context()
+    socket = context.socket(zmq.PAIR)
+    socket.connect(endpoint)
+    connection = remote_protocol.EnvironmentConnection(socket, version)
+    for _ in range(steps):
+        connection.receive()
+        connection.reply('1')
+    socket.close()
+
+
+def shm_learner(path, steps):
+    while not os.path.exists(path):
+        time.sleep(0.001)
+    connection = SharedMemoryEnvironmentConnection(path)
+    for _ in range(steps):
+        connection.receive()
+        connection.reply('1')
+    connection.close()
+
+
+def bench(name, create_learner, learner_target, learner_args, steps):
+    process = multiprocessing.Process(target=learner_target,
+                                      args=learner_args)
+    process.start()
+    learner = create_learner()
+    start = time.time()
+    for _ in range(steps):
+        learner.try_reward(0)
+        learner.next('0')
+    elapsed = time.time() - start
+    process.join()
+    print('{0:<24} {1:10.2f} us/step'.format(name, elapsed / steps * 1e6))
+    return learner, elapsed
+
+
+def main():
+    op = OptionParser("Usage: %prog [options]")
+    op.add_option('--steps', default=20000, type=int,
+                  help='Number of steps of each run.')
+    op.add_option('--port', default=5556, type=int,
+                  help='Port for the tcp runs.')
+    opt, args = op.parse_args()
+
+    endpoint = 'tcp://127.0.0.1:{0}'.format(opt.port)
+    times = {}
+    for name, version in (('zmq tcp (text)', remote_protocol.PROTOCOL_TEXT),
+                          ('zmq tcp (binary)',
+                           remote_protocol.PROTOCOL_BINARY)):
+        learner, times[name] = bench(
+            name, lambda: RemoteLearner(None, opt.port, '127.0.0.1'),
+            zmq_learner, (endpoint, version, opt.steps), opt.steps)
+        learner.socket.close(linger=0)
+    path = tempfile.mkdtemp()
+    try:
+        shm_path = os.path.join(path, 'learner.shm')
+        learner, times['shm'] = bench(
+            'shm', lambda: SharedMemoryRemoteLearner(None, address=shm_path),
+            shm_learner, (shm_path, opt.steps), opt.steps)
+        learner.close()
+    finally:
+        shutil.rmtree(path)
+    print('{0:<24} {1:10.2f}x'.format('shm speedup over text',
+                                      times['zmq tcp (text)'] / times['shm']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+# Copyright (c) 2016-present, Facebook, Inc.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree. An additional grant
+# of patent rights can be found in the PATENTS file in the same directory.
+
+'''
+Micro-benchmark of the StandardSerializer bit codec on long micro-task
+feedback strings. It compares the table-driven codec against the original
+per-byte implementation (kept here as a reference).
+
+Usage (from the src directory)::
+
+    python -m benchmarks.serializer [--length N] [--repeat R]
+'''
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from optparse import OptionParser
+import codecs
+import random
+import string
+import timeit
+
+from core.serializer import StandardSerializer
+
+
+def legacy_to_binary(message):
+    '''The original to_binary: one `bin` call per byte.'''
+    message = codecs.encode(message, 'utf-8')
+    data = []
+    for c in bytearray(message):
+        data.append(bin(c)[2:].zfill(8))
+    return ''.join(data)
+
+
+def legacy_to_text(data):
+    '''The original to_text: re-parses the bits for every skipped byte.'''
+    for skip in range(int(len(data) / 8)):
+        try:
+            message = bytearray()
+            sub_data = data[skip * 8:]
+            for i in range(int(len(sub_data) / 8)):
+                message.append(int(sub_data[i * 8:(i + 1) * 8], 2))
+            return codecs.decode(message, 'utf-8')
+        except UnicodeDecodeError:
+            pass
+    return None
+
+
+def feedback_string(length, seed=0):
+    '''Builds a micro-task like feedback string: words separated by
+    spaces, with the ';' feedback separator sprinkled in.'''
+    rng = random.Random(seed)
+    words = []
+    while sum(len(w) + 1 for w in words) < length:
+        words.append(''.join(rng.choice(string.ascii_letters)
+                             for _ in range(rng.randint(1, 8))))
+        if rng.random() < 0.2:
+            words[-1] += ';'
+    return ' '.join(words)[:length]
+
+
+def bench(name, f, arg, repeat):
+    t = min(timeit.repeat(lambda: f(arg), number=1, repeat=repeat))
+    print('{0:<34} {1:10.3f} ms'.format(name, t * 1000))
+    return t
+
+
+def main():
+    op = OptionParser("Usage: %prog [options]")
+    op.add_option('--length', default=10000, type=int,
+                  help='Length of the feedback string.')
+    op.add_option('--repeat', default=20, type=int,
+                  help='Number of timing repetitions (the best is kept).')
+    opt, args = op.parse_args()
+
+    slzr = StandardSerializer()
+    message = feedback_string(opt.length)
+    data = slzr.to_binary(message)
+    assert data == legacy_to_binary(message)
+    assert slzr.to_text(data) == legacy_to_text(data)
+    # a message preceded by one byte of garbage forces a skip
+    garbage = '11111111' + data
+    assert slzr.to_text(garbage) == legacy_to_text(garbage)
+
+    print('feedback string of {0} characters'.format(len(message)))
+    for name, new, old, arg in (
+            ('to_binary', slzr.to_binary, legacy_to_binary, message),
+            ('to_text', slzr.to_text, legacy_to_text, data),
+            ('to_text (garbage prefix)', slzr.to_text, legacy_to_text,
+             garbage)):
+        t_old = bench(name + ' legacy', old, arg, opt.repeat)
+        t_new = bench(name + ' current', new, arg, opt.repeat)
+        print('{0:<34} {1:10.2f}x'.format(name + ' speedup', t_old / t_new))
+
+
+if __name__ == '__main__':
+    main()
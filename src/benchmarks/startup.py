@@ -0,0 +1,118 @@
+# Copyright (c) 2016-present, Facebook, Inc.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree. An additional grant
+# of patent rights can be found in the PATENTS file in the same directory.
+
+'''
+Cold start check of run.py: imports it and sets up the environment of a
+configuration (as run.py does before the first step) in a fresh interpreter
+under ``python -X importtime``, reports the modules that take the most time
+to import and fails if the imports take longer than a target.
+
+The import times of the interpreter setup (the ``site`` module and what it
+imports) are not counted, since they do not depend on this code.
+
+Usage (from the src directory)::
+
+    python -m benchmarks.startup [--max-ms T] [--repeat R] [config]
+
+The exit status is 1 if the best of the R runs is above the target.
+'''
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from optparse import OptionParser
+import os
+import re
+import subprocess
+import sys
+import time
+
+SETUP = '''
+import run
+from core.config_loader import create_tasks_from_config
+from core.environment import Environment
+from core.serializer import StandardSerializer
+Environment(StandardSerializer(), create_tasks_from_config({0!r}))
+'''
+
+# import time: self [us] | cumulative | imported package
+_line = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def parse_importtime(output):
+    '''
+    The (module, depth, self time, cumulative time) of the imports in the
+    output of ``python -X importtime``, times in seconds, outside of the
+    interpreter setup.
+    '''
+    imports = []
+    lines = [_line.match(line) for line in output.splitlines()]
+    # an import is listed after the ones it triggered: walk backwards to
+    # know which ones happened inside site
+    inside_site = False
+    for match in reversed([m for m in lines if m is not None]):
+        self_us, cumulative_us, indent, module = match.groups()
+        depth = (len(indent) - 1) // 2
+        if depth == 0:
+            inside_site = module == 'site'
+        if not inside_site:
+            imports.append((module, depth, int(self_us) * 1e-6,
+                            int(cumulative_us) * 1e-6))
+    imports.reverse()
+    return imports
+
+
+def measure(config):
+    '''Runs the setup once, returning its imports and its wall time.'''
+    start = time.time()
+    process = subprocess.Popen(
+        [sys.executable, '-X', 'importtime', '-c', SETUP.format(config)],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True)
+    _, err = process.communicate()
+    elapsed = time.time() - start
+    if process.returncode != 0:
+        raise RuntimeError("The setup failed:\n" + err)
+    return parse_importtime(err), elapsed
+
+
+def import_total(imports):
+    return sum(cumulative for _, depth, _, cumulative in imports
+               if depth == 0)
+
+
+def main():
+    op = OptionParser("Usage: %prog [options] [tasks_config.json]")
+    op.add_option('--max-ms', default=100, type=float,
+                  help='Target for the import time, in milliseconds.')
+    op.add_option('--repeat', default=5, type=int,
+                  help='Number of runs (the best one is reported).')
+    op.add_option('--top', default=15, type=int,
+                  help='Number of modules to list.')
+    opt, args = op.parse_args()
+    config = args[0] if args else 'tasks_config.challenge.json'
+    if not os.path.isfile(config):
+        op.error("No such configuration file: {0}".format(config))
+
+    runs = [measure(config) for _ in range(opt.repeat)]
+    imports, elapsed = min(runs, key=lambda run: import_total(run[0]))
+    total = import_total(imports)
+    print('{0:<50} {1:>9} {2:>9}'.format('module', 'self ms', 'total ms'))
+    for module, _, self_time, cumulative in sorted(
+            imports, key=lambda entry: entry[3], reverse=True)[:opt.top]:
+        print('{0:<50} {1:9.1f} {2:9.1f}'.format(
+            module, self_time * 1e3, cumulative * 1e3))
+    print('Imports: {0:.1f} ms (target {1:.0f} ms); process: {2:.1f} ms'
+          .format(total * 1e3, opt.max_ms, elapsed * 1e3))
+    if total * 1e3 > opt.max_ms:
+        print('Cold start above target')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
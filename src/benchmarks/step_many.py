@@ -0,0 +1,101 @@
+# Copyright (c) 2016-present, Facebook, Inc.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree. An additional grant
+# of patent rights can be found in the PATENTS file in the same directory.
+
+'''
+Benchmark of Environment.step_many against calling Environment.next once per
+token, on the tasks of a configuration fed with the same random learner
+tokens (and the same random seed), in bit mode and in byte mode. Both run
+the channels and the state machine once per token, so the difference is only
+the cost of the calls.
+
+Usage (from the src directory)::
+
+    python -m benchmarks.step_many [--steps N] [tasks_config.challenge.json]
+'''
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from optparse import OptionParser
+import random
+import time
+
+from core.config_loader import create_tasks_from_config
+from core.environment import Environment
+from core.serializer import StandardSerializer
+
+
+def create_environment(tasks_config_file, byte_mode, seed):
+    random.seed(seed)
+    return Environment(StandardSerializer(),
+                       create_tasks_from_config(tasks_config_file),
+                       byte_mode=byte_mode)
+
+
+def learner_tokens(n_steps, byte_mode, seed):
+    rng = random.Random(seed)
+    tokens = ' abcdefghijklmnopqrstuvwxyz.;' if byte_mode else '01'
+    return [rng.choice(tokens) for _ in range(n_steps)]
+
+
+def run_next(env, tokens):
+    env_next = env.next
+    outputs = []
+    rewards = []
+    for token in tokens:
+        output, reward = env_next(token)
+        outputs.append(output)
+        rewards.append(reward)
+    return outputs, rewards
+
+
+def run_step_many(env, tokens):
+    outputs, rewards, _ = env.step_many(tokens)
+    return outputs, rewards
+
+
+def bench(tasks_config_file, run, byte_mode, tokens, seed, repeat):
+    best = None
+    for _ in range(repeat):
+        env = create_environment(tasks_config_file, byte_mode, seed)
+        start = time.time()
+        result = run(env, tokens)
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, len(tokens) / best
+
+
+def main():
+    op = OptionParser("Usage: %prog [options] [tasks_config.json]")
+    op.add_option('--steps', default=20000, type=int,
+                  help='Number of learner tokens of each run.')
+    op.add_option('--repeat', default=5, type=int,
+                  help='Number of timing repetitions (the best is kept).')
+    op.add_option('--seed', default=0, type=int,
+                  help='Seed of the environment and of the learner tokens.')
+    opt, args = op.parse_args()
+    tasks_config_file = args[0] if args else 'tasks_config.challenge.json'
+
+    for byte_mode in (False, True):
+        mode = 'byte' if byte_mode else 'bit'
+        tokens = learner_tokens(opt.steps, byte_mode, opt.seed)
+        # the first step gets no token, as in the session
+        tokens[0] = None
+        result, next_speed = bench(tasks_config_file, run_next, byte_mode,
+                                   tokens, opt.seed, opt.repeat)
+        many_result, many_speed = bench(tasks_config_file, run_step_many,
+                                        byte_mode, tokens, opt.seed,
+                                        opt.repeat)
+        assert result == many_result
+        print('{0:<5} next {1:10.1f} steps/s   step_many {2:10.1f} steps/s'
+              '   ratio {3:.2f}x'.format(mode, next_speed, many_speed,
+                                         many_speed / next_speed))
+
+
+if __name__ == '__main__':
+    main()
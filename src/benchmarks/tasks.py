@@ -0,0 +1,293 @@
+# Copyright (c) 2016-present, Facebook, Inc.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree. An additional grant
+# of patent rights can be found in the PATENTS file in the same directory.
+
+'''
+Throughput benchmark of the tasks of a configuration: each task runs on its
+own (with its world, if any) against the sample learners and a random bit
+learner, in bit mode and in byte mode, and we report the steps per second,
+the task switches per second and the peak RSS of each run. Every run happens
+in a process of its own, so that the peak RSS is the one of the run.
+
+The sample learners speak bits; in byte mode they run behind
+ByteModeLearner, which feeds them each byte of the environment as its 8 bits
+and sends back the byte their 8 answers make up, so that both modes run the
+same workload (e.g. the silent learner says spaces in byte mode too).
+
+A configuration in Python cannot be split into tasks, so its scheduler is
+benchmarked as a whole.
+
+Usage (from the src directory)::
+
+    python -m benchmarks.tasks [options] [tasks_config.challenge.json]
+
+With ``--output results.json`` the results are also saved as JSON, and with
+``--compare old_results.json`` the steps per second are compared against
+those of an earlier run.
+'''
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from optparse import OptionParser
+import json
+import multiprocessing
+import platform
+import random
+import re
+import sys
+import time
+
+from core.config_loader import JSONConfigLoader, create_tasks_from_config
+from core.environment import Environment
+from core.scheduler import SequentialTaskScheduler
+from core.serializer import StandardSerializer, bits_to_bytes, bytes_to_bits
+from core.session import Session
+from learners.base import BaseLearner
+from learners.sample_learners import SampleMemorizingLearner, \
+    SampleRepeatingLearner, SampleSilentLearner
+
+try:
+    import resource
+except ImportError:  # not POSIX
+    resource = None
+try:
+    from queue import Empty
+except ImportError:  # Python 2
+    from Queue import Empty
+
+# seconds a run may take beyond its --seconds budget (loading the tasks,
+# finishing the last step) before it is killed, and seconds between two
+# checks that its process is still alive
+RUN_TIMEOUT_MARGIN = 60
+POLL_INTERVAL = 1
+
+
+class RandomBitLearner(BaseLearner):
+    def __init__(self, seed=0):
+        self.rng = random.Random(seed)
+
+    def next(self, input):
+        return '1' if self.rng.random() < 0.5 else '0'
+
+
+class ByteModeLearner(BaseLearner):
+    '''Runs a bit learner in byte mode: each byte from the environment goes
+    to the learner as its 8 bits, and the 8 bits it answers make up the byte
+    sent back.'''
+    def __init__(self, learner):
+        self.learner = learner
+
+    def reward(self, reward):
+        self.learner.reward(reward)
+
+    def next(self, input):
+        bits = bytes_to_bits(bytearray([ord(input)]))
+        output = ''.join(self.learner.next(bit) for bit in bits)
+        return chr(bits_to_bytes(output)[0])
+
+
+LEARNERS = {
+    'silent': SampleSilentLearner,
+    'repeating': SampleRepeatingLearner,
+    'memorizing': SampleMemorizingLearner,
+    'random': RandomBitLearner,
+}
+MODES = {'bit': False, 'byte': True}
+
+
+def list_tasks(tasks_config_file):
+    '''The ids of the tasks in a JSON configuration (None for a Python one,
+    which can only run as a whole).'''
+    if not tasks_config_file.endswith('.json'):
+        return [None]
+    with open(tasks_config_file) as f:
+        return sorted(json.load(f)['tasks'])
+
+
+def create_scheduler(tasks_config_file, task_id):
+    if task_id is None:
+        return create_tasks_from_config(tasks_config_file)
+    with open(tasks_config_file) as f:
+        config = json.load(f)
+    loader = JSONConfigLoader()
+    task_config = config['tasks'][task_id]
+    world_id = task_config.get('world')
+    worlds = {}
+    if world_id is not None:
+        worlds[world_id] = loader.instantiate_world(
+            config['worlds'][world_id]['type'])
+    task = loader.instantiate_task(task_config['type'], worlds, world_id)
+    return SequentialTaskScheduler([task])
+
+
+def peak_rss():
+    '''Peak resident set size of this process, in bytes (None if
+    unknown).'''
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def run_task(tasks_config_file, task_id, learner_name, mode, max_steps,
+             max_seconds, seed):
+    '''Runs one task with one learner, returning its results.'''
+    random.seed(seed)
+    env = Environment(StandardSerializer(),
+                      create_scheduler(tasks_config_file, task_id),
+                      byte_mode=MODES[mode])
+    learner = LEARNERS[learner_name]()
+    if MODES[mode]:
+        learner = ByteModeLearner(learner)
+    session = Session(env, learner, 0)
+    start = time.time()
+    session.run_headless(max_steps, max_seconds)
+    elapsed = time.time() - start
+    steps = session.get_total_time()
+    task_switches = sum(session.get_task_count().values())
+    return {
+        'task': task_id,
+        'learner': learner_name,
+        'mode': mode,
+        'steps': steps,
+        'seconds': elapsed,
+        'steps_per_sec': steps / elapsed if elapsed > 0 else None,
+        'task_switches': task_switches,
+        'task_switches_per_sec': task_switches / elapsed
+        if elapsed > 0 else None,
+        'total_reward': session.get_total_reward(),
+        'peak_rss': peak_rss(),
+    }
+
+
+def _failure(args, error):
+    return {'task': args[1], 'learner': args[2], 'mode': args[3],
+            'error': error}
+
+
+def _run_task_in_child(queue, *args):
+    try:
+        queue.put(run_task(*args))
+    except Exception as e:
+        queue.put(_failure(args, '{0}: {1}'.format(e.__class__.__name__, e)))
+
+
+def run_task_in_process(*args):
+    '''Runs `run_task` in a process of its own. The run is reported as
+    failed if the process dies without a result (e.g. killed for lack of
+    memory) or overruns its time budget by RUN_TIMEOUT_MARGIN.'''
+    max_seconds = args[5]
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_run_task_in_child,
+                                      args=(queue,) + args)
+    process.start()
+    deadline = None
+    if max_seconds is not None:
+        deadline = time.time() + max_seconds + RUN_TIMEOUT_MARGIN
+    while True:
+        try:
+            result = queue.get(timeout=POLL_INTERVAL)
+            break
+        except Empty:
+            pass
+        if not process.is_alive():
+            # the result may have been queued just before the exit
+            try:
+                result = queue.get(timeout=POLL_INTERVAL)
+            except Empty:
+                result = _failure(args, 'Died with exit code {0}'.format(
+                    process.exitcode))
+            break
+        if deadline is not None and time.time() > deadline:
+            process.terminate()
+            result = _failure(args, 'Timed out')
+            break
+    process.join()
+    return result
+
+
+def run_key(result):
+    return (result['task'], result['learner'], result['mode'])
+
+
+def print_result(result, previous=None):
+    name = '{0} {1} {2}'.format(result['task'], result['learner'],
+                                result['mode'])
+    if 'error' in result:
+        print('{0:<48} {1}'.format(name, result['error']))
+        return
+    line = '{0:<48} {1:10.1f} steps/s {2:8.2f} switches/s {3:7.1f} MB'.format(
+        name, result['steps_per_sec'], result['task_switches_per_sec'],
+        (result['peak_rss'] or 0) / 2 ** 20)
+    if previous is not None and previous.get('steps_per_sec'):
+        line += ' {0:6.2f}x'.format(result['steps_per_sec'] /
+                                    previous['steps_per_sec'])
+    print(line)
+
+
+def main():
+    op = OptionParser("Usage: %prog [options] [tasks_config.json]")
+    op.add_option('--steps', default=5000, type=int,
+                  help='Maximum number of steps of each run.')
+    op.add_option('--seconds', default=10, type=float,
+                  help='Maximum wall-clock time of each run.')
+    op.add_option('--tasks', default='',
+                  help='Only benchmarks the task ids matching this regular '
+                  'expression.')
+    op.add_option('--learners', default=','.join(sorted(LEARNERS)),
+                  help='Comma-separated learners to use, among {0}.'.format(
+                      ', '.join(sorted(LEARNERS))))
+    op.add_option('--modes', default='bit,byte',
+                  help='Comma-separated modes to run (bit, byte).')
+    op.add_option('--seed', default=0, type=int,
+                  help='Random seed of every run.')
+    op.add_option('--output',
+                  help='JSON file where the results are saved.')
+    op.add_option('--compare',
+                  help='JSON file of an earlier run to compare against.')
+    opt, args = op.parse_args()
+    tasks_config_file = args[0] if args else 'tasks_config.challenge.json'
+    learner_names = opt.learners.split(',')
+    modes = opt.modes.split(',')
+    for name in learner_names:
+        if name not in LEARNERS:
+            op.error("Unknown learner {0}".format(name))
+    for mode in modes:
+        if mode not in MODES:
+            op.error("Unknown mode {0}".format(mode))
+
+    previous = {}
+    if opt.compare:
+        with open(opt.compare) as f:
+            previous = dict((run_key(r), r) for r in json.load(f)['results'])
+    results = []
+    for task_id in list_tasks(tasks_config_file):
+        if task_id is not None and not re.search(opt.tasks, task_id):
+            continue
+        for learner_name in learner_names:
+            for mode in modes:
+                result = run_task_in_process(
+                    tasks_config_file, task_id, learner_name, mode,
+                    opt.steps, opt.seconds, opt.seed)
+                print_result(result, previous.get(run_key(result)))
+                results.append(result)
+    if opt.output:
+        with open(opt.output, 'w') as f:
+            json.dump({'config': tasks_config_file,
+                       'python': platform.python_version(),
+                       'platform': platform.platform(),
+                       'time': time.time(),
+                       'max_steps': opt.steps,
+                       'max_seconds': opt.seconds,
+                       'seed': opt.seed,
+                       'results': results}, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
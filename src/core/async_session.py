@@ -0,0 +1,66 @@
+# Copyright (c) 2016-present, Facebook, Inc.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree. An additional grant
+# of patent rights can be found in the PATENTS file in the same directory.
+
+'''
+Session running on an asyncio event loop (Python 3.5+), so that one process
+can multiplex many environment/learner pairs whose learners spend their
+time waiting (for instance, on a model server). The learners implement the
+async interface of `learners.async_base.AsyncBaseLearner`.
+'''
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import asyncio
+
+from core.session import Session
+
+
+class AsyncSession(Session):
+    '''
+    A Session whose loop awaits the learner. The reward and time accounting
+    is the one of Session.
+    '''
+    # without a sleep between the steps, how many steps run before giving
+    # the other sessions a chance (in case the learner never suspends)
+    YIELD_INTERVAL = 100
+
+    def __init__(self, environment, learner, default_sleep=0):
+        super(AsyncSession, self).__init__(environment, learner,
+                                           default_sleep)
+
+    async def run(self, max_steps=None):
+        '''
+        Runs the session until `stop` is called or, if given, for
+        `max_steps` steps.
+        '''
+        await self._learner.start()
+        token = None
+        self.total_time_updated(self._total_time)
+        self.total_reward_updated(self._total_reward)
+        self._stop = False
+        steps = 0
+
+        while not self._stop and (max_steps is None or steps < max_steps):
+            token, reward = self._env.next(token)
+            self.env_token_updated(token)
+            await self._learner.try_reward(reward)
+            self.accumulate_reward(reward)
+
+            if self._sleep > 0:
+                await asyncio.sleep(self._sleep)
+            elif steps % self.YIELD_INTERVAL == 0:
+                await asyncio.sleep(0)
+
+            token = await self._learner.next(token)
+            self.learner_token_updated(token)
+
+            self._total_time += 1
+            self._task_time[self._current_task_id] += 1
+            self.total_time_updated(self._total_time)
+            steps += 1
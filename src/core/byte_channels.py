@@ -11,6 +11,7 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 from core.obs.observer import Observable
+from core.channels import ChannelDelta
 import logging
 
 import platform
@@ -29,6 +30,9 @@ class ByteInputChannel:
 
         self.message_updated = Observable()
         self.sequence_updated = Observable()
+        # same events, but carrying a ChannelDelta instead of the full buffer
+        self.message_appended = Observable()
+        self.sequence_appended = Observable()
 
     def consume(self, input_char):
         '''
@@ -43,6 +47,8 @@ class ByteInputChannel:
         self._buffer += encoded_char
         self.message_updated(self._buffer)
         self.sequence_updated(self._buffer)
+        self._notify_appended(ChannelDelta(
+            encoded_char, len(self._buffer), self._buffer))
 
     def clear(self):
         '''Clears all the  buffers'''
@@ -56,6 +62,14 @@ class ByteInputChannel:
             self._buffer = new_buffer
             self.message_updated(self._buffer)
             self.sequence_updated(self._buffer)
+            self._notify_appended(ChannelDelta(
+                new_buffer, len(new_buffer), new_buffer, reset=True))
+
+    def _notify_appended(self, delta):
+        if self.message_appended.observers:
+            self.message_appended(delta)
+        if self.sequence_appended.observers:
+            self.sequence_appended(delta)
 
     def get_text(self):
         return self._buffer
@@ -78,17 +92,30 @@ class ByteOutputChannel:
     def __init__(self, serializer):
         self.serializer = serializer
         self._buffer = u''
+        # number of characters in the buffer that are not silences
+        self._nonsilent_count = 0
         # remembers the data that has to be shipped out
         # event that gets fired every time we change the output sequence
         self.sequence_updated = Observable()
+        # same event, but carrying a ChannelDelta instead of the full buffer
+        self.sequence_appended = Observable()
         self.logger = logging.getLogger(__name__)
 
     def set_message(self, message):
         self._buffer += message
+        self._nonsilent_count += len(message) - message.count(
+            self.serializer.SILENCE_TOKEN)
         self.sequence_updated(self._buffer)
+        if self.sequence_appended.observers:
+            self.sequence_appended(ChannelDelta(
+                message, len(self._buffer), self._buffer))
 
     def clear(self):
-        self._set_buffer(u'')
+        self._nonsilent_count = 0
+        if self._buffer:
+            self._set_buffer(u'')
+            if self.sequence_appended.observers:
+                self.sequence_appended(ChannelDelta(u'', 0, u'', reset=True))
 
     def _set_buffer(self, new_buffer):
         '''
@@ -102,7 +129,12 @@ class ByteOutputChannel:
         if len(self._buffer) > 0:
             output, new_buffer = self._buffer[0], \
                 self._buffer[1:]
+            if output != self.serializer.SILENCE_TOKEN:
+                self._nonsilent_count -= 1
             self._set_buffer(new_buffer)
+            if self.sequence_appended.observers:
+                self.sequence_appended(ChannelDelta(
+                    u'', len(new_buffer), new_buffer))
             return output
 
     def is_empty(self):
@@ -110,4 +142,4 @@ class ByteOutputChannel:
 
     def is_silent(self):
         ''' All the bytes in the output are silent tokens. '''
-        return self._buffer.strip(self.serializer.SILENCE_TOKEN) == u''
+        return self._nonsilent_count == 0
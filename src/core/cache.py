@@ -0,0 +1,66 @@
+# Copyright (c) 2016-present, Facebook, Inc.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree. An additional grant
+# of patent rights can be found in the PATENTS file in the same directory.
+
+'''
+Bounded caches shared by the tasks (e.g. the automata of the mini tasks and
+the word selections of the micro tasks).
+'''
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from collections import namedtuple, OrderedDict
+import threading
+
+CacheInfo = namedtuple('CacheInfo', ('hits', 'misses', 'evictions',
+                                     'maxsize', 'currsize'))
+
+
+class LRUCache(object):
+    '''
+    Thread-safe cache of a bounded number of values, evicting the least
+    recently used ones, which counts its hits, misses and evictions.
+    '''
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._values = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key):
+        '''The value cached for the key (None if there is none).'''
+        with self._lock:
+            value = self._values.pop(key, None)
+            if value is None:
+                self.misses += 1
+                return None
+            # it is now the most recently used
+            self._values[key] = value
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._values.pop(key, None)
+            self._values[key] = value
+            while len(self._values) > self.maxsize:
+                self._values.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        '''Empties the cache and resets its counters.'''
+        with self._lock:
+            self._values.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def info(self):
+        '''The CacheInfo (hits, misses, evictions, maximum and current size)
+        of the cache.'''
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.evictions,
+                             self.maxsize, len(self._values))
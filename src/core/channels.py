@@ -10,13 +10,47 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 from core.obs.observer import Observable
+import bisect
 import logging
 
 
+class ChannelDelta(object):
+    '''
+    Describes an update of a channel buffer to the observers that only care
+    about what has changed: `delta` has been appended at the end of the
+    buffer, which is now `length` tokens long. If `reset` is True, the buffer
+    has been replaced altogether and `delta` holds all of its new contents.
+    Output channels also shrink from the front as their tokens are shipped
+    (with an empty `delta`).
+    '''
+    def __init__(self, delta, length, source, start=0, reset=False):
+        self.delta = delta
+        self.length = length
+        self.reset = reset
+        # the full buffer is source[start:], only built when asked for
+        self._source = source
+        self._start = start
+
+    def get_full(self):
+        '''Returns the whole contents of the buffer.'''
+        return self._source[self._start:]
+
+
 class InputChannel:
 
-    def __init__(self, serializer):
+    def __init__(self, serializer, incremental=True):
+        '''
+        Args:
+            serializer: the serializer used to decode the input bits.
+            incremental: if True and the serializer provides an incremental
+                decoder, the bits are deserialized as they arrive instead of
+                re-decoding the whole undeserialized chunk on every bit.
+        '''
         self.serializer = serializer
+        # stateful decoder (if the serializer supports it)
+        self._decoder = None
+        if incremental and hasattr(serializer, 'get_incremental_decoder'):
+            self._decoder = serializer.get_incremental_decoder()
         # remembers the input in binary format
         self._binary_buffer = ''
         # leftmost deserialization of the binary buffer
@@ -28,6 +62,9 @@ class InputChannel:
         self.sequence_updated = Observable()
         # event that gets fired for every new character
         self.message_updated = Observable()
+        # same events, but carrying a ChannelDelta instead of the full buffer
+        self.sequence_appended = Observable()
+        self.message_appended = Observable()
 
     def consume(self, input_bit):
         '''
@@ -40,23 +77,40 @@ class InputChannel:
         self._binary_buffer += input_bit
         # notify the updated sequence
         self.sequence_updated(self._binary_buffer)
+        if self.sequence_appended.observers:
+            self.sequence_appended(ChannelDelta(
+                input_bit, len(self._binary_buffer), self._binary_buffer))
+
+        if self._decoder is not None:
+            text = self._decoder.decode(input_bit)
+            if text is not None:
+                self._append_text(text)
+                self._deserialized_pos = len(self._binary_buffer)
+            return
 
         # we check if we can deserialize the final part of the sequence
         undeserialized_part = self.get_undeserialized()
         if self.serializer.can_deserialize(undeserialized_part):
             # when we do, we deserialize the chunk
-            self._deserialized_buffer += \
-                self.serializer.to_text(undeserialized_part)
+            self._append_text(self.serializer.to_text(undeserialized_part))
             # we update the position
             self._deserialized_pos += len(undeserialized_part)
 
-            self.message_updated(self._deserialized_buffer)
+    def _append_text(self, text):
+        self._deserialized_buffer += text
+        self.message_updated(self._deserialized_buffer)
+        if self.message_appended.observers:
+            self.message_appended(ChannelDelta(
+                text, len(self._deserialized_buffer),
+                self._deserialized_buffer))
 
     def clear(self):
         '''Clears all the  buffers'''
         self._set_deserialized_buffer('')
         self._set_binary_buffer('')
         self._deserialized_pos = 0
+        if self._decoder is not None:
+            self._decoder.reset()
 
     def get_binary(self):
         return self._binary_buffer
@@ -83,6 +137,9 @@ class InputChannel:
         if self._binary_buffer != new_buffer:
             self._binary_buffer = new_buffer
             self.sequence_updated(self._binary_buffer)
+            if self.sequence_appended.observers:
+                self.sequence_appended(ChannelDelta(
+                    new_buffer, len(new_buffer), new_buffer, reset=True))
 
     def _set_deserialized_buffer(self, new_buffer):
         '''
@@ -91,63 +148,173 @@ class InputChannel:
         if self._deserialized_buffer != new_buffer:
             self._deserialized_buffer = new_buffer
             self.message_updated(self._deserialized_buffer)
+            if self.message_appended.observers:
+                self.message_appended(ChannelDelta(
+                    new_buffer, len(new_buffer), new_buffer, reset=True))
 
 
 class OutputChannel:
 
     def __init__(self, serializer):
         self.serializer = serializer
-        # remembers the data that has to be shipped out
+        # remembers the data that has to be shipped out. Everything before
+        # the read cursor has already been consumed.
         self._binary_buffer = ''
+        self._cursor = 0
+        # offsets in the buffer where a character starts (None if the
+        # serializer cannot tell them)
+        self._boundaries = [] if hasattr(serializer, 'char_boundaries') \
+            else None
+        # the serialization of a silence token (computed on first use)
+        self._silent_bits = None
+        # the buffer is split in tokens of the size of the silence,
+        # aligned to its end: this is the offset where the first one starts
+        self._token_offset = 0
+        # number of tokens after the cursor that are not silences
+        self._nonsilent_tokens = 0
         # event that gets fired every time we change the output sequence
         self.sequence_updated = Observable()
+        # same event, but carrying a ChannelDelta instead of the full buffer
+        self.sequence_appended = Observable()
         self.logger = logging.getLogger(__name__)
 
     def set_message(self, message):
         new_binary = self.serializer.to_binary(message)
         # find the first available point from where we can insert
         # the new buffer without breaking the encoding
-        insert_point = len(self._binary_buffer)
-        for i in range(len(self._binary_buffer)):
-            # if we can decode from insert_point on, we can replace
-            # that information with the new buffer
-            if self.serializer.to_text(self._binary_buffer[i:]):
-                insert_point = i
-                break
+        insert_point = self._next_boundary()
         if insert_point > 0:
             self.logger.debug("Inserting new contents at {0}".format(
                 insert_point))
-        self._set_buffer(self._binary_buffer[:insert_point] + new_binary)
+        # we drop the consumed part of the buffer and everything after the
+        # insert point: what is kept is at most the character being shipped,
+        # and the new bits are swapped in as they are if there is none
+        end = self._cursor + insert_point
+        new_buffer = self._binary_buffer[self._cursor:end] + new_binary
+        # the kept part does not change (compared without copying the rest)
+        changed = len(self._binary_buffer) - end != len(new_binary) or \
+            not self._binary_buffer.startswith(new_binary, end)
+        if self._boundaries is not None:
+            lo = bisect.bisect_left(self._boundaries, self._cursor)
+            hi = bisect.bisect_left(self._boundaries,
+                                    self._cursor + insert_point)
+            new_boundaries = [b - self._cursor
+                              for b in self._boundaries[lo:hi]]
+            new_boundaries.extend(insert_point + b for b in
+                                  self.serializer.char_boundaries(new_binary))
+        else:
+            new_boundaries = None
+        appended = insert_point == len(self._binary_buffer) - self._cursor
+        self._set_buffer(new_buffer, new_boundaries,
+                         new_binary if appended else None, changed)
 
     def clear(self):
-        self._set_buffer('')
+        self._set_buffer('', [] if self._boundaries is not None else None)
 
-    def _set_buffer(self, new_buffer):
+    def get_pending(self):
+        '''Returns the bits that have not been shipped out yet.'''
+        return self._binary_buffer[self._cursor:]
+
+    def _next_boundary(self):
+        '''
+        Returns the offset (relative to the cursor) of the first character
+        boundary that has not been consumed yet.
+        '''
+        if self._boundaries is not None:
+            i = bisect.bisect_left(self._boundaries, self._cursor)
+            if i < len(self._boundaries):
+                return self._boundaries[i] - self._cursor
+            return len(self._binary_buffer) - self._cursor
+        # we don't know where the characters start: look for the first
+        # point from where we can decode the rest of the buffer
+        pending = self.get_pending()
+        for i in range(len(pending)):
+            if self.serializer.to_text(pending[i:]):
+                return i
+        return len(pending)
+
+    def _get_silent_bits(self):
+        if self._silent_bits is None:
+            self._silent_bits = self.serializer.to_binary(
+                self.serializer.SILENCE_TOKEN)
+        return self._silent_bits
+
+    def _set_buffer(self, new_buffer, new_boundaries, appended=None,
+                    changed=None):
         '''
         Carefully raise the event only if the buffer has actually changed
+        (`changed`, if the caller knows it). `appended` is the part that has
+        been added at the end, if the rest of the buffer was kept.
         '''
-        if self._binary_buffer != new_buffer:
-            self._binary_buffer = new_buffer
+        if changed is None:
+            changed = self.get_pending() != new_buffer
+        self._binary_buffer = new_buffer
+        self._cursor = 0
+        self._boundaries = new_boundaries
+        # count the tokens that are not silences
+        if new_buffer:
+            silent_bits = self._get_silent_bits()
+            token_size = len(silent_bits)
+            self._token_offset = len(new_buffer) % token_size
+            self._nonsilent_tokens = sum(
+                1 for i in range(self._token_offset, len(new_buffer),
+                                 token_size)
+                if new_buffer[i:i + token_size] != silent_bits)
+        else:
+            self._token_offset = 0
+            self._nonsilent_tokens = 0
+        if changed:
             self.sequence_updated(self._binary_buffer)
+            if self.sequence_appended.observers:
+                if appended is None:
+                    delta = ChannelDelta(new_buffer, len(new_buffer),
+                                         new_buffer, reset=True)
+                else:
+                    delta = ChannelDelta(appended, len(new_buffer),
+                                         new_buffer)
+                self.sequence_appended(delta)
 
     def consume(self):
-        if len(self._binary_buffer) > 0:
-            output, new_buffer = self._binary_buffer[0], \
-                self._binary_buffer[1:]
-            self._set_buffer(new_buffer)
+        if self._cursor < len(self._binary_buffer):
+            output = self._binary_buffer[self._cursor]
+            token_size = len(self._silent_bits)
+            if (self._cursor - self._token_offset) % token_size == 0 and \
+                    self._binary_buffer[self._cursor:
+                                        self._cursor + token_size] != \
+                    self._silent_bits:
+                # we started shipping a token that was not a silence
+                self._nonsilent_tokens -= 1
+            self._cursor += 1
+            if self._cursor == len(self._binary_buffer):
+                # everything has been shipped out, release the buffer
+                self._binary_buffer = ''
+                self._cursor = 0
+                self._token_offset = 0
+                self._nonsilent_tokens = 0
+                if self._boundaries is not None:
+                    self._boundaries = []
+            # only build the pending sequence if somebody is listening
+            if self.sequence_updated.observers:
+                self.sequence_updated(self.get_pending())
+            if self.sequence_appended.observers:
+                self.sequence_appended(ChannelDelta(
+                    '', len(self._binary_buffer) - self._cursor,
+                    self._binary_buffer, self._cursor))
             return output
 
     def is_empty(self):
-        return len(self._binary_buffer) == 0
+        return self._cursor == len(self._binary_buffer)
 
     def is_silent(self):
         ''' All the bits in the output token are the result of serializing
         silence tokens'''
-        buf = self._binary_buffer
-        silent_bits = self.serializer.to_binary(self.serializer.SILENCE_TOKEN)
-        token_size = len(silent_bits)
-        while len(buf) > token_size:
-            buf_suffix, buf = buf[-token_size:], buf[:-token_size]
-            if buf_suffix != silent_bits:
-                return False
-        return len(buf) == 0 or buf == silent_bits[-len(buf):]
+        if self._nonsilent_tokens > 0:
+            return False
+        if self.is_empty():
+            return True
+        # the whole tokens are silent, check what is left of the token that
+        # is being shipped
+        token_size = len(self._silent_bits)
+        partial_size = (self._token_offset - self._cursor) % token_size
+        partial = self._binary_buffer[self._cursor:self._cursor + partial_size]
+        return partial == self._silent_bits[token_size - partial_size:]
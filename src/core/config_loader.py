@@ -46,23 +46,39 @@ class JSONConfigLoader:
 
     The scheduler scheduler_arg_value could be a container including
     task ids, which will be replaced by the concrete tasks instances.
+
+    With `lazy` (the default), the scheduler gets LazyTasks instead: the
+    module of a task is only imported, and the task and its world only
+    instantiated, when the scheduler first hands the task out.
     '''
+    def __init__(self, lazy=True):
+        self.lazy = lazy
+
     def create_tasks(self, tasks_config_file):
         '''
         Given a json configuartion file, it returns a scheduler object
         set up as described in the file.
         '''
-        config = json.load(open(tasks_config_file))
-        # instantiate the worlds (typically there is only one)
-        worlds = dict((world_id, self.instantiate_world(world_config['type']))
-                      for world_id, world_config in config['worlds'].items())
-        # map each task
-        # instantiate the tasks with the world (if any)
-        tasks = dict((task_id, self.instantiate_task(task_config['type'],
-                                                     worlds,
-                                                     task_config.get(
-                                                         'world', None)))
-                      for task_id, task_config in config['tasks'].items())
+        with open(tasks_config_file) as f:
+            config = json.load(f)
+        if self.lazy:
+            worlds = LazyWorlds(self, config['worlds'])
+            tasks = dict((task_id, LazyTask(self, task_config['type'], worlds,
+                                            task_config.get('world', None)))
+                         for task_id, task_config in config['tasks'].items())
+        else:
+            # instantiate the worlds (typically there is only one)
+            worlds = dict((world_id,
+                           self.instantiate_world(world_config['type']))
+                          for world_id, world_config
+                          in config['worlds'].items())
+            # map each task
+            # instantiate the tasks with the world (if any)
+            tasks = dict((task_id,
+                          self.instantiate_task(task_config['type'], worlds,
+                                                task_config.get('world',
+                                                                None)))
+                         for task_id, task_config in config['tasks'].items())
         # retrieve what type of scheduler we need to create
         scheduler_class = get_class(config['scheduler']['type'])
         # prepare the arguments to instantiate the scheduler
@@ -105,6 +121,67 @@ class JSONConfigLoader:
                 task_class, e))
 
 
+class LazyWorlds(object):
+    '''
+    The worlds of a configuration, each of them instantiated the first time
+    it is asked for (and shared by all the tasks in it afterwards).
+    '''
+    def __init__(self, config_loader, worlds_config):
+        self._config_loader = config_loader
+        self._worlds_config = worlds_config
+        self._worlds = {}
+
+    def __getitem__(self, world_id):
+        if world_id not in self._worlds:
+            self._worlds[world_id] = self._config_loader.instantiate_world(
+                self._worlds_config[world_id]['type'])
+        return self._worlds[world_id]
+
+
+class LazyTask(object):
+    '''
+    Stands for a task of a configuration until the environment gets it from
+    the scheduler: only then is the module of the task imported and the task
+    instantiated (once). Any attribute not defined here is looked up in the
+    task, so schedulers can handle LazyTasks as they handle tasks.
+    '''
+    def __init__(self, config_loader, task_class, worlds, world_id=None):
+        self._config_loader = config_loader
+        self._worlds = worlds
+        self._world_id = world_id
+        self._task = None
+        self.task_class = task_class
+        # the name of the class, without importing it
+        self.class_name = task_class.split('.')[-1]
+
+    def get_task_id(self):
+        '''The identifier of the task, as Task.get_task_id gives it.'''
+        return self.class_name
+
+    def instantiate(self):
+        '''Returns the task, instantiating it the first time.'''
+        if self._task is None:
+            self._task = self._config_loader.instantiate_task(
+                self.task_class, self._worlds, self._world_id)
+        return self._task
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            # special lookups (copy, pickle...) are not for the task
+            raise AttributeError(name)
+        return getattr(self.instantiate(), name)
+
+    def __repr__(self):
+        return '<LazyTask {0}>'.format(self.task_class)
+
+
+def instantiate_task(task):
+    '''The task behind a LazyTask (any other task is returned as is).'''
+    if isinstance(task, LazyTask):
+        return task.instantiate()
+    return task
+
+
 class PythonConfigLoader:
     '''
         Loads a python file containing a stand-alone function called
@@ -126,6 +203,26 @@ class PythonConfigLoader:
         return mod.create_tasks()
 
 
+def create_tasks_from_config(tasks_config_file):
+    ''' Returns a TaskScheduler based on either:
+
+        - a json configuration file.
+        - a python module with a function create_tasks that does the job
+        of returning the task scheduler.
+    '''
+    fformat = tasks_config_file.split('.')[-1]
+    if fformat == 'json':
+        config_loader = JSONConfigLoader()
+    elif fformat == 'py':
+        config_loader = PythonConfigLoader()
+    else:
+        raise RuntimeError("Unknown configuration file format '.{fformat}' of"
+                           " {filename}"
+                           .format(fformat=fformat,
+                                   filename=tasks_config_file))
+    return config_loader.create_tasks(tasks_config_file)
+
+
 def get_class(name):
     components = name.split('.')
     mod = __import__('.'.join(components[:-1]), fromlist=[components[-1]])
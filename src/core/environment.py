@@ -16,7 +16,9 @@ from core.obs.observer import Observable
 from core.serializer import ScramblingSerializerWrapper
 from core.channels import InputChannel, OutputChannel
 from core.byte_channels import ByteInputChannel, ByteOutputChannel
+from core.config_loader import instantiate_task
 from collections import defaultdict
+from contextlib import contextmanager
 import logging
 
 
@@ -49,9 +51,22 @@ class Environment:
         # to handler functions in the tasks that tell the environment
         # how to react
         self.event_manager = EventManager()
+        # handles of the triggers registered by each task (and world)
+        self._trigger_handles = {}
+        # nesting level of the ongoing state change batches, whether state
+        # changes are being coalesced while stepping, and the tasks and
+        # worlds whose state changed in the meantime
+        self._state_batch_depth = 0
+        self._coalescing_state_changes = False
+        self._state_changed_scripts = []
         # intialize member variables
         self._current_task = None
         self._current_world = None
+        # number of tasks that have been started so far
+        self._task_switch_count = 0
+        self._byte_mode = byte_mode
+        # StepProfiler timing the steps, if any
+        self._profiler = None
 
         if scramble:
             serializer = ScramblingSerializerWrapper(serializer)
@@ -77,6 +92,8 @@ class Environment:
         self._last_result = None
         # reward that is to be given immediately
         self._immediate_reward = None
+        # reward returned by the last step
+        self._last_reward = None
         # Current task time
         self._task_time = None
         # Task separator issued
@@ -101,7 +118,19 @@ class Environment:
     def next(self, learner_input):
         '''Main loop of the Environment. Receives one bit from the learner and
         produces a response (also one bit)'''
-
+        # the state changes made by the event handlers are coalesced until
+        # something else happens (a message is set, a round of events ends)
+        coalescing = self._coalescing_state_changes
+        self._coalescing_state_changes = True
+        try:
+            result = self._next(learner_input)
+        finally:
+            self._coalescing_state_changes = coalescing
+        self._flush_state_changes()
+        self._last_reward = result[1]
+        return result
+
+    def _next(self, learner_input):
         self._last_result = None  # will be set while execution is inside this function or its child tree
 
         # Make sure we have a task
@@ -114,11 +143,13 @@ class Environment:
             reward = None
             # Check if a Timeout occurred
             self._current_task.check_timeout(self._task_time)
+            self._flush_state_changes()
             # Process the input from the learner and raise events
             if learner_input is not None:
                 # record the input from the learner and deserialize it
                 # TODO this bit is dropped otherwise on a timeout...
                 self._input_channel.consume(learner_input)
+                self._flush_state_changes()
                 # switch to next task immediately if this input caused the task to end
                 # and there is no feedback to output (output_channel is empty)
                 if self._current_task.has_ended() and self._output_channel.is_empty():
@@ -143,6 +174,7 @@ class Environment:
                 # TODO: decide what to do here.
                 # Should we consume the bit or not?
                 self._input_channel.consume(learner_input)
+                self._flush_state_changes()
                 # If there is still something to say, continue saying it
                 reward = None
         # Get one bit from the output buffer and ship it
@@ -152,6 +184,7 @@ class Environment:
 
         # we hear to ourselves
         self._output_channel_listener.consume(output)
+        self._flush_state_changes()
         # advance time
         self._task_time += 1
 
@@ -166,6 +199,70 @@ class Environment:
 
         return output, reward
 
+    def step_many(self, learner_tokens):
+        '''Runs a batch of learner tokens through the environment, as if
+        `next` was called with each of them in turn.
+
+        This is only a convenience wrapper (the episode replayer uses it):
+        the channels and the state machine still run once per token, so it
+        is no faster than calling `next` in a loop (see
+        benchmarks/step_many.py).
+
+        :param learner_tokens: a sequence of learner tokens or a bytes-like
+            buffer with one token per byte (the bit values in bit mode, the
+            character codes in byte mode).
+        :returns: a tuple ``(outputs, rewards, task_switches)`` of lists with
+            one element per learner token: the token produced by the
+            environment, the reward, and whether a new task was started
+            during that step.
+        '''
+        if isinstance(learner_tokens, (bytes, bytearray, memoryview)):
+            learner_tokens = bytearray(learner_tokens)
+            if self._byte_mode:
+                learner_tokens = map(chr, learner_tokens)
+        outputs = []
+        rewards = []
+        task_switches = []
+        # local bindings to keep the loop tight
+        env_next = self.next
+        add_output = outputs.append
+        add_reward = rewards.append
+        add_task_switch = task_switches.append
+        for learner_input in learner_tokens:
+            switch_count = self._task_switch_count
+            output, reward = env_next(learner_input)
+            add_output(output)
+            add_reward(reward)
+            add_task_switch(self._task_switch_count != switch_count)
+        return outputs, rewards, task_switches
+
+    def set_profiler(self, profiler):
+        '''
+        Times the phases of every step with a `core.profiler.StepProfiler`
+        (there is no going back).
+        '''
+        self._profiler = profiler
+        profiler.set_task_getter(lambda: self._current_task)
+        self.next = profiler.wrap(self.next, 'step')
+        for channel, phase in ((self._input_channel, 'input'),
+                               (self._output_channel, 'output'),
+                               (self._output_channel_listener, 'listener')):
+            channel.consume = profiler.wrap(channel.consume, phase)
+        self.event_manager.set_profiler(profiler)
+        # the timeouts are checked by the tasks themselves
+        if self._current_task:
+            self._profile_task(self._current_task)
+        self.task_updated.register(self._profile_task)
+
+    def _profile_task(self, task):
+        if 'check_timeout' not in vars(task):
+            task.check_timeout = self._profiler.wrap(task.check_timeout,
+                                                     'timeout')
+
+    def get_last_reward(self):
+        '''The reward returned by the last step (None if there was none).'''
+        return self._last_reward
+
     def get_reward_per_task(self):
         '''
         Returns a dictonary that contains the cumulative reward for each
@@ -192,15 +289,16 @@ class Environment:
 
     def _on_input_sequence_updated(self, sequence):
         if self.event_manager.raise_event(SequenceReceived(sequence)):
-            self.logger.debug("Sequence received by running task: '{0}'".format(
-                sequence))
+            # the sequence is only formatted if debugging is enabled
+            self.logger.debug("Sequence received by running task: '%s'",
+                              sequence)
 
     def _on_input_message_updated(self, message):
         # send the current received message to the task
         if self.event_manager.raise_event(MessageReceived(
                 message)):
-            self.logger.debug("Message received by running task: '{0}'".format(
-                message))
+            self.logger.debug("Message received by running task: '%s'",
+                              message)
 
     def _on_output_sequence_updated(self, sequence):
         self.event_manager.raise_event(OutputSequenceUpdated(sequence))
@@ -219,6 +317,7 @@ class Environment:
         if self._result is False and result is False:
             return
 
+        self._flush_state_changes()
         if provide_result_as_reward:
             self._reward = result
         self._result = result
@@ -232,6 +331,7 @@ class Environment:
 
     def set_immediate_reward(self, reward):
         '''Sets the reward immediately'''
+        self._flush_state_changes()
         self._immediate_reward = reward
         self.logger.debug('Setting immediate reward {}'.format(reward))
 
@@ -239,6 +339,7 @@ class Environment:
         ''' Saves the message in the output buffer so it can be delivered
         bit by bit. It overwrites any previous content.
         '''
+        self._flush_state_changes()
         if self._output_channel.is_empty() or priority >= self._output_priority:
             self.logger.debug('Setting message "{0}" with priority {1}'
                               .format(message, priority))
@@ -273,6 +374,49 @@ class Environment:
             return True
         return False
 
+    @contextmanager
+    def batch_state_changes(self):
+        '''
+            Within this context, the changes to the state of the tasks and
+            the world are coalesced: a single StateChanged event (and a
+            single state_updated notification per task or world) is raised
+            when the outermost batch exits.
+            (Outside of batches, the changes made while stepping are also
+            coalesced, but they are raised before any message, result or
+            reward is set so the order of their effects is kept.)
+        '''
+        self._state_batch_depth += 1
+        try:
+            yield
+        finally:
+            self._state_batch_depth -= 1
+        if not self._state_batch_depth:
+            self._flush_state_changes()
+
+    def defer_state_changed(self, script):
+        '''
+            Records that the state of a task or world changed within a
+            batch. Returns False if there is no ongoing batch.
+        '''
+        if not self._state_batch_depth and \
+                not self._coalescing_state_changes:
+            return False
+        if script not in self._state_changed_scripts:
+            self._state_changed_scripts.append(script)
+        return True
+
+    def _flush_state_changes(self):
+        if self._state_batch_depth:
+            # wait for the batch to finish
+            return
+        # the handlers could change the state again, which is also flushed
+        while self._state_changed_scripts:
+            scripts = self._state_changed_scripts
+            self._state_changed_scripts = []
+            self.raise_state_changed()
+            for script in scripts:
+                script._notify_state_updated()
+
     def _switch_new_task(self):
         '''
         Asks the task scheduler for a new task,
@@ -281,6 +425,7 @@ class Environment:
         # deregister previous event managers
         if self._current_task:
             self._current_task.deinit()
+            self._flush_state_changes()
             self._deregister_task_triggers(self._current_task)
 
         # pick a new task
@@ -289,7 +434,10 @@ class Environment:
             self._task_scheduler.reward(self._result)
             self._result = None
 
-        self._current_task = self._task_scheduler.get_next_task()
+        # tasks of a configuration are instantiated as they are first needed
+        self._current_task = instantiate_task(
+            self._task_scheduler.get_next_task())
+        self._task_switch_count += 1
         try:
             # This is to check whether the user didn't mess up in instantiating
             # the class
@@ -325,15 +473,13 @@ class Environment:
         # start the task, sending the current environment
         # so it can interact by sending back rewards and messages
         self._current_task.start(self)
+        self._flush_state_changes()
         self.task_updated(self._current_task)
 
     def _deregister_task_triggers(self, task):
-        for trigger in task.get_triggers():
+        for handle in self._trigger_handles.pop(task, ()):
             try:
-                self.event_manager.deregister(task, trigger)
-            except ValueError:
-                # if the trigger was not registered, we don't worry about it
-                pass
+                self.event_manager.deregister_handle(handle)
             except KeyError:
                 # if the trigger was not registered, we don't worry about it
                 pass
@@ -344,4 +490,5 @@ class Environment:
             self._register_task_trigger(task, trigger)
 
     def _register_task_trigger(self, task, trigger):
-        self.event_manager.register(task, trigger)
+        handle = self.event_manager.register(task, trigger)
+        self._trigger_handles.setdefault(task, []).append(handle)
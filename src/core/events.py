@@ -9,8 +9,20 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
-from collections import namedtuple
+from collections import namedtuple, OrderedDict
+import itertools
 import logging
+import operator
+import re
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+
+try:
+    unichr
+except NameError:  # Python 3
+    unichr = chr
 
 # When a task is started, it will register a set of triggers
 # which, for a specific kind of event (see below) and a further given
@@ -18,57 +30,271 @@ import logging
 Trigger = namedtuple('Trigger', ('type', 'condition', 'event_handler'))
 
 
+class PatternCondition(object):
+    '''
+    Trigger condition that searches a regular expression in a text field of
+    the event (e.g. the `message` of a MessageReceived event).
+
+    The expression is analysed once. If all its matches have to end at the
+    end of the text, it exposes in `last_chars` the characters they can end
+    on (or None if it cannot tell), so the EventManager can skip it when
+    the text ends otherwise. If, furthermore, its matches have a bounded
+    length, only the tail of the text is searched.
+    '''
+    def __init__(self, pattern, field):
+        self.pattern = re.compile(pattern)
+        self.field = field
+        self.window, self.last_chars = analyze_end_anchored(self.pattern)
+
+    def __call__(self, event):
+        text = getattr(event, self.field)
+        if self.window is not None and len(text) > self.window:
+            # searching from a position still takes into account what
+            # comes before it for lookbehinds and word boundaries
+            return self.pattern.search(text, len(text) - self.window)
+        return self.pattern.search(text)
+
+
+def analyze_end_anchored(compiled):
+    '''
+    Returns a tuple (window, last_chars) for a compiled regular expression
+    that ends with `$` (or `\\Z`), where `window` is the number of
+    characters from the end of the text where a match can start and
+    `last_chars` the set of characters a match can end on. Each of them is
+    None if it is unknown or unbounded.
+    '''
+    if compiled.flags & re.MULTILINE:
+        return None, None
+    parsed = sre_parse.parse(compiled.pattern, compiled.flags)
+    items = parsed.data
+    if not items or items[-1] not in ((sre_parse.AT, sre_parse.AT_END),
+                                      (sre_parse.AT,
+                                       sre_parse.AT_END_STRING)):
+        return None, None
+    max_width = parsed.getwidth()[1]
+    # '$' also matches right before a newline at the end of the text
+    window = max_width + 1 if max_width < sre_parse.MAXREPEAT else None
+    last_chars = None
+    if not compiled.flags & re.IGNORECASE:
+        last_chars = _last_chars(items[:-1])
+    return window, last_chars
+
+
+def _last_chars(items):
+    '''Set of characters that the sequence of parsed regular expression
+    items can end on, or None if unknown.'''
+    if not items:
+        return None
+    op, av = items[-1]
+    if op == sre_parse.LITERAL:
+        return frozenset([unichr(av)])
+    elif op == sre_parse.IN:
+        chars = set()
+        for in_op, in_av in av:
+            if in_op == sre_parse.LITERAL:
+                chars.add(unichr(in_av))
+            elif in_op == sre_parse.RANGE and in_av[1] - in_av[0] < 256:
+                chars.update(unichr(c) for c in range(in_av[0], in_av[1] + 1))
+            else:
+                # negations, categories, big ranges...
+                return None
+        return frozenset(chars)
+    elif op == sre_parse.SUBPATTERN:
+        # the subpattern is the last element (its other elements vary
+        # between Python versions: from 3.6 on, they include the flags
+        # added and removed by a scoped group such as `(?i:...)`)
+        if len(av) == 4 and av[1] & re.IGNORECASE:
+            # it can end on other cases of the characters
+            return None
+        return _last_chars(av[-1].data)
+    elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+        min_repeat, _, item = av
+        if min_repeat == 0:
+            # it could be empty, and then the previous item matters
+            return None
+        return _last_chars(item.data)
+    elif op == sre_parse.BRANCH:
+        chars = set()
+        for branch in av[1]:
+            branch_chars = _last_chars(branch.data)
+            if branch_chars is None:
+                return None
+            chars.update(branch_chars)
+        return frozenset(chars)
+    return None
+
+
+class TriggerDispatch(object):
+    '''
+    The triggers registered for one type of event, arranged so that the ones
+    with a PatternCondition that cannot match the last character of the
+    event text are not even evaluated.
+    '''
+    def __init__(self, triggers):
+        '''triggers maps registration handles, which are increasing, to
+        (observer, trigger) tuples'''
+        # (handle, observer, trigger) of the triggers that always have to
+        # be evaluated
+        self.unfiltered = []
+        # field -> (last character -> entries, all the entries)
+        self.filtered = {}
+        for handle, (observer, trigger) in triggers.items():
+            entry = (handle, observer, trigger)
+            last_chars = getattr(trigger.condition, 'last_chars', None)
+            if last_chars is None:
+                self.unfiltered.append(entry)
+            else:
+                by_char, entries = self.filtered.setdefault(
+                    trigger.condition.field, ({}, []))
+                entries.append(entry)
+                for c in last_chars:
+                    by_char.setdefault(c, []).append(entry)
+
+    def candidates(self, event):
+        '''Returns the entries of the triggers that can fire for the event,
+        in registration order.'''
+        if not self.filtered:
+            return self.unfiltered
+        selected = [self.unfiltered]
+        for field, (by_char, entries) in self.filtered.items():
+            last_char = getattr(event, field)[-1:]
+            if last_char == '\n':
+                # '$' could match before it: we cannot filter
+                selected.append(entries)
+            elif last_char in by_char:
+                selected.append(by_char[last_char])
+        if len(selected) == 1:
+            return selected[0]
+        return sorted((entry for entries in selected for entry in entries),
+                      key=operator.itemgetter(0))
+
+
 class EventManager:
     def __init__(self):
+        # type of event -> registration handle -> (observer, trigger)
         self.triggers = {}
+        self._next_handle = 0
+        # compiled TriggerDispatch for each type of event, rebuilt when the
+        # registered triggers change
+        self._dispatch = {}
+        self._profiler = None
         self.logger = logging.getLogger(__name__)
 
     def register(self, observer, trigger):
         '''
         Register a trigger (a tuple containing an
         ActivationCondition -a function/functor- and an EventHandler
-        - another function/functor-)
+        - another function/functor-) and returns a handle that can be
+        used to deregister it
         '''
-        # initialize a list for each type of event (it's just an optimizaiton)
+        # initialize a table for each type of event (it's just an
+        # optimizaiton)
         if trigger.type not in self.triggers:
-            self.triggers[trigger.type] = []
+            self.triggers[trigger.type] = OrderedDict()
         self.logger.debug(
-            "Registering Trigger for {0} event with handler {1} of object of "
-            "type {2}".format(trigger.type.__name__, trigger.event_handler,
-                              observer.__class__.__name__))
+            "Registering Trigger for %s event with handler %s of object of "
+            "type %s", trigger.type.__name__, trigger.event_handler,
+            observer.__class__.__name__)
         # save the trigger
-        self.triggers[trigger.type].append((observer, trigger))
+        handle = (trigger.type, self._next_handle)
+        self._next_handle += 1
+        self.triggers[trigger.type][handle] = (observer, trigger)
+        self._dispatch.pop(trigger.type, None)
+        return handle
 
     def deregister(self, observer, trigger):
-        self.triggers[trigger.type].remove((observer, trigger))
+        triggers = self.triggers[trigger.type]
+        for handle, registered in triggers.items():
+            if registered == (observer, trigger):
+                self.deregister_handle(handle)
+                return
+        raise ValueError("Trigger {0} is not registered".format(trigger))
+
+    def deregister_handle(self, handle):
+        '''
+        Deregisters the trigger that got the given handle when registered
+        (raises KeyError if it is no longer registered)
+        '''
+        del self.triggers[handle[0]][handle]
+        self._dispatch.pop(handle[0], None)
 
     def clear(self):
         '''
         Deregisters all triggers
         '''
         self.triggers.clear()
+        self._dispatch.clear()
 
     def raise_event(self, event):
         handled = False
         # check if we have any trigger at all of this type of event
         if event.__class__ in self.triggers:
+            triggers = self.triggers[event.__class__]
+            dispatch = self._dispatch.get(event.__class__)
+            if dispatch is None:
+                dispatch = TriggerDispatch(triggers)
+                self._dispatch[event.__class__] = dispatch
+            first_new_handle = (event.__class__, self._next_handle)
             # for all the triggers registered for this type of event
-            for observer, trigger in self.triggers[event.__class__]:
-                # check if the filtering condition is a go
-                condition_outcome = trigger.condition(event)
-                if condition_outcome:
-                    # save, if the event expects it, the outcome of the
-                    # condition checking
-                    try:
-                        event.condition_outcome = condition_outcome
-                    except AttributeError:
-                        self.logger.debug("Couldn't save condition outcome for "
-                                          "event {0}".format(event))
-                    self.logger.debug('{0} handled by {1}'.format(
-                        event, trigger.event_handler))
-                    # call the event handler
-                    trigger.event_handler(observer, event)
+            # that could fire (and were not deregistered by a handler)
+            for handle, observer, trigger in dispatch.candidates(event):
+                if handle in triggers and \
+                        self._handle(observer, trigger, event):
                     # remember we handled the event and
                     # keep on processing other events
                     handled = True
+            # triggers of this type registered by the handlers above
+            # also get the chance to handle the event
+            new_handles = list(itertools.takewhile(
+                lambda h: h >= first_new_handle, reversed(triggers)))
+            for handle in reversed(new_handles):
+                if handle in triggers:
+                    observer, trigger = triggers[handle]
+                    if self._handle(observer, trigger, event):
+                        handled = True
         return handled
+
+    def _handle(self, observer, trigger, event):
+        # check if the filtering condition is a go
+        condition_outcome = trigger.condition(event)
+        if condition_outcome:
+            self._save_condition_outcome(trigger, event, condition_outcome)
+            # call the event handler
+            trigger.event_handler(observer, event)
+            return True
+        return False
+
+    def _save_condition_outcome(self, trigger, event, condition_outcome):
+        # save, if the event expects it, the outcome of the
+        # condition checking
+        try:
+            event.condition_outcome = condition_outcome
+        except AttributeError:
+            self.logger.debug("Couldn't save condition outcome for "
+                              "event %s", event)
+        self.logger.debug('%s handled by %s', event, trigger.event_handler)
+
+    def set_profiler(self, profiler):
+        '''
+        Times the conditions and the handlers of the triggers with a
+        `core.profiler.StepProfiler`.
+        '''
+        self._profiler = profiler
+        self._handle = self._profiled_handle
+
+    def _profiled_handle(self, observer, trigger, event):
+        handler_name = trigger.event_handler.__name__
+        self._profiler.enter('trigger', handler_name)
+        try:
+            condition_outcome = trigger.condition(event)
+        finally:
+            self._profiler.exit()
+        if condition_outcome:
+            self._save_condition_outcome(trigger, event, condition_outcome)
+            self._profiler.enter('handler', handler_name)
+            try:
+                trigger.event_handler(observer, event)
+            finally:
+                self._profiler.exit()
+            return True
+        return False
@@ -0,0 +1,128 @@
+# Copyright (c) 2016-present, Facebook, Inc.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree. An additional grant
+# of patent rights can be found in the PATENTS file in the same directory.
+
+'''
+Periodic metrics of a running session, appended to a file as one JSON object
+per line, so that long runs can be followed while they go and lose at most
+one window of metrics if they are killed.
+
+The metrics are sampled from a background thread, which reads the counters
+the session keeps anyway: nothing is added to the step loop.
+'''
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import json
+import logging
+import os
+import threading
+import time
+
+
+class MetricsWriter(object):
+    '''
+    Every `interval` seconds, appends to `path` a record with the steps per
+    second and the task switches per second in the last window, the totals
+    so far and, for each task that ran in the window, the time spent on it
+    and the reward obtained in the window.
+
+    :param session: the Session to watch.
+    :param path: file the records are appended to.
+    :param interval: seconds between records.
+    '''
+    def __init__(self, session, path, interval=10.0):
+        self._session = session
+        self._path = path
+        self._interval = interval
+        self._stopped = threading.Event()
+        self._thread = None
+        self._file = None
+        self._last = None
+        self.logger = logging.getLogger(__name__)
+
+    def start(self):
+        self._file = open(self._path, 'a')
+        self._last = self._snapshot()
+        self._thread = threading.Thread(target=self._run,
+                                        name='MetricsWriter')
+        # a stuck session should not keep the process alive
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        '''Stops the thread, writing the records of the last window.'''
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+        self.write_record()
+        self._file.close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def _run(self):
+        while not self._stopped.wait(self._interval):
+            try:
+                self.write_record()
+            except Exception:
+                # losing some metrics is better than breaking the run
+                self.logger.exception("Could not write the metrics")
+
+    def _snapshot(self):
+        session = self._session
+        # the session keeps running while we read its counters: take copies
+        # (copying a dict is atomic) and never iterate over the live ones
+        return {
+            'clock': time.time(),
+            'steps': session.get_total_time(),
+            'reward': session.get_total_reward(),
+            'task_switches': sum(dict(session.get_task_count()).values()),
+            'task_time': dict(session.get_task_time()),
+            'task_reward': dict(session.get_reward_per_task()),
+        }
+
+    def make_record(self, last, current):
+        '''The record of the window between two snapshots.'''
+        elapsed = current['clock'] - last['clock']
+        steps = current['steps'] - last['steps']
+        task_switches = current['task_switches'] - last['task_switches']
+        tasks = {}
+        for task_name, t in current['task_time'].items():
+            dt = t - last['task_time'].get(task_name, 0)
+            dr = current['task_reward'].get(task_name, 0) - \
+                last['task_reward'].get(task_name, 0)
+            if dt or dr:
+                tasks[task_name] = {'time': dt, 'reward': dr}
+        return {
+            'time': current['clock'],
+            'window': elapsed,
+            'steps': steps,
+            'steps_per_sec': steps / elapsed if elapsed > 0 else 0,
+            'task_switches': task_switches,
+            'task_switches_per_sec': task_switches / elapsed
+            if elapsed > 0 else 0,
+            'total_time': current['steps'],
+            'total_reward': current['reward'],
+            'tasks': tasks,
+        }
+
+    def write_record(self):
+        current = self._snapshot()
+        record = self.make_record(self._last, current)
+        self._last = current
+        self._file.write(json.dumps(record, sort_keys=True) + '\n')
+        # make it to the disk, in case the process gets killed
+        self._file.flush()
+        os.fsync(self._file.fileno())
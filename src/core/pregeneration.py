@@ -0,0 +1,125 @@
+# Copyright (c) 2016-present, Facebook, Inc.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree. An additional grant
+# of patent rights can be found in the PATENTS file in the same directory.
+
+'''
+Generation of task instances ahead of time, in worker processes, so that the
+step in which a task starts does not pay for generating its instance.
+
+A task opts in by generating its instances through `generate_instance` with
+a function that can be pickled (defined at the top level of a module, or a
+static method) and picklable arguments and result. Without an
+InstancePregenerator installed (the default), the function is just called.
+With one, every distinct (function, arguments) pair gets a bounded queue of
+instances being generated by the workers.
+
+Each instance is generated with the global random generator of the worker
+seeded from the seed of the pregenerator, the function, its arguments and
+the number of the instance, so that runs with the same seed get the same
+instances, whatever the number of workers and the timing.
+'''
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from collections import deque
+import random
+
+_pregenerator = None
+
+
+def set_pregenerator(pregenerator):
+    '''Installs the InstancePregenerator used by generate_instance (None to
+    generate the instances on the spot).'''
+    global _pregenerator
+    _pregenerator = pregenerator
+
+
+def get_pregenerator():
+    return _pregenerator
+
+
+def generate_instance(func, *args):
+    '''Returns func(*args), generated ahead of time if there is an
+    InstancePregenerator.'''
+    pregenerator = _pregenerator
+    if pregenerator is None:
+        return func(*args)
+    return pregenerator.get(func, *args)
+
+
+def _generate(func, args, seed):
+    # runs in the worker
+    random.seed(seed)
+    return func(*args)
+
+
+class InstancePregenerator(object):
+    '''
+    Keeps, for each (function, arguments), up to `queue_size` instances
+    being generated by a pool of worker processes.
+
+    :param seed: seed the instances are generated from.
+    :param queue_size: number of instances generated ahead of time for each
+        (function, arguments).
+    :param workers: number of worker processes.
+    :param executor: a concurrent.futures executor to use instead (it has to
+        run each call in a process of its own for the instances to be
+        reproducible).
+    '''
+    def __init__(self, seed=0, queue_size=4, workers=1, executor=None):
+        if executor is None:
+            from concurrent.futures import ProcessPoolExecutor
+            executor = ProcessPoolExecutor(workers)
+        self.seed = seed
+        self.queue_size = queue_size
+        self._executor = executor
+        # futures of the instances of each key, in order
+        self._queues = {}
+        # number of instances of each key submitted so far
+        self._submitted = {}
+
+    def _key(self, func, args):
+        name = getattr(func, '__qualname__', func.__name__)
+        return '{0}.{1}{2!r}'.format(func.__module__, name, args)
+
+    def _submit(self, key, func, args):
+        index = self._submitted.get(key, 0)
+        self._submitted[key] = index + 1
+        seed = '{0}/{1}/{2}'.format(self.seed, key, index)
+        self._queues[key].append(self._executor.submit(_generate, func, args,
+                                                       seed))
+
+    def get(self, func, *args):
+        '''The next instance func(*args), waiting for it if it is not ready
+        yet.'''
+        key = self._key(func, args)
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = deque()
+        # keep the queue full, counting the instance taken now
+        while len(queue) < self.queue_size + 1:
+            self._submit(key, func, args)
+        return queue.popleft().result()
+
+    def pending(self):
+        '''Number of instances generated or being generated, per key.'''
+        return dict((key, len(queue)) for key, queue in self._queues.items())
+
+    def close(self):
+        '''Stops the workers, dropping the instances not taken.'''
+        for queue in self._queues.values():
+            for future in queue:
+                future.cancel()
+        self._queues.clear()
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,145 @@
+# Copyright (c) 2016-present, Facebook, Inc.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree. An additional grant
+# of patent rights can be found in the PATENTS file in the same directory.
+
+'''
+Profiler of the phases of the steps of an Environment, to find out whether
+the time goes to the serializer, to the trigger conditions or to the task
+handlers for a given mix of tasks.
+
+The phases are:
+
+- ``step``: the rest of `Environment.next`
+- ``timeout``: checking whether the task timed out
+- ``input``: consuming and deserializing the learner token
+- ``output``: producing the environment token
+- ``listener``: consuming the environment token (the environment hears
+  itself)
+- ``trigger``: evaluating the condition of a trigger (one entry per handler)
+- ``handler``: running a task handler (one entry per handler)
+
+The time of each phase excludes the time of the phases nested inside it
+(e.g. the handlers of the events raised while consuming the input), and is
+accounted to the class of the task running at that moment.
+'''
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from collections import defaultdict
+import operator
+import sys
+import time
+
+try:
+    _clock = time.perf_counter
+except AttributeError:  # Python 2
+    _clock = time.time
+
+# histogram buckets: bucket i holds the times in [2^(i-1), 2^i) microseconds
+N_BUCKETS = 32
+
+
+class PhaseStats(object):
+    '''Number of calls, total and maximum time, and a histogram (in powers of
+    two of microseconds) of the times of a phase.'''
+    __slots__ = ('count', 'total', 'max', 'histogram')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.histogram = [0] * N_BUCKETS
+
+    def add(self, elapsed):
+        self.count += 1
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+        bucket = int(elapsed * 1e6).bit_length()
+        self.histogram[min(bucket, N_BUCKETS - 1)] += 1
+
+    def quantile(self, q):
+        '''Upper bound (in seconds) of the q-th quantile of the times.'''
+        target = q * self.count
+        seen = 0
+        for bucket, n in enumerate(self.histogram):
+            seen += n
+            if seen >= target and n:
+                return min((1 << bucket) * 1e-6, self.max)
+        return self.max
+
+
+class StepProfiler(object):
+    '''
+    Accumulates the PhaseStats of each (task class, phase, handler) of an
+    environment instrumented with `Environment.set_profiler`.
+    '''
+    def __init__(self):
+        self.stats = defaultdict(PhaseStats)
+        # (key, start time, time spent in nested phases) of the phases
+        # being timed
+        self._stack = []
+        self._get_task = lambda: None
+
+    def set_task_getter(self, get_task):
+        '''Sets the function returning the task running at each moment.'''
+        self._get_task = get_task
+
+    def enter(self, phase, detail=None):
+        task = self._get_task()
+        task_name = task.__class__.__name__ if task is not None else '-'
+        self._stack.append([(task_name, phase, detail), _clock(), 0.0])
+
+    def exit(self):
+        key, start, nested = self._stack.pop()
+        elapsed = _clock() - start
+        self.stats[key].add(elapsed - nested)
+        if self._stack:
+            self._stack[-1][2] += elapsed
+
+    def wrap(self, func, phase, detail=None):
+        '''Returns a version of `func` timed as the given phase.'''
+        enter = self.enter
+        exit = self.exit
+
+        def timed(*args, **kwargs):
+            enter(phase, detail)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                exit()
+        return timed
+
+    def report(self, out=None):
+        '''Writes a table of the stats, by task class and by decreasing
+        total time.'''
+        out = out if out is not None else sys.stdout
+        by_task = defaultdict(list)
+        for key, stats in self.stats.items():
+            by_task[key[0]].append((key, stats))
+        task_totals = dict((task_name, sum(s.total for _, s in entries))
+                           for task_name, entries in by_task.items())
+        row = '{0:<40} {1:>10} {2:>10} {3:>8} {4:>8} {5:>8} {6:>9}'
+        for task_name, task_total in sorted(task_totals.items(),
+                                            key=operator.itemgetter(1),
+                                            reverse=True):
+            print('* {0} ({1:.3f} s)'.format(task_name, task_total),
+                  file=out)
+            print(row.format('phase', 'calls', 'total ms', 'mean us',
+                             'p50 us', 'p99 us', 'max us'), file=out)
+            entries = sorted(by_task[task_name],
+                             key=lambda entry: entry[1].total, reverse=True)
+            for (_, phase, detail), stats in entries:
+                name = phase if detail is None else \
+                    '{0} {1}'.format(phase, detail)
+                print(row.format(
+                    name[:40], stats.count, '{0:.2f}'.format(stats.total * 1e3),
+                    '{0:.1f}'.format(stats.total / stats.count * 1e6),
+                    '<{0:.0f}'.format(stats.quantile(0.5) * 1e6),
+                    '<{0:.0f}'.format(stats.quantile(0.99) * 1e6),
+                    '{0:.0f}'.format(stats.max * 1e6)), file=out)
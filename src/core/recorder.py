@@ -0,0 +1,323 @@
+# Copyright (c) 2016-present, Facebook, Inc.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree. An additional grant
+# of patent rights can be found in the PATENTS file in the same directory.
+
+'''
+Compact binary recording of the steps of a session, and replay of the
+recorded learner tokens through an Environment without any learner.
+
+An episode file starts with a header (magic, version, byte mode and the
+random seed of the session, if known) followed by chunks of steps. Each
+chunk is stored by columns, all of them 8-byte aligned so the file can be
+memory-mapped and viewed as arrays:
+
+- chunk header: magic, number of steps, of rewards and of task switches
+- rewards: the non-zero rewards (float64) ...
+- ... and the steps (uint32, relative to the chunk) they were given in
+- task switches: the steps (uint32) in which a new task started
+- environment tokens and learner tokens: one byte per token in byte mode,
+  packed bits in bit mode
+'''
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from array import array
+from collections import namedtuple
+import mmap
+import struct
+import sys
+
+from core.serializer import bits_to_bytes, bytes_to_bits
+
+MAGIC = b'CAIE'
+CHUNK_MAGIC = b'CHNK'
+VERSION = 2
+DEFAULT_CHUNK_SIZE = 65536
+
+# magic, version, byte mode, whether there is a seed, seed
+_file_header = struct.Struct('<4sHB?q')
+# the header of the files of version 1, without the seed
+_file_header_v1 = struct.Struct('<4sHBx')
+_chunk_header = struct.Struct('<4sIII')
+
+
+def _padding(size):
+    return -size % 8
+
+
+def _to_bytes(a):
+    '''The little-endian bytes of an array.'''
+    if sys.byteorder != 'little':
+        a = array(a.typecode, a)
+        a.byteswap()
+    try:
+        return a.tobytes()
+    except AttributeError:  # Python 2
+        return a.tostring()
+
+
+def _from_bytes(typecode, data):
+    a = array(typecode)
+    try:
+        a.frombytes(data)
+    except AttributeError:  # Python 2
+        a.fromstring(data)
+    if sys.byteorder != 'little':
+        a.byteswap()
+    return a
+
+
+class EpisodeRecorder(object):
+    '''
+    Appends the steps of a session (environment token, learner token, reward
+    and whether a new task started) to an episode file, a chunk at a time.
+
+    :param path: file to write to (it is overwritten).
+    :param byte_mode: whether the tokens are bytes or bits.
+    :param chunk_size: number of steps kept in memory before writing them.
+    :param seed: random seed the session was run with (an integer), saved in
+        the header so that the episode can be replayed.
+    '''
+    def __init__(self, path, byte_mode=True, chunk_size=DEFAULT_CHUNK_SIZE,
+                 seed=None):
+        self.byte_mode = byte_mode
+        self.chunk_size = chunk_size
+        self.seed = seed
+        self._file = open(path, 'wb')
+        self._file.write(_file_header.pack(MAGIC, VERSION, byte_mode,
+                                           seed is not None, seed or 0))
+        self._reset_chunk()
+        self._env = None
+        self._env_token = None
+        self._reward = None
+        self._task_switch = False
+
+    def _reset_chunk(self):
+        self._env_tokens = []
+        self._learner_tokens = []
+        self._reward_values = array(str('d'))
+        self._reward_steps = array(str('I'))
+        self._task_switches = array(str('I'))
+
+    def attach(self, env, session):
+        '''Records every step of the session from now on.'''
+        self._env = env
+        env.task_updated.register(self.on_task_updated)
+        session.env_token_updated.register(self.on_env_token_updated)
+        session.learner_token_updated.register(self.on_learner_token_updated)
+
+    def on_task_updated(self, task):
+        self._task_switch = True
+
+    def on_env_token_updated(self, token):
+        # the environment has just made the step
+        self._env_token = token
+        self._reward = self._env.get_last_reward()
+
+    def on_learner_token_updated(self, token):
+        self.record(self._env_token, token, self._reward, self._task_switch)
+        self._task_switch = False
+
+    def record(self, env_token, learner_token, reward=0, task_switch=False):
+        step = len(self._env_tokens)
+        self._env_tokens.append(env_token)
+        self._learner_tokens.append(learner_token)
+        if reward:
+            self._reward_values.append(reward)
+            self._reward_steps.append(step)
+        if task_switch:
+            self._task_switches.append(step)
+        if step + 1 >= self.chunk_size:
+            self.flush()
+
+    def _encode_tokens(self, tokens):
+        if self.byte_mode:
+            return bytearray(map(ord, tokens))
+        bits = ''.join(tokens)
+        return bits_to_bytes(bits + '0' * (-len(bits) % 8))
+
+    def flush(self):
+        '''Writes the steps recorded so far as a chunk.'''
+        n_steps = len(self._env_tokens)
+        if not n_steps:
+            return
+        columns = [_to_bytes(self._reward_values),
+                   _to_bytes(self._reward_steps),
+                   _to_bytes(self._task_switches),
+                   self._encode_tokens(self._env_tokens),
+                   self._encode_tokens(self._learner_tokens)]
+        write = self._file.write
+        write(_chunk_header.pack(CHUNK_MAGIC, n_steps,
+                                 len(self._reward_values),
+                                 len(self._task_switches)))
+        for column in columns:
+            write(column)
+            write(b'\0' * _padding(len(column)))
+        self._reset_chunk()
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+
+class EpisodeChunk(namedtuple('EpisodeChunk', ('start', 'env_tokens',
+                                               'learner_tokens', 'rewards',
+                                               'task_switches'))):
+    '''
+    A chunk of recorded steps, starting at step `start`: the environment and
+    the learner tokens as strings of one character per step, the (step,
+    reward) of the non-zero rewards and the steps in which a new task started
+    (with steps relative to the chunk).
+    '''
+    __slots__ = ()
+
+
+class EpisodeLog(object):
+    '''
+    Memory-mapped episode file, as written by EpisodeRecorder.
+    '''
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        self._buffer = mmap.mmap(self._file.fileno(), 0,
+                                 access=mmap.ACCESS_READ)
+        magic, version = _file_header_v1.unpack_from(self._buffer)[:2]
+        if magic != MAGIC or version not in (1, VERSION):
+            raise ValueError("{0} is not an episode file of version {1}"
+                             .format(path, VERSION))
+        if version == 1:
+            _, _, byte_mode = _file_header_v1.unpack_from(self._buffer)
+            has_seed, seed = False, None
+            offset = _file_header_v1.size
+        else:
+            _, _, byte_mode, has_seed, seed = \
+                _file_header.unpack_from(self._buffer)
+            offset = _file_header.size
+        self.byte_mode = bool(byte_mode)
+        # the random seed of the session (None if it was not recorded)
+        self.seed = seed if has_seed else None
+        # (offset, number of steps, of rewards, of task switches)
+        self._chunks = []
+        while offset < len(self._buffer):
+            magic, n_steps, n_rewards, n_switches = \
+                _chunk_header.unpack_from(self._buffer, offset)
+            if magic != CHUNK_MAGIC:
+                raise ValueError("Corrupted chunk at {0} in {1}".format(
+                    offset, path))
+            self._chunks.append((offset, n_steps, n_rewards, n_switches))
+            offset += _chunk_header.size
+            for size in self._column_sizes(n_steps, n_rewards, n_switches):
+                offset += size + _padding(size)
+        self.n_steps = sum(chunk[1] for chunk in self._chunks)
+
+    def __len__(self):
+        return self.n_steps
+
+    def _column_sizes(self, n_steps, n_rewards, n_switches):
+        token_size = n_steps if self.byte_mode else (n_steps + 7) // 8
+        return (8 * n_rewards, 4 * n_rewards, 4 * n_switches,
+                token_size, token_size)
+
+    def _decode_tokens(self, data, n_steps):
+        if self.byte_mode:
+            # latin-1 maps every byte to the character with the same code
+            return bytes(data).decode('latin-1')
+        return bytes_to_bits(data)[:n_steps]
+
+    def chunks(self):
+        '''Iterates over the EpisodeChunks of the file.'''
+        start = 0
+        for offset, n_steps, n_rewards, n_switches in self._chunks:
+            offset += _chunk_header.size
+            columns = []
+            for size in self._column_sizes(n_steps, n_rewards, n_switches):
+                columns.append(self._buffer[offset:offset + size])
+                offset += size + _padding(size)
+            reward_values, reward_steps, task_switches, env_tokens, \
+                learner_tokens = columns
+            yield EpisodeChunk(
+                start,
+                self._decode_tokens(env_tokens, n_steps),
+                self._decode_tokens(learner_tokens, n_steps),
+                list(zip(_from_bytes(str('I'), reward_steps),
+                         _from_bytes(str('d'), reward_values))),
+                list(_from_bytes(str('I'), task_switches)))
+            start += n_steps
+
+    def steps(self):
+        '''Iterates over the recorded steps as tuples (environment token,
+        learner token, reward, whether a new task started).'''
+        for chunk in self.chunks():
+            rewards = dict(chunk.rewards)
+            task_switches = set(chunk.task_switches)
+            for i, (env_token, learner_token) in enumerate(
+                    zip(chunk.env_tokens, chunk.learner_tokens)):
+                yield (env_token, learner_token, rewards.get(i, 0),
+                       i in task_switches)
+
+    def close(self):
+        self._buffer.close()
+        self._file.close()
+
+
+class ReplayResult(namedtuple('ReplayResult', ('steps', 'total_reward',
+                                               'divergence'))):
+    '''
+    Outcome of a replay: the number of steps run, the total reward obtained
+    and the first step in which the environment did not behave as recorded
+    (or None).
+    '''
+    __slots__ = ()
+
+
+class EpisodeReplayer(object):
+    '''
+    Feeds the learner tokens of an episode back through an Environment (as
+    the Session does: the first step gets no token and each one gets the
+    token the learner said after the previous one) and checks that the
+    environment tokens, rewards and task switches are the ones recorded.
+    The environment has to be set up as in the recording (same tasks and
+    random seed, see `EpisodeLog.seed`).
+    '''
+    def __init__(self, log, env):
+        self._log = log
+        self._env = env
+
+    def run(self, stop_on_divergence=True):
+        total_reward = 0
+        divergence = None
+        steps = 0
+        last_learner_token = None
+        for chunk in self._log.chunks():
+            learner_inputs = [last_learner_token] + \
+                list(chunk.learner_tokens[:-1])
+            outputs, rewards, task_switches = self._env.step_many(
+                learner_inputs)
+            steps += len(outputs)
+            total_reward += sum(reward for reward in rewards if reward)
+            last_learner_token = chunk.learner_tokens[-1]
+            if divergence is None:
+                divergence = self._find_divergence(chunk, outputs, rewards,
+                                                   task_switches)
+                if divergence is not None and stop_on_divergence:
+                    break
+        return ReplayResult(steps, total_reward, divergence)
+
+    def _find_divergence(self, chunk, outputs, rewards, task_switches):
+        recorded_rewards = [0] * len(outputs)
+        for step, reward in chunk.rewards:
+            recorded_rewards[step] = reward
+        recorded_switches = [False] * len(outputs)
+        for step in chunk.task_switches:
+            recorded_switches[step] = True
+        for i, (output, reward, task_switch) in enumerate(
+                zip(outputs, rewards, task_switches)):
+            if output != chunk.env_tokens[i] or \
+                    (reward or 0) != recorded_rewards[i] or \
+                    task_switch != recorded_switches[i]:
+                return chunk.start + i
+        return None
@@ -163,7 +163,8 @@ class DependenciesTaskScheduler:
             self.find_available_tasks()
 
     def get_task_id(self, task):
-        return task.__class__.__name__
+        # a LazyTask gives it without instantiating the task
+        return task.get_task_id()
 
     def solved(self, task):
         return self.get_task_id(task) in self.solved_tasks
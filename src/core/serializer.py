@@ -17,6 +17,45 @@ import re
 import math
 
 
+# precomputed tables mapping every byte value to its 8 bits representation
+# (most significant bit first) and back
+_BYTE_TO_BITS = ['{0:08b}'.format(i) for i in range(256)]
+_BITS_TO_BYTE = dict((bits, i) for i, bits in enumerate(_BYTE_TO_BITS))
+
+
+def bits_to_bytes(data):
+    '''
+    Converts a binary string into a bytearray, one byte for every complete
+    group of 8 bits. Trailing bits that do not fill a byte are ignored.
+    '''
+    n = len(data) // 8
+    if n == 0:
+        return bytearray()
+    try:
+        # parse the whole chunk at once
+        return bytearray(int(data[:n * 8], 2).to_bytes(n, 'big'))
+    except AttributeError:
+        # Python 2: no int.to_bytes, go byte by byte through the table
+        data_bytes = bytearray()
+        for i in range(0, n * 8, 8):
+            b = data[i:i + 8]
+            try:
+                data_bytes.append(_BITS_TO_BYTE[b])
+            except KeyError:
+                # not a canonical bit string: let int() parse it (or complain)
+                data_bytes.append(int(b, 2))
+        return data_bytes
+
+
+def bytes_to_bits(data):
+    '''
+    Converts bytes (or a bytearray) into a binary string, 8 bits per byte.
+    '''
+    # look up the bits of every byte (bytearray iterates over ints both in
+    # Python 2 and 3)
+    return ''.join(map(_BYTE_TO_BITS.__getitem__, bytearray(data)))
+
+
 class IdentitySerializer:
     '''
     Skips the serialization and just returns the text as-is.
@@ -34,6 +73,10 @@ class IdentitySerializer:
     def can_deserialize(self, data):
         return data
 
+    def char_boundaries(self, data):
+        '''Every token is a character on its own.'''
+        return list(range(len(data)))
+
 
 class ScramblingSerializerWrapper:
     '''
@@ -50,6 +93,8 @@ class ScramblingSerializerWrapper:
     "vsdsf"), and now "apple" that was going through unchanged before, it's
     being mapped to a new string.
     '''
+    PUNCTUATION = ",.:;'\"?"
+
     def __init__(self, serializer, readable=True):
         '''
         Args:
@@ -68,24 +113,27 @@ class ScramblingSerializerWrapper:
         self.logger = logging.getLogger(__name__)
 
     def to_binary(self, message):
-        self.logger.debug("Tokenizing message '{0}'".format(message))
+        self.logger.debug("Tokenizing message '%s'", message)
         # get all the parts of the message without cutting the spaces out
         tokens = self.tokenize(message)
-        self.logger.debug("Scrambling message '{0}'".format(tokens))
+        self.logger.debug("Scrambling message '%s'", tokens)
         # transform each of the pieces (if needed) and merge them together
         scrambled_message = ''.join(self.scramble(t) for t in tokens)
-        self.logger.debug("Returning scrambled message '{0}'".format(
-            scrambled_message))
+        self.logger.debug("Returning scrambled message '%s'",
+                          scrambled_message)
         # pass it on to the real serializer
         return self._serializer.to_binary(scrambled_message)
 
     def to_text(self, data):
         # get the scrambled message back from the bits
         scrambled_message = self._serializer.to_text(data)
+        return self.unscramble_message(scrambled_message)
+
+    def unscramble_message(self, scrambled_message):
         # split into tokens, including spaces and punctuation marks
-        self.logger.debug("Tokenizing {0}".format(scrambled_message))
+        self.logger.debug("Tokenizing %s", scrambled_message)
         tokens = self.tokenize(scrambled_message)
-        self.logger.debug("Unscrambling {0}".format(tokens))
+        self.logger.debug("Unscrambling %s", tokens)
         # unmask the words in it
         return ''.join(self.unscramble(t) for t in tokens)
 
@@ -99,6 +147,22 @@ class ScramblingSerializerWrapper:
         # to deserialize we have to be at the end of a word.
         return tokens and tokens[-1][1] != 'WORD'
 
+    def get_incremental_decoder(self):
+        '''
+        Returns a stateful decoder that unscrambles the words as they are
+        completed (or None if the underlying serializer cannot decode
+        incrementally).
+        '''
+        if not hasattr(self._serializer, 'get_incremental_decoder'):
+            return None
+        decoder = self._serializer.get_incremental_decoder()
+        if decoder is None:
+            return None
+        return IncrementalScramblingDecoder(self, decoder)
+
+    def char_boundaries(self, data):
+        return self._serializer.char_boundaries(data)
+
     def scramble(self, token):
         word, pos = token
         if pos == 'SILENCE' or pos == 'PUNCT':
@@ -168,10 +232,10 @@ class ScramblingSerializerWrapper:
         '''
         Simplified tokenizer that splits a message over spaces and punctuation.
         '''
-        punct = ",.:;'\"?"
+        punct = self.PUNCTUATION
         silence_token = self._serializer.SILENCE_TOKEN
         tokenized_message = []
-        tokens = re.split('(\W)', message)
+        tokens = re.split(r'(\W)', message)
         for t in tokens:
             if not t:
                 # re.split can return empty strings between consecutive
@@ -205,22 +269,7 @@ class StandardSerializer:
         message = message.replace(self.SILENCE_TOKEN, self.SILENCE_ENCODING)
         # handle unicode
         message = codecs.encode(message, 'utf-8')
-        data = []
-        for c in message:
-            # get the numeric value of the character
-            try: 
-                c = ord(c)
-            except TypeError:
-                # already an int (Python 3)
-                pass
-            # convert to binary
-            bin_c = bin(c)
-            # remove the '0b' prefix
-            bin_c = bin_c[2:]
-            # pad with zeros
-            bin_c = bin_c.zfill(8)
-            data.append(bin_c)
-        return ''.join(data)
+        return bytes_to_bits(message)
 
     def to_text(self, data, strict=False):
         '''Transforms a binary string into text.
@@ -237,16 +286,13 @@ class StandardSerializer:
 
         Returns: A string with containing the decoded text.
         '''
+        # convert the whole data to a byte-stream only once, every skip
+        # below decodes a suffix of it
+        data_bytes = bits_to_bytes(data)
         # if we are not in strict mode, we can skip bytes to find a message
-        for skip in range(int(len(data) / 8) if not strict else 1):
+        for skip in range(len(data_bytes) if not strict else 1):
             try:
-                # convert data to a byte-stream
-                message = bytearray()
-                sub_data = data[skip * 8:]
-                for i in range(int(len(sub_data) / 8)):
-                    b = sub_data[i * 8:(i + 1) * 8]
-                    message.append(int(b, 2))
-                message = codecs.decode(message, 'utf-8')
+                message = codecs.decode(data_bytes[skip:], 'utf-8')
                 message = message.replace(self.SILENCE_ENCODING,
                                           self.SILENCE_TOKEN)
                 if skip > 0:
@@ -259,7 +305,130 @@ class StandardSerializer:
 
         return None
 
+    def char_boundaries(self, data):
+        '''
+        Returns the offsets in the binary string `data` (as produced by
+        `to_binary`) where each of the encoded characters starts.
+        '''
+        # every byte that is not a UTF-8 continuation byte (10xxxxxx)
+        # starts a new character
+        return [i * 8 for i, b in enumerate(bits_to_bytes(data))
+                if b & 0xC0 != 0x80]
+
+    def get_incremental_decoder(self):
+        '''
+        Returns a stateful decoder that deserializes a bit stream as it
+        arrives, with the same recovery behaviour as `to_text`.
+        '''
+        return IncrementalBitDecoder(self)
+
     def can_deserialize(self, data):
         if len(data) < 8:
             return False
         return self.to_text(data) is not None
+
+
+class IncrementalBitDecoder(object):
+    '''
+    Decodes a bit stream produced by a StandardSerializer one bit at a time.
+
+    The InputChannel deserializes its pending bits as soon as `to_text` finds
+    a valid suffix in them (skipping the garbage bytes at the beginning).
+    Since it checks after every bit, that suffix is always the single
+    character ending at the last byte, so it is enough to remember the
+    incomplete byte and the last few bytes (a UTF-8 character is at most 4
+    bytes long), which makes the cost of every bit constant.
+    '''
+    _BIT_VALUE = {'0': 0, '1': 1}
+    _MAX_CHAR_BYTES = 4
+
+    def __init__(self, serializer):
+        self._serializer = serializer
+        self.reset()
+
+    def reset(self):
+        '''Forgets all the pending bits.'''
+        # bits of the byte that is being received
+        self._byte = 0
+        self._nbits = 0
+        # last complete bytes that have not been deserialized yet
+        self._tail = bytearray()
+
+    def decode(self, bits):
+        '''
+        Takes one or more bits (as a string of '0' and '1').
+
+        Returns: the newly decoded text, or None if the pending bits cannot
+        be deserialized yet.
+        '''
+        text = None
+        for bit in bits:
+            try:
+                self._byte = (self._byte << 1) | self._BIT_VALUE[bit]
+            except KeyError:
+                raise ValueError("Invalid bit {0!r}".format(bit))
+            self._nbits += 1
+            if self._nbits == 8:
+                char = self._push_byte(self._byte)
+                self._byte = 0
+                self._nbits = 0
+                if char is not None:
+                    text = char if text is None else text + char
+        return text
+
+    def _push_byte(self, byte):
+        tail = self._tail
+        tail.append(byte)
+        if len(tail) > self._MAX_CHAR_BYTES:
+            del tail[0]
+        # like to_text, prefer the longest valid suffix
+        for skip in range(len(tail)):
+            try:
+                char = codecs.decode(bytes(tail[skip:]), 'utf-8')
+            except UnicodeDecodeError:
+                continue
+            del tail[:]
+            return char.replace(self._serializer.SILENCE_ENCODING,
+                                self._serializer.SILENCE_TOKEN)
+        return None
+
+
+class IncrementalScramblingDecoder(object):
+    '''
+    Incremental counterpart of the ScramblingSerializerWrapper decoding.
+
+    The characters coming out of the underlying incremental decoder are held
+    back until the current word is completed by a punctuation mark or a
+    silence (that is, when `can_deserialize` would accept them). Only the
+    held back segment is then tokenized and unscrambled.
+    '''
+    def __init__(self, scrambler, decoder):
+        self._scrambler = scrambler
+        self._decoder = decoder
+        # characters that end a word
+        self._separators = scrambler.PUNCTUATION + scrambler.SILENCE_TOKEN
+        self._pending = ''
+
+    def reset(self):
+        '''Forgets all the pending bits and characters.'''
+        self._decoder.reset()
+        self._pending = ''
+
+    def decode(self, bits):
+        '''
+        Takes one or more bits.
+
+        Returns: the newly unscrambled text, or None if no word has been
+        completed yet.
+        '''
+        chars = self._decoder.decode(bits)
+        if chars is None:
+            return None
+        text = None
+        for c in chars:
+            self._pending += c
+            if c in self._separators:
+                segment = self._scrambler.unscramble_message(self._pending)
+                self._pending = ''
+                text = segment if text is None else text + segment
+        return text
@@ -11,9 +11,14 @@ from __future__ import print_function
 from __future__ import unicode_literals
 from core.obs.observer import Observable
 from collections import defaultdict
+import logging
 import time
 
+
 class Session:
+    # how many steps the headless loop runs between wall-clock checks
+    CLOCK_CHECK_INTERVAL = 1000
+
     def __init__(self, environment, learner,
                  default_sleep=0.01):
         # internal initialization
@@ -35,8 +40,14 @@ class Session:
         self._total_reward = 0
         # keep track of how many times we have tried each task
         self._task_count = defaultdict(int)
+        # tasks are given integer ids (in order of appearance) so the time
+        # spent on each of them can be kept in a list
+        self._task_ids = {}
+        self._task_names = []
+        self._current_task_id = None
         # keep track of how much time we have spent on each task
-        self._task_time = defaultdict(int)
+        self._task_time = []
+        self.logger = logging.getLogger(__name__)
 
     def run(self):
         # initialize a token variable
@@ -65,9 +76,73 @@ class Session:
 
             # and we loop
             self._total_time += 1
-            self._task_time[self._current_task.get_name()] += 1
+            self._task_time[self._current_task_id] += 1
             self.total_time_updated(self._total_time)
 
+    def run_headless(self, max_steps=None, max_seconds=None):
+        '''
+        Runs the session as fast as possible: there is no sleep between the
+        steps and the observables are only fired if somebody is registered
+        to them. It runs until `stop` is called or one of the budgets is
+        exhausted.
+
+        :param max_steps: maximum number of steps to run (None for no limit).
+        :param max_seconds: maximum wall-clock time to run, in seconds (None
+            for no limit). It is checked every `CLOCK_CHECK_INTERVAL` steps.
+        :returns: the number of steps per second.
+        '''
+        # local bindings to keep the loop tight
+        env_next = self._env.next
+        learner = self._learner
+        env_token_updated = self.env_token_updated
+        learner_token_updated = self.learner_token_updated
+        total_reward_updated = self.total_reward_updated
+        total_time_updated = self.total_time_updated
+        task_time = self._task_time
+        check_interval = self.CLOCK_CHECK_INTERVAL
+        # initialize a token variable
+        token = None
+        # send out initial values of status variables
+        total_time_updated(self._total_time)
+        total_reward_updated(self._total_reward)
+        # loop until stopped
+        self._stop = False
+        steps = 0
+        start_time = time.time()
+        deadline = start_time + max_seconds if max_seconds is not None \
+            else None
+
+        while not self._stop and (max_steps is None or steps < max_steps):
+            # first speaks the environment one token
+            token, reward = env_next(token)
+            if env_token_updated.observers:
+                env_token_updated(token)
+            # reward the learner if it has been set
+            learner.try_reward(reward)
+            if reward:
+                self._total_reward += reward
+                if total_reward_updated.observers:
+                    total_reward_updated(self._total_reward)
+            # then speaks the learner one token
+            token = learner.next(token)
+            if learner_token_updated.observers:
+                learner_token_updated(token)
+            # and we loop
+            self._total_time += 1
+            task_time[self._current_task_id] += 1
+            if total_time_updated.observers:
+                total_time_updated(self._total_time)
+            steps += 1
+            if deadline is not None and steps % check_interval == 0 and \
+                    time.time() >= deadline:
+                break
+
+        elapsed = time.time() - start_time
+        steps_per_sec = steps / elapsed if elapsed > 0 else float('inf')
+        self.logger.info("Ran {0} steps in {1:.2f} seconds ({2:.1f} "
+                         "steps/sec)".format(steps, elapsed, steps_per_sec))
+        return steps_per_sec
+
     def stop(self):
         self._stop = True
 
@@ -84,7 +159,10 @@ class Session:
         return self._task_count
 
     def get_task_time(self):
-        return self._task_time
+        task_time = defaultdict(int)
+        for task_name, t in zip(self._task_names, self._task_time):
+            task_time[task_name] = t
+        return task_time
 
     def accumulate_reward(self, reward):
         '''Records the reward if the learner hasn't exceeded the maximum
@@ -96,7 +174,13 @@ class Session:
 
     def on_task_updated(self, task):
         self._current_task = task
-        self._task_count[self._current_task.get_name()] += 1
+        task_name = task.get_name()
+        self._task_count[task_name] += 1
+        if task_name not in self._task_ids:
+            self._task_ids[task_name] = len(self._task_names)
+            self._task_names.append(task_name)
+            self._task_time.append(0)
+        self._current_task_id = self._task_ids[task_name]
 
     def set_sleep(self, sleep):
         if sleep < 0:
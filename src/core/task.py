@@ -10,7 +10,7 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 from core.obs.observer import Observable
-from core.events import Trigger
+from core.events import Trigger, PatternCondition
 from collections import defaultdict, namedtuple
 import logging
 import re
@@ -76,7 +76,40 @@ class MessageReceived():
 # that is informed through the decorators.
 # We map the annotated methods to their corresponding triggers, so when we start
 # a task, we can scan through its memebers and find the trigger here.
-global_event_handlers = {}
+class HandlerRegistry(dict):
+    '''A dictionary that also keeps the triggers of each Task/World class, so
+    they are not looked up again every time a task starts. The triggers of a
+    class are dropped when one of its methods is (un)registered; the
+    handlers added dynamically are not methods of any class, so they leave
+    the tables alone.'''
+    def __init__(self, *args, **kwargs):
+        super(HandlerRegistry, self).__init__(*args, **kwargs)
+        # class -> triggers
+        self.trigger_tables = {}
+        # function -> classes whose triggers were found among their methods
+        self._table_classes = {}
+
+    def set_triggers(self, cls, functions, triggers):
+        '''Keeps the triggers found among the functions of the methods of
+        the class.'''
+        self.trigger_tables[cls] = triggers
+        for f in functions:
+            self._table_classes.setdefault(f, set()).add(cls)
+
+    def _drop_tables(self, f):
+        for cls in self._table_classes.pop(f, ()):
+            self.trigger_tables.pop(cls, None)
+
+    def __setitem__(self, key, value):
+        super(HandlerRegistry, self).__setitem__(key, value)
+        self._drop_tables(key)
+
+    def __delitem__(self, key):
+        super(HandlerRegistry, self).__delitem__(key)
+        self._drop_tables(key)
+
+
+global_event_handlers = HandlerRegistry()
 
 
 def method_to_func(f):
@@ -161,14 +194,12 @@ def on_message(target_message=None):
         f = method_to_func(f)
         # If a target message is given, interpret it as a regular expression
         if target_message:
-            cmessage = re.compile(target_message)
+            condition = PatternCondition(target_message, 'message')
         else:
-            cmessage = None
+            condition = lambda e: True
         # The filtering condition applied the target message expression
         # to the event message
-        global_event_handlers[f] = Trigger(
-            MessageReceived,
-            lambda e: cmessage is None or cmessage.search(e.message), f)
+        global_event_handlers[f] = Trigger(MessageReceived, condition, f)
         return f
     return register
 
@@ -182,14 +213,12 @@ def on_output_message(target_message=None):
         f = method_to_func(f)
         # If a target message is given, interpret it as a regular expression
         if target_message:
-            cmessage = re.compile(target_message)
+            condition = PatternCondition(target_message, 'output_message')
         else:
-            cmessage = None
+            condition = lambda e: True
         # The filtering condition applied the target message expression
         # to the event message
-        global_event_handlers[f] = Trigger(
-            OutputMessageUpdated,
-            lambda e: cmessage is None or cmessage.search(e.output_message), f)
+        global_event_handlers[f] = Trigger(OutputMessageUpdated, condition, f)
         return f
     return register
 
@@ -201,13 +230,11 @@ def on_sequence(target_sequence=None):
     def register(f):
         f = method_to_func(f)
         if target_sequence:
-            csequence = re.compile(target_sequence)
+            condition = PatternCondition(target_sequence, 'sequence')
         else:
-            csequence = None
+            condition = lambda e: True
         # The filtering condition is either the target bit itself or nothing
-        global_event_handlers[f] = Trigger(
-            SequenceReceived,
-            lambda e: csequence is None or csequence.search(e.sequence), f)
+        global_event_handlers[f] = Trigger(SequenceReceived, condition, f)
         return f
     return register
 
@@ -220,14 +247,11 @@ def on_output_sequence(target_sequence=None):
     def register(f):
         f = method_to_func(f)
         if target_sequence:
-            csequence = re.compile(target_sequence)
+            condition = PatternCondition(target_sequence, 'output_sequence')
         else:
-            csequence = None
+            condition = lambda e: True
         # The filtering condition is either the target bit itself or nothing
-        global_event_handlers[f] = Trigger(
-            OutputSequenceUpdated,
-            lambda e: csequence is None or csequence.search(e.output_sequence),
-            f)
+        global_event_handlers[f] = Trigger(OutputSequenceUpdated, condition, f)
         return f
     return register
 
@@ -321,6 +345,11 @@ class State(object):
     def _raise_state_changed(self):
         return self._owner._raise_state_changed()
 
+    def batch(self):
+        '''Context manager to coalesce the StateChanged events raised by a
+        burst of changes into a single one.'''
+        return self._owner._env.batch_state_changes()
+
 
 class ScriptSet(object):
     """
@@ -362,25 +391,46 @@ class ScriptSet(object):
         '''Returns the set of triggers that have been registered for this
         task
         '''
-        triggers = []
+        triggers = global_event_handlers.trigger_tables.get(self.__class__)
+        if triggers is None:
+            triggers = tuple(self._find_triggers())
+            global_event_handlers.set_triggers(
+                self.__class__, self._find_methods(), triggers)
+        return list(triggers)
+
+    def _find_methods(self):
+        '''The functions of the methods of the task'''
+        functions = []
         for fname in dir(self):
             try:
                 # We try to extract the function object that was registered
                 try:
-                    f = getattr(self, fname).im_func
+                    functions.append(getattr(self, fname).im_func)
                 except AttributeError: # Python 3
-                    f = getattr(self, fname).__func__
-                trigger = handler_to_trigger(f)
-                if trigger:
-                    triggers.append(trigger)
+                    functions.append(getattr(self, fname).__func__)
             except AttributeError:
                 pass
+        return functions
+
+    def _find_triggers(self):
+        '''Scans the members of the task for registered handlers'''
+        triggers = []
+        for f in self._find_methods():
+            trigger = handler_to_trigger(f)
+            if trigger:
+                triggers.append(trigger)
         return triggers
 
     def get_name(self):
         '''Some unique identifier of the task'''
         return self.__class__.__name__
 
+    def get_task_id(self):
+        '''Identifier of the type of the task (the name of its class), the
+        same for a LazyTask standing for it, which does not need to
+        instantiate the task to give it.'''
+        return self.__class__.__name__
+
     def add_handler(self, handler):
         '''
         Adds and registers a handler dynamically during a task runtime.
@@ -391,11 +441,17 @@ class ScriptSet(object):
             self.dyn_handlers.add(handler)
 
     def _raise_state_changed(self):
+        if self._env.defer_state_changed(self):
+            # it will be raised at the end of the ongoing batch
+            return True
         ret = self._env.raise_state_changed()
+        self._notify_state_updated()
+        return ret
+
+    def _notify_state_updated(self):
         if self.has_started():
             # notify (outside) observers
             self.state_updated(self)
-        return ret
 
     def __str__(self):
         return str(self.__class__.__name__)
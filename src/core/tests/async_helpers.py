@@ -0,0 +1,49 @@
+# Copyright (c) 2016-present, Facebook, Inc.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree. An additional grant
+# of patent rights can be found in the PATENTS file in the same directory.
+
+'''
+Coroutines of test_async_session, kept apart because they are not valid
+syntax before Python 3.5 (the test module only imports them from then on).
+'''
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import asyncio
+import core.async_session as async_session
+import learners.async_base as async_base
+
+
+class AsyncWrapperLearner(async_base.AsyncBaseLearner):
+    '''Runs a learner, but waits for the event loop at every step.'''
+    def __init__(self, learner):
+        self.learner = learner
+
+    async def next(self, input):
+        await asyncio.sleep(0)
+        return self.learner.next(input)
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+async def run_all(sessions, n_steps):
+    await asyncio.gather(*[s.run(n_steps) for s in sessions])
+
+
+async def run_remote(env, endpoint, n_steps):
+    learner = async_base.AsyncRemoteLearner(None, None, endpoint)
+    s = async_session.AsyncSession(env, learner)
+    await s.run(n_steps)
+    learner.socket.close(linger=0)
+    return s
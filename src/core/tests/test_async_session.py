@@ -0,0 +1,146 @@
+# Copyright (c) 2016-present, Facebook, Inc.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree. An additional grant
+# of patent rights can be found in the PATENTS file in the same directory.
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+import zmq
+import core.task as task
+import core.session as session
+import core.serializer as serializer
+import core.environment as environment
+import learners.remote_protocol as remote_protocol
+from learners.base import BaseLearner
+
+if sys.version_info >= (3, 5):
+    # the async modules are not valid syntax before
+    import core.async_session as async_session
+    import learners.async_base as async_base
+    from core.tests.async_helpers import AsyncWrapperLearner, run, \
+        run_all, run_remote
+
+
+class EchoTask(task.Task):
+    def __init__(self):
+        super(EchoTask, self).__init__(max_time=100)
+
+    @task.on_start()
+    def start_handler(self, event):
+        self.set_message('say a.')
+
+    @task.on_message(r'a$')
+    def message_handler(self, event):
+        self.set_result(1, 'good.')
+
+
+class SingleTaskScheduler():
+    def __init__(self, task):
+        self.task = task
+
+    def get_next_task(self):
+        return self.task
+
+    def reward(self, reward):
+        pass
+
+
+class CyclingLearner(BaseLearner):
+    '''Says 'a' every few steps.'''
+    def __init__(self):
+        self.i = 0
+
+    def next(self, input):
+        self.i += 1
+        return 'a' if self.i % 7 == 0 else ' '
+
+
+def create_environment():
+    return environment.Environment(serializer.StandardSerializer(),
+                                   SingleTaskScheduler(EchoTask()),
+                                   byte_mode=True)
+
+
+def accounting(s):
+    return (s.get_total_time(), s.get_total_reward(),
+            dict(s.get_task_time()), dict(s.get_task_count()),
+            dict(s.get_reward_per_task()))
+
+
+@unittest.skipIf(sys.version_info < (3, 5), "asyncio needs Python 3.5+")
+class TestAsyncSession(unittest.TestCase):
+    n_steps = 500
+
+    def run_sync_session(self):
+        s = session.Session(create_environment(), CyclingLearner(), 0)
+
+        def on_time_updated(t):
+            if t >= self.n_steps:
+                s.stop()
+        s.total_time_updated.register(on_time_updated)
+        s.run()
+        return s
+
+    def testSameAccounting(self):
+        expected = accounting(self.run_sync_session())
+        self.assertGreater(expected[1], 0)
+        s = async_session.AsyncSession(
+            create_environment(),
+            async_base.SyncLearnerAdapter(CyclingLearner()))
+        run(s.run(self.n_steps))
+        self.assertEqual(expected, accounting(s))
+
+    def testMultiplexing(self):
+        expected = accounting(self.run_sync_session())
+        sessions = [async_session.AsyncSession(
+            create_environment(), AsyncWrapperLearner(CyclingLearner()))
+            for _ in range(20)]
+        run(run_all(sessions, self.n_steps))
+        for s in sessions:
+            self.assertEqual(expected, accounting(s))
+
+    def testRemoteLearner(self):
+        path = tempfile.mkdtemp()
+        endpoint = 'ipc://' + os.path.join(path, 'learner')
+        context = zmq.Context()
+        expected = accounting(self.run_sync_session())
+
+        def run_learner():
+            socket = context.socket(zmq.PAIR)
+            socket.connect(endpoint)
+            connection = remote_protocol.EnvironmentConnection(socket)
+            learner = CyclingLearner()
+            for _ in range(self.n_steps):
+                connection.receive()
+                connection.reply(learner.next(None))
+            socket.close(linger=0)
+
+        learner_thread = threading.Thread(target=run_learner)
+        learner_thread.start()
+        try:
+            s = run(run_remote(create_environment(), endpoint,
+                               self.n_steps))
+            learner_thread.join()
+            self.assertEqual(remote_protocol.PROTOCOL_BINARY,
+                             s._learner.protocol)
+            self.assertEqual(expected, accounting(s))
+        finally:
+            context.term()
+            shutil.rmtree(path)
+
+
+def main():
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
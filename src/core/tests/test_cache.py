@@ -0,0 +1,40 @@
+# Copyright (c) 2016-present, Facebook, Inc.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree. An additional grant
+# of patent rights can be found in the PATENTS file in the same directory.
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import unittest
+from core.cache import CacheInfo, LRUCache
+
+
+class TestLRUCache(unittest.TestCase):
+
+    def testEviction(self):
+        cache = LRUCache(2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(1, cache.get('a'))
+        # 'b' is now the least recently used
+        cache.put('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(1, cache.get('a'))
+        self.assertEqual(3, cache.get('c'))
+        self.assertEqual(CacheInfo(3, 1, 1, 2, 2), cache.info())
+
+    def testClear(self):
+        cache = LRUCache(2)
+        cache.put('a', 1)
+        cache.get('a')
+        cache.clear()
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(CacheInfo(0, 1, 0, 2, 0), cache.info())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,8 +10,10 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 import unittest
+import random
 import core.serializer as serializer
 import core.channels as channels
+import core.byte_channels as byte_channels
 
 
 class TestChannels(unittest.TestCase):
@@ -121,6 +123,183 @@ class TestChannels(unittest.TestCase):
                 self.assertFalse(oc.is_silent())
         self.assertTrue(oc.is_silent())
 
+    def testIncrementalDecoding(self):
+        slzr = serializer.StandardSerializer()
+        rng = random.Random(0)
+        valid = slzr.to_binary(u'my \u03B1 message \u20AC\U0001F600 .')
+        for _ in range(50):
+            # random garbage mixed with valid (possibly truncated) chunks
+            bits = ''
+            while len(bits) < 400:
+                if rng.random() < 0.5:
+                    bits += ''.join(rng.choice('01')
+                                    for _ in range(rng.randint(1, 40)))
+                else:
+                    start = rng.randint(0, len(valid) // 8) * 8
+                    bits += valid[start:start + rng.randint(8, 80)]
+            ics = [channels.InputChannel(slzr, incremental=True),
+                   channels.InputChannel(slzr, incremental=False)]
+            messages = [[], []]
+            for ic, msgs in zip(ics, messages):
+                ic.message_updated.register(msgs.append)
+            for b in bits:
+                for ic in ics:
+                    ic.consume(b)
+                self.assertEqual(ics[0].get_undeserialized(),
+                                 ics[1].get_undeserialized())
+            self.assertEqual(messages[0], messages[1])
+            for ic in ics:
+                ic.clear()
+            for b in valid:
+                for ic in ics:
+                    ic.consume(b)
+            self.assertEqual(ics[0].get_text(), ics[1].get_text())
+
+    def testInsertAtCharBoundary(self):
+        slzr = serializer.StandardSerializer()
+        for test_string in ('hello', u'h\u03B1llo'):
+            for consumed in range(len(slzr.to_binary(test_string[:2]))):
+                oc = channels.OutputChannel(slzr)
+                oc.set_message(test_string)
+                output = ''.join(oc.consume() for _ in range(consumed))
+                oc.set_message('bye')
+                while not oc.is_empty():
+                    output += oc.consume()
+                # the character that was being sent is finished
+                n_finished = len(slzr.to_text(output)) - len('bye')
+                self.assertEqual(test_string[:n_finished] + 'bye',
+                                 slzr.to_text(output))
+                self.assertLessEqual(n_finished * 8, consumed + 16)
+
+    def testOutputSequenceUpdated(self):
+        slzr = serializer.StandardSerializer()
+        oc = channels.OutputChannel(slzr)
+        sequences = []
+        oc.sequence_updated.register(sequences.append)
+        oc.set_message('ab')
+        oc.consume()
+        oc.set_message('cd')
+        while not oc.is_empty():
+            oc.consume()
+        ab, cd = slzr.to_binary('ab'), slzr.to_binary('cd')
+        expected = [ab, ab[1:], ab[1:8] + cd]
+        expected += [expected[-1][i:] for i in range(1, len(expected[-1]) + 1)]
+        self.assertEqual(expected, sequences)
+
+    def testUnchangedMessage(self):
+        slzr = serializer.StandardSerializer()
+        oc = channels.OutputChannel(slzr)
+        sequences = []
+        oc.sequence_updated.register(sequences.append)
+        oc.set_message('ab')
+        for _ in range(3):
+            oc.consume()
+        del sequences[:]
+        # the pending bits stay the same: nothing is fired
+        oc.set_message('b')
+        self.assertEqual([], sequences)
+        oc.set_message('c')
+        ab, c = slzr.to_binary('ab'), slzr.to_binary('c')
+        self.assertEqual([ab[3:8] + c], sequences)
+        self.assertEqual(ab[3:8] + c, oc.get_pending())
+
+    def testIsSilentRandomized(self):
+        def reference_is_silent(buf, silent_bits):
+            # the original implementation, walking the whole buffer
+            token_size = len(silent_bits)
+            while len(buf) > token_size:
+                buf_suffix, buf = buf[-token_size:], buf[:-token_size]
+                if buf_suffix != silent_bits:
+                    return False
+            return len(buf) == 0 or buf == silent_bits[-len(buf):]
+
+        slzr = serializer.StandardSerializer()
+        silence = slzr.SILENCE_TOKEN
+        silent_bits = slzr.to_binary(silence)
+        rng = random.Random(0)
+        oc = channels.OutputChannel(slzr)
+        boc = byte_channels.ByteOutputChannel(slzr)
+        for _ in range(2000):
+            op = rng.random()
+            if op < 0.15:
+                message = ''.join(rng.choice([silence] * 4 + [u'a', u'\u03B1'])
+                                  for _ in range(rng.randint(0, 6)))
+                oc.set_message(message)
+                boc.set_message(message)
+            elif op < 0.17:
+                oc.clear()
+                boc.clear()
+            else:
+                oc.consume()
+                boc.consume()
+            self.assertEqual(
+                reference_is_silent(oc.get_pending(), silent_bits),
+                oc.is_silent())
+            self.assertEqual(boc._buffer.strip(silence) == u'',
+                             boc.is_silent())
+
+    def testIncrementalScrambling(self):
+        slzr = serializer.ScramblingSerializerWrapper(
+            serializer.StandardSerializer())
+        rng = random.Random(0)
+        words = ['apple', 'Hello', 'a', 'dog!', 'x-ray', 'ok']
+        text = ''.join(rng.choice(words) + rng.choice([' ', '. ', ', ', '?'])
+                       for _ in range(40))
+        # the environment scrambles some of the words
+        slzr.to_binary(' '.join(words[:3]))
+        ics = [channels.InputChannel(slzr, incremental=True),
+               channels.InputChannel(slzr, incremental=False)]
+        messages = [[], []]
+        for ic, msgs in zip(ics, messages):
+            ic.message_updated.register(msgs.append)
+        for b in serializer.StandardSerializer().to_binary(text):
+            for ic in ics:
+                ic.consume(b)
+            self.assertEqual(ics[0].get_undeserialized(),
+                             ics[1].get_undeserialized())
+        self.assertEqual(messages[0], messages[1])
+
+    def testDeltaEvents(self):
+        slzr = serializer.StandardSerializer()
+        for ic in (channels.InputChannel(slzr),
+                   byte_channels.ByteInputChannel(slzr)):
+            full = {'sequence': [], 'message': []}
+            deltas = {'sequence': [], 'message': []}
+            ic.sequence_updated.register(full['sequence'].append)
+            ic.message_updated.register(full['message'].append)
+            ic.sequence_appended.register(deltas['sequence'].append)
+            ic.message_appended.register(deltas['message'].append)
+            data = slzr.to_binary(u'a \u03B1.') \
+                if isinstance(ic, channels.InputChannel) else u'a \u00e9.'
+            for b in data:
+                ic.consume(b)
+            ic.clear()
+            for kind in full:
+                # rebuilding the buffers from the deltas
+                buf = ''
+                for d in deltas[kind]:
+                    buf = d.delta if d.reset else buf + d.delta
+                    self.assertEqual(d.length, len(buf))
+                    self.assertEqual(buf, d.get_full())
+                self.assertEqual(full[kind], [d.get_full()
+                                              for d in deltas[kind]])
+
+        for oc in (channels.OutputChannel(slzr),
+                   byte_channels.ByteOutputChannel(slzr)):
+            full = []
+            deltas = []
+            oc.sequence_updated.register(full.append)
+            oc.sequence_appended.register(deltas.append)
+            oc.set_message('ab')
+            oc.consume()
+            oc.set_message('cd')
+            oc.consume()
+            oc.clear()
+            self.assertEqual(full, [d.get_full() for d in deltas])
+            self.assertEqual([len(f) for f in full],
+                             [d.length for d in deltas])
+            self.assertTrue(deltas[-1].reset)
+
 
 def main():
     unittest.main()
@@ -0,0 +1,148 @@
+# Copyright (c) 2016-present, Facebook, Inc.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree. An additional grant
+# of patent rights can be found in the PATENTS file in the same directory.
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+import core.task as task
+import core.config_loader as config_loader
+from core.environment import Environment
+from core.scheduler import DependenciesTaskScheduler
+from core.serializer import StandardSerializer
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))))
+
+
+class CountedWorld(task.World):
+    instances = 0
+
+    def __init__(self):
+        super(CountedWorld, self).__init__()
+        CountedWorld.instances += 1
+
+
+class CountedTask(task.Task):
+    instances = 0
+
+    def __init__(self, world=None):
+        super(CountedTask, self).__init__(world=world, max_time=10)
+        CountedTask.instances += 1
+
+
+class OtherCountedTask(CountedTask):
+    pass
+
+
+class TestJSONConfigLoader(unittest.TestCase):
+
+    def setUp(self):
+        CountedWorld.instances = 0
+        CountedTask.instances = 0
+        self.tmp_dir = tempfile.mkdtemp()
+        self.config_file = os.path.join(self.tmp_dir, 'config.json')
+        prefix = CountedTask.__module__ + '.'
+        with open(self.config_file, 'w') as f:
+            json.dump({
+                'worlds': {'w': {'type': prefix + 'CountedWorld'}},
+                'tasks': {
+                    't1': {'type': prefix + 'CountedTask', 'world': 'w'},
+                    't2': {'type': prefix + 'OtherCountedTask',
+                           'world': 'w'},
+                },
+                'scheduler': {
+                    'type': 'core.scheduler.SequentialTaskScheduler',
+                    'args': {'tasks': ['t1', 't2']}
+                }
+            }, f)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def testLazy(self):
+        scheduler = config_loader.create_tasks_from_config(self.config_file)
+        # nothing is instantiated until the environment needs it
+        self.assertEqual(0, CountedTask.instances)
+        self.assertEqual(0, CountedWorld.instances)
+        env = Environment(StandardSerializer(), scheduler)
+        self.assertEqual(0, CountedTask.instances)
+        env.next(None)
+        self.assertEqual(1, CountedTask.instances)
+        self.assertEqual(1, CountedWorld.instances)
+        self.assertIsInstance(env._current_task, CountedTask)
+        first_task = env._current_task
+        # the second task shares the world of the first one
+        env._switch_new_task()
+        self.assertEqual(2, CountedTask.instances)
+        self.assertEqual(1, CountedWorld.instances)
+        self.assertIsInstance(env._current_task, OtherCountedTask)
+        self.assertEqual(first_task.get_world(),
+                         env._current_task.get_world())
+        # and the tasks are only instantiated once
+        env._switch_new_task()
+        self.assertEqual(2, CountedTask.instances)
+        self.assertIs(first_task, env._current_task)
+
+    def testEager(self):
+        scheduler = config_loader.JSONConfigLoader(lazy=False).create_tasks(
+            self.config_file)
+        self.assertEqual(2, CountedTask.instances)
+        self.assertEqual(1, CountedWorld.instances)
+        self.assertIsInstance(scheduler.get_next_task(), CountedTask)
+
+    def testDependencyScheduler(self):
+        loader = config_loader.JSONConfigLoader()
+        tasks = dict((name, config_loader.LazyTask(
+            loader, CountedTask.__module__ + '.' + name, {}))
+            for name in ('CountedTask', 'OtherCountedTask'))
+        scheduler = DependenciesTaskScheduler(
+            list(tasks.values()),
+            [(tasks['CountedTask'], tasks['OtherCountedTask'])])
+        # the dependencies are resolved by class name, without instantiating
+        self.assertEqual([tasks['CountedTask']],
+                         list(scheduler.available_tasks))
+        # and so are the rewards
+        scheduler.get_next_task()
+        scheduler.reward(scheduler.unlock_threshold)
+        self.assertEqual(set(tasks.values()), scheduler.available_tasks)
+        self.assertEqual(0, CountedTask.instances)
+        # the id does not change with the instantiation
+        task = tasks['CountedTask']
+        self.assertEqual(task.get_task_id(), task.instantiate().get_task_id())
+
+
+class TestColdStart(unittest.TestCase):
+
+    def testRunImports(self):
+        # importing run.py and loading the challenge configuration does not
+        # import the learners nor the tasks
+        code = ('import sys, run\n'
+                'from core.config_loader import create_tasks_from_config\n'
+                'create_tasks_from_config("tasks_config.challenge.json")\n'
+                'print(" ".join(sorted(sys.modules)))\n')
+        output = subprocess.check_output([sys.executable, '-c', code],
+                                         cwd=SRC_DIR,
+                                         universal_newlines=True)
+        modules = output.split()
+        self.assertIn('core.environment', modules)
+        for module in ('learners.base', 'learners.human_learner',
+                       'tasks.challenge.round1.challenge_micro',
+                       'tasks.challenge.round1.challenge_mini',
+                       'worlds.grid_world', 'fsa'):
+            self.assertNotIn(module, modules)
+
+
+if __name__ == '__main__':
+    unittest.main()
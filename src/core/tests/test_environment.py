@@ -12,6 +12,7 @@ from __future__ import unicode_literals
 import unittest
 import core.task as task
 import core.environment as environment
+import core.serializer as serializer
 
 
 class SerializerMock(object):
@@ -103,3 +104,84 @@ class TestEnvironment(unittest.TestCase):
         env._deregister_task_triggers(tt)
         self.assertFalse(env.raise_event(task.Ended()))
         self.assertFalse(tt.end_handled)
+
+    def testStepMany(self):
+        class EchoTask(task.Task):
+            def __init__(self, *args, **kwargs):
+                super(EchoTask, self).__init__(*args, **kwargs)
+
+            @task.on_start()
+            def start_handler(self, event):
+                self.set_message('say a.')
+
+            @task.on_message(r'a$')
+            def message_handler(self, event):
+                self.set_result(1, 'good.')
+
+        learner_text = ' ' * 8 + 'a' + ' ' * 8 + 'b a' + ' ' * 8
+        for byte_mode in (True, False):
+            slzr = serializer.StandardSerializer()
+            tokens = learner_text if byte_mode else \
+                slzr.to_binary(learner_text)
+            envs = [environment.Environment(
+                slzr, SingleTaskScheduler(EchoTask(max_time=1000)),
+                byte_mode=byte_mode) for _ in range(2)]
+            switches = []
+            envs[0].task_updated.register(lambda t: switches.append(True))
+            expected = []
+            for t in tokens:
+                del switches[:]
+                output, reward = envs[0].next(t)
+                expected.append((output, reward, bool(switches)))
+            outputs, rewards, task_switches = envs[1].step_many(tokens)
+            self.assertEqual(expected,
+                             list(zip(outputs, rewards, task_switches)))
+            # at least the first task and one after the reward
+            self.assertGreaterEqual(sum(task_switches), 2)
+            self.assertGreaterEqual(sum(rewards), 1)
+
+    def testStateChangesCoalesced(self):
+        class CounterTask(task.Task):
+            def __init__(self, *args, **kwargs):
+                super(CounterTask, self).__init__(*args, **kwargs)
+
+            @task.on_start()
+            def start_handler(self, event):
+                self.state.count = 0
+
+            @task.on_state_changed(lambda ts: ts.count >= 3)
+            def count_handler(self, event):
+                self.set_result(1, 'done.')
+
+            @task.on_message(r'a$')
+            def message_handler(self, event):
+                # a burst of changes with a transient value
+                self.state.count += 5
+                self.state.count -= 4
+                self.state.count += 1
+                self.set_message('ok.')
+
+        slzr = serializer.StandardSerializer()
+        tt = CounterTask(max_time=1000)
+        env = environment.Environment(slzr, SingleTaskScheduler(tt),
+                                      byte_mode=True)
+        updates = []
+        env.next(' ')
+        tt.state_updated.register(lambda t: updates.append(t.state.count))
+        # the state changes made while stepping raise a single event, before
+        # the message is set
+        env.next('a')
+        self.assertEqual(updates, [2])
+        self.assertFalse(tt.has_ended())
+        env.next('a')
+        self.assertEqual(updates, [2, 4])
+        self.assertTrue(tt.has_ended())
+        # explicit batches also coalesce outside of a step
+        del updates[:]
+        with tt.state.batch():
+            tt.state.count = 10
+            with tt.state.batch():
+                tt.state.count = 0
+            tt.state.count = 1
+            self.assertEqual(updates, [])
+        self.assertEqual(updates, [1])
@@ -9,6 +9,9 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
+import random
+import re
+import sys
 import unittest
 import core.events as events
 
@@ -17,6 +20,11 @@ class MyEvent(object):
     pass
 
 
+class MyMessageEvent(object):
+    def __init__(self, message):
+        self.message = message
+
+
 class TestEvents(unittest.TestCase):
     def __init__(self, *args, **kwargs):
         super(TestEvents, self).__init__(*args, **kwargs)
@@ -33,6 +41,112 @@ class TestEvents(unittest.TestCase):
         em.raise_event(MyEvent())
         self.assertTrue(self.event_raised)
 
+    def testPatternAnalysis(self):
+        for pattern, window, last_chars in (
+                (r'\.$', 2, '.'),
+                (r'[\.\?]$', 2, '.?'),
+                (r'(\w+)\.$', None, '.'),
+                (r'(ab|cd)$', 3, 'bd'),
+                (r'(yes|no).$', 5, None),
+                (r'a?$', 2, None),
+                (r'(?i)a$', 2, None),
+                (r'(?m)a$', None, None),
+                (r'\.', None, None)):
+            condition = events.PatternCondition(pattern, 'message')
+            self.assertEqual(condition.window, window, pattern)
+            self.assertEqual(condition.last_chars,
+                             last_chars and frozenset(last_chars), pattern)
+
+    @unittest.skipIf(sys.version_info < (3, 6), "no scoped inline flags")
+    def testScopedFlags(self):
+        for pattern, last_chars in (
+                (r'(?i:a)$', None),
+                (r'(?i:x(ab|cd))$', None),
+                (r'(?i:b)(?-i:a)$', 'a')):
+            condition = events.PatternCondition(pattern, 'message')
+            self.assertEqual(condition.last_chars,
+                             last_chars and frozenset(last_chars), pattern)
+        handled = []
+        em = events.EventManager()
+        em.register(self, events.Trigger(
+            MyMessageEvent, events.PatternCondition(r'say (?i:a)$',
+                                                    'message'),
+            lambda observer, event: handled.append(event.message)))
+        for message in ('say a', 'say A', 'say b'):
+            em.raise_event(MyMessageEvent(message))
+        self.assertEqual(['say a', 'say A'], handled)
+
+    def testPatternDispatch(self):
+        # the compiled dispatch behaves as evaluating all the conditions
+        # over the full message, in registration order
+        patterns = [r'\.$', r'[\.\?]$', r'(\w+)\.$', r'\ba b\.$', r'b$',
+                    r'(?<=a )b\?$', r'^a\.$', r'\.', r'(ab|b\.)$', r'\?\Z']
+        handled = []
+
+        def make_handler(i):
+            def handler(observer, event):
+                handled.append((i, event.condition_outcome.span()))
+            return handler
+
+        em = events.EventManager()
+        for i, pattern in enumerate(patterns):
+            em.register(self, events.Trigger(
+                MyMessageEvent, events.PatternCondition(pattern, 'message'),
+                make_handler(i)))
+        rng = random.Random(0)
+        for _ in range(2000):
+            message = ''.join(rng.choice('ab .?\n')
+                              for _ in range(rng.randint(0, 12)))
+            expected = [(i, m.span()) for i, m in
+                        ((i, re.search(p, message))
+                         for i, p in enumerate(patterns)) if m]
+            del handled[:]
+            self.assertEqual(em.raise_event(MyMessageEvent(message)),
+                             bool(expected))
+            self.assertEqual(handled, expected, repr(message))
+
+    def testHandles(self):
+        em = events.EventManager()
+        calls = []
+
+        def make_handler(i):
+            def handler(observer, event):
+                calls.append(i)
+            return handler
+
+        handles = [em.register(self, events.Trigger(
+            MyEvent, lambda e: True, make_handler(i))) for i in range(4)]
+        em.deregister_handle(handles[1])
+        self.assertRaises(KeyError, em.deregister_handle, handles[1])
+        em.raise_event(MyEvent())
+        self.assertEqual(calls, [0, 2, 3])
+        # registration order is kept for new triggers
+        em.register(self, events.Trigger(MyEvent, lambda e: True,
+                                         make_handler(4)))
+        em.deregister_handle(handles[0])
+        del calls[:]
+        em.raise_event(MyEvent())
+        self.assertEqual(calls, [2, 3, 4])
+
+    def testRegisterWhileDispatching(self):
+        em = events.EventManager()
+        calls = []
+
+        def late(observer, event):
+            calls.append('late')
+
+        def early(observer, event):
+            calls.append('early')
+            em.register(self, events.Trigger(
+                MyMessageEvent, events.PatternCondition(r'\.$', 'message'),
+                late))
+
+        em.register(self, events.Trigger(
+            MyMessageEvent, events.PatternCondition(r'\.$', 'message'),
+            early))
+        em.raise_event(MyMessageEvent('a.'))
+        self.assertEqual(calls, ['early', 'late'])
+
 
 def main():
     unittest.main()
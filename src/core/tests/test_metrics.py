@@ -0,0 +1,123 @@
+# Copyright (c) 2016-present, Facebook, Inc.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree. An additional grant
+# of patent rights can be found in the PATENTS file in the same directory.
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import core.task as task
+import core.session as session
+import core.serializer as serializer
+import core.environment as environment
+from core.metrics import MetricsWriter
+from learners.base import BaseLearner
+
+
+class EchoTask(task.Task):
+    def __init__(self):
+        super(EchoTask, self).__init__(max_time=100)
+
+    @task.on_start()
+    def start_handler(self, event):
+        self.set_message('say a.')
+
+    @task.on_message(r'a$')
+    def message_handler(self, event):
+        self.set_result(1, 'good.')
+
+
+class SingleTaskScheduler():
+    def __init__(self, task):
+        self.task = task
+
+    def get_next_task(self):
+        return self.task
+
+    def reward(self, reward):
+        pass
+
+
+class CyclingLearner(BaseLearner):
+    '''Says 'a' every few steps.'''
+    def __init__(self):
+        self.i = 0
+
+    def next(self, input):
+        self.i += 1
+        return 'a' if self.i % 7 == 0 else ' '
+
+
+class TestMetricsWriter(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.metrics_file = os.path.join(self.path, 'metrics.jsonl')
+        self.session = self.create_session()
+
+    def create_session(self):
+        env = environment.Environment(serializer.StandardSerializer(),
+                                      SingleTaskScheduler(EchoTask()),
+                                      byte_mode=True)
+        return session.Session(env, CyclingLearner(), 0)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def read_records(self):
+        with open(self.metrics_file) as f:
+            return [json.loads(line) for line in f]
+
+    def check_totals(self, records):
+        s = self.session
+        self.assertEqual(s.get_total_time(), records[-1]['total_time'])
+        self.assertEqual(s.get_total_reward(), records[-1]['total_reward'])
+        self.assertEqual(s.get_total_time(),
+                         sum(r['steps'] for r in records))
+        self.assertEqual(sum(s.get_task_count().values()),
+                         sum(r['task_switches'] for r in records))
+        task_name = EchoTask().get_name()
+        self.assertEqual(s.get_task_time()[task_name],
+                         sum(r['tasks'].get(task_name, {}).get('time', 0)
+                             for r in records))
+        self.assertEqual(s.get_reward_per_task()[task_name],
+                         sum(r['tasks'].get(task_name, {}).get('reward', 0)
+                             for r in records))
+
+    def testLastWindowOnStop(self):
+        with MetricsWriter(self.session, self.metrics_file, 1000):
+            self.session.run_headless(max_steps=1000)
+        records = self.read_records()
+        self.assertEqual(1, len(records))
+        self.assertGreater(records[0]['total_reward'], 0)
+        self.check_totals(records)
+
+    def testPeriodicRecords(self):
+        with MetricsWriter(self.session, self.metrics_file, 0.01):
+            self.session.run_headless(max_seconds=0.2)
+        records = self.read_records()
+        self.assertGreater(len(records), 1)
+        self.check_totals(records)
+
+    def testAppends(self):
+        with MetricsWriter(self.session, self.metrics_file, 1000):
+            self.session.run_headless(max_steps=100)
+        other_session = self.create_session()
+        with MetricsWriter(other_session, self.metrics_file, 1000):
+            other_session.run_headless(max_steps=200)
+        records = self.read_records()
+        self.assertEqual([100, 200], [r['steps'] for r in records])
+
+
+def main():
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+# Copyright (c) 2016-present, Facebook, Inc.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree. An additional grant
+# of patent rights can be found in the PATENTS file in the same directory.
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import random
+import unittest
+import core.pregeneration as pregeneration
+
+
+def random_word(length, alphabet):
+    return ''.join(random.choice(alphabet) for _ in range(length))
+
+
+class TestInstancePregenerator(unittest.TestCase):
+
+    def generate(self, seed, n, queue_size=3, workers=1):
+        with pregeneration.InstancePregenerator(seed, queue_size,
+                                                workers) as pregenerator:
+            instances = [pregenerator.get(random_word, length, 'ab')
+                         for length in (5, 6) for _ in range(n)]
+            self.assertEqual([queue_size] * 2,
+                             list(pregenerator.pending().values()))
+        return instances
+
+    def testReproducible(self):
+        instances = self.generate(1, 10)
+        self.assertEqual(20, len(instances))
+        self.assertEqual([5] * 10 + [6] * 10, [len(i) for i in instances])
+        # the instances do not depend on the queues nor on the workers
+        self.assertEqual(instances, self.generate(1, 10, 1, 2))
+        self.assertNotEqual(instances, self.generate(2, 10))
+
+    def testGenerateInstance(self):
+        # without a pregenerator, the function is called on the spot
+        random.seed(3)
+        word = pregeneration.generate_instance(random_word, 8, 'abc')
+        random.seed(3)
+        self.assertEqual(random_word(8, 'abc'), word)
+        with pregeneration.InstancePregenerator(1, 2) as pregenerator:
+            pregeneration.set_pregenerator(pregenerator)
+            try:
+                words = [pregeneration.generate_instance(random_word, 5, 'ab')
+                         for _ in range(10)]
+            finally:
+                pregeneration.set_pregenerator(None)
+        self.assertEqual(self.generate(1, 10)[:10], words)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+# Copyright (c) 2016-present, Facebook, Inc.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree. An additional grant
+# of patent rights can be found in the PATENTS file in the same directory.
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import io
+import unittest
+import core.task as task
+import core.serializer as serializer
+import core.environment as environment
+from core.profiler import StepProfiler, PhaseStats
+
+
+class EchoTask(task.Task):
+    def __init__(self):
+        super(EchoTask, self).__init__(max_time=100)
+
+    @task.on_start()
+    def start_handler(self, event):
+        self.set_message('say a.')
+
+    @task.on_message(r'a$')
+    def message_handler(self, event):
+        self.set_result(1, 'good.')
+
+
+class SingleTaskScheduler():
+    def __init__(self, task):
+        self.task = task
+
+    def get_next_task(self):
+        return self.task
+
+    def reward(self, reward):
+        pass
+
+
+def create_environment():
+    return environment.Environment(serializer.StandardSerializer(),
+                                   SingleTaskScheduler(EchoTask()),
+                                   byte_mode=True)
+
+
+class TestStepProfiler(unittest.TestCase):
+    def testPhases(self):
+        learner_tokens = [None] + list(' a     ' * 100)
+        expected = create_environment().step_many(learner_tokens)
+        env = create_environment()
+        profiler = StepProfiler()
+        env.set_profiler(profiler)
+        # profiling does not change what happens
+        self.assertEqual(expected, env.step_many(learner_tokens))
+        stats = profiler.stats
+        n_steps = len(learner_tokens)
+        self.assertEqual(n_steps, sum(s.count for (_, phase, _), s
+                                      in stats.items() if phase == 'step'))
+        for phase in ('output', 'listener'):
+            self.assertEqual(n_steps, stats['EchoTask', phase, None].count)
+        # (the input is dropped in the steps between two tasks)
+        self.assertGreater(stats['EchoTask', 'input', None].count, 0)
+        self.assertLess(stats['EchoTask', 'input', None].count, n_steps)
+        self.assertGreater(stats['EchoTask', 'timeout', None].count, 0)
+        n_rewards = sum(1 for reward in expected[1] if reward)
+        self.assertGreaterEqual(
+            stats['EchoTask', 'handler', 'message_handler'].count, n_rewards)
+        self.assertGreaterEqual(
+            stats['EchoTask', 'trigger', 'message_handler'].count,
+            stats['EchoTask', 'handler', 'message_handler'].count)
+        out = io.StringIO()
+        profiler.report(out)
+        self.assertIn('handler message_handler', out.getvalue())
+
+    def testNestedTimeExcluded(self):
+        profiler = StepProfiler()
+        profiler.enter('step')
+        profiler.enter('input')
+        profiler.exit()
+        profiler.exit()
+        step = profiler.stats['-', 'step', None]
+        nested = profiler.stats['-', 'input', None]
+        self.assertEqual((1, 1), (step.count, nested.count))
+        self.assertGreaterEqual(step.total, 0)
+
+    def testQuantiles(self):
+        stats = PhaseStats()
+        for _ in range(99):
+            stats.add(3e-6)
+        stats.add(1e-3)
+        self.assertEqual(4e-6, stats.quantile(0.5))
+        self.assertEqual(1e-3, stats.quantile(1))
+
+
+def main():
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
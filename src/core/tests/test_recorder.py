@@ -0,0 +1,185 @@
+# Copyright (c) 2016-present, Facebook, Inc.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree. An additional grant
+# of patent rights can be found in the PATENTS file in the same directory.
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import os
+import random
+import shutil
+import tempfile
+import unittest
+import core.task as task
+import core.session as session
+import core.serializer as serializer
+import core.environment as environment
+import core.recorder as recorder
+from learners.base import BaseLearner
+
+
+class EchoTask(task.Task):
+    reward = 1
+
+    def __init__(self):
+        super(EchoTask, self).__init__(max_time=100)
+
+    @task.on_start()
+    def start_handler(self, event):
+        self.set_message('say a.')
+
+    @task.on_message(r'a$')
+    def message_handler(self, event):
+        # (the learner keeps talking while the feedback is given)
+        if not self.has_ended():
+            self.set_result(self.reward, 'good.')
+
+
+class SingleTaskScheduler():
+    def __init__(self, task):
+        self.task = task
+
+    def get_next_task(self):
+        return self.task
+
+    def reward(self, reward):
+        pass
+
+
+class RandomLearner(BaseLearner):
+    def __init__(self, byte_mode):
+        self.tokens = ' a' if byte_mode else '01'
+
+    def next(self, input):
+        return random.choice(self.tokens)
+
+
+def create_environment(byte_mode):
+    return environment.Environment(serializer.StandardSerializer(),
+                                   SingleTaskScheduler(EchoTask()),
+                                   byte_mode=byte_mode)
+
+
+class TestRecorder(unittest.TestCase):
+    n_steps = 1000
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def record(self, path, byte_mode, chunk_size, env=None):
+        random.seed(0)
+        env = env or create_environment(byte_mode)
+        s = session.Session(env, RandomLearner(byte_mode), 0)
+        episode_recorder = recorder.EpisodeRecorder(path, byte_mode,
+                                                    chunk_size, seed=0)
+        episode_recorder.attach(env, s)
+        steps = []
+        env_tokens = []
+        s.env_token_updated.register(env_tokens.append)
+
+        def on_learner_token(token):
+            steps.append((env_tokens[-1], token))
+        s.learner_token_updated.register(on_learner_token)
+
+        def on_time_updated(t):
+            if t >= self.n_steps:
+                s.stop()
+        s.total_time_updated.register(on_time_updated)
+        s.run()
+        episode_recorder.close()
+        return s, steps
+
+    def check_round_trip(self, byte_mode, chunk_size):
+        path = os.path.join(self.path, 'episode')
+        s, steps = self.record(path, byte_mode, chunk_size)
+        log = recorder.EpisodeLog(path)
+        try:
+            self.assertEqual(byte_mode, log.byte_mode)
+            self.assertEqual(0, log.seed)
+            self.assertEqual(self.n_steps, len(log))
+            recorded = list(log.steps())
+            self.assertEqual(steps, [step[:2] for step in recorded])
+            self.assertEqual(s.get_total_reward(),
+                             sum(step[2] for step in recorded))
+            # the first step starts the task
+            self.assertTrue(recorded[0][3])
+            self.assertEqual(sum(s.get_task_count().values()),
+                             sum(step[3] for step in recorded))
+
+            random.seed(0)
+            result = recorder.EpisodeReplayer(
+                log, create_environment(byte_mode)).run()
+            self.assertEqual((self.n_steps, s.get_total_reward(), None),
+                             result)
+        finally:
+            log.close()
+
+    def testByteMode(self):
+        self.check_round_trip(True, recorder.DEFAULT_CHUNK_SIZE)
+
+    def testBitMode(self):
+        self.check_round_trip(False, recorder.DEFAULT_CHUNK_SIZE)
+
+    def testChunks(self):
+        self.check_round_trip(True, 37)
+        self.check_round_trip(False, 37)
+
+    def testNoSeed(self):
+        path = os.path.join(self.path, 'episode')
+        recorder.EpisodeRecorder(path).close()
+        log = recorder.EpisodeLog(path)
+        try:
+            self.assertIsNone(log.seed)
+            self.assertEqual(0, len(log))
+        finally:
+            log.close()
+
+    def testRewards(self):
+        # the rewards are the ones of the steps, not differences of totals
+        class TenthTask(EchoTask):
+            reward = 0.1
+        path = os.path.join(self.path, 'episode')
+        env = environment.Environment(serializer.StandardSerializer(),
+                                      SingleTaskScheduler(TenthTask()),
+                                      byte_mode=True)
+        self.record(path, True, recorder.DEFAULT_CHUNK_SIZE, env)
+        log = recorder.EpisodeLog(path)
+        try:
+            rewards = [step[2] for step in log.steps() if step[2]]
+            self.assertTrue(len(rewards) > 2)
+            self.assertEqual([0.1] * len(rewards), rewards)
+        finally:
+            log.close()
+
+    def testDivergence(self):
+        path = os.path.join(self.path, 'episode')
+        self.record(path, True, 64)
+        log = recorder.EpisodeLog(path)
+        try:
+            # a task which says something else from the start
+            class OtherTask(EchoTask):
+                @task.on_start()
+                def start_handler(self, event):
+                    self.set_message('say b.')
+            env = environment.Environment(
+                serializer.StandardSerializer(),
+                SingleTaskScheduler(OtherTask()), byte_mode=True)
+            result = recorder.EpisodeReplayer(log, env).run()
+            self.assertEqual(4, result.divergence)
+            self.assertEqual(64, result.steps)
+        finally:
+            log.close()
+
+
+def main():
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
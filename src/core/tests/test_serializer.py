@@ -11,6 +11,7 @@ from __future__ import print_function
 from __future__ import unicode_literals
 import unittest
 import sys
+import random
 from core import serializer
 
 
@@ -42,6 +43,34 @@ class TestSerializer(unittest.TestCase):
                          [("a", "WORD"), (" ", 'SILENCE'), ('b', 'WORD'),
                           (' ', 'SILENCE'), ('.', 'PUNCT')])
 
+    def testBinaryTables(self):
+        slzr = serializer.StandardSerializer()
+        message = u"micro task feedback; \u03B1\u00e9 ok."
+        expected = ''.join(bin(b)[2:].zfill(8)
+                           for b in bytearray(message.encode('utf-8')))
+        self.assertEqual(expected, slzr.to_binary(message))
+        self.assertEqual(message, slzr.to_text(expected))
+        self.assertEqual(message, slzr.to_text(expected + '0101'))
+        self.assertIsNone(slzr.to_text('0101'))
+        self.assertEqual('', slzr.to_text('0101', strict=True))
+
+    def testRandomBitsRecovery(self):
+        slzr = serializer.StandardSerializer()
+        rng = random.Random(0)
+        for _ in range(200):
+            data = ''.join(rng.choice('01')
+                           for _ in range(rng.randint(0, 64)))
+            expected = None
+            for skip in range(len(data) // 8):
+                raw = bytearray(int(data[i:i + 8], 2) for i in
+                                range(skip * 8, len(data) - 7, 8))
+                try:
+                    expected = raw.decode('utf-8')
+                    break
+                except UnicodeDecodeError:
+                    pass
+            self.assertEqual(expected, slzr.to_text(data))
+
 
 def main():
     unittest.main()
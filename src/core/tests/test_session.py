@@ -93,6 +93,31 @@ class TestSession(unittest.TestCase):
 
         s.run()
 
+    def testHeadless(self):
+        env = environment.Environment(serializer.StandardSerializer(),
+                                      SingleTaskScheduler(NullTask()),
+                                      byte_mode=True)
+        learner = TryAllInputsLearner()
+        s = session.Session(env, learner)
+        steps_per_sec = s.run_headless(max_steps=300)
+        self.assertGreater(steps_per_sec, 0)
+        self.assertEqual(300, s.get_total_time())
+        self.assertEqual({'NullTask': 300}, dict(s.get_task_time()))
+        # observers still get notified
+        times = []
+        s.total_time_updated.register(times.append)
+        s.run_headless(max_steps=10)
+        self.assertEqual(list(range(300, 311)), times)
+
+    def testHeadlessTimeBudget(self):
+        env = environment.Environment(serializer.StandardSerializer(),
+                                      SingleTaskScheduler(NullTask()),
+                                      byte_mode=True)
+        s = session.Session(env, LearnerMock())
+        s.CLOCK_CHECK_INTERVAL = 10
+        s.run_headless(max_seconds=0)
+        self.assertEqual(10, s.get_total_time())
+
 
 class TryAllInputsLearner(BaseLearner):
     char = -1
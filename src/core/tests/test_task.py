@@ -52,6 +52,43 @@ class TestEvents(unittest.TestCase):
                          types[self.get_func(TestTask.timeout_handler)])
         self.assertEqual(task.Ended, types[self.get_func(TestTask.ended_handler)])
 
+    def testTriggerTableCache(self):
+        scans = []
+
+        class TestTask(task.Task):
+            def __init__(self, *args, **kwargs):
+                super(TestTask, self).__init__(*args, **kwargs)
+
+            @task.on_start()
+            def start_handler(self, event):
+                pass
+
+            def end_handler(self, event):
+                pass
+
+            def _find_triggers(self):
+                scans.append(self)
+                return super(TestTask, self)._find_triggers()
+
+        triggers = TestTask(max_time=10).get_triggers()
+        self.assertEqual(triggers, TestTask(max_time=10).get_triggers())
+        self.assertEqual(1, len(scans))
+        # a dynamic handler is not a method of the class: the table stays
+
+        def dynamic_handler(self, event):
+            pass
+        task.on_ended()(dynamic_handler)
+        self.assertEqual(triggers, TestTask(max_time=10).get_triggers())
+        del task.global_event_handlers[dynamic_handler]
+        self.assertEqual(triggers, TestTask(max_time=10).get_triggers())
+        self.assertEqual(1, len(scans))
+        # registering a method as a new handler invalidates the table
+        task.on_ended()(self.get_func(TestTask.end_handler))
+        self.assertEqual(2, len(TestTask(max_time=10).get_triggers()))
+        self.assertEqual(2, len(scans))
+        del task.global_event_handlers[self.get_func(TestTask.end_handler)]
+        self.assertEqual(triggers, TestTask(max_time=10).get_triggers())
+
     def testInheritance(self):
         class BaseTask(task.Task):
             def __init__(self, *args, **kwargs):
@@ -0,0 +1,86 @@
+# Copyright (c) 2016-present, Facebook, Inc.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree. An additional grant
+# of patent rights can be found in the PATENTS file in the same directory.
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import os
+import random
+import unittest
+import core.vec_environment as vec_environment
+
+TASKS_CONFIG = os.path.join(os.path.dirname(__file__), '..', '..',
+                            'tasks_config.challenge.json')
+
+
+class TestVecEnvironment(unittest.TestCase):
+
+    def do_test_matches_environment(self, byte_mode):
+        n_envs = 2
+        n_steps = 200
+        seed = 1234
+        vec_env = vec_environment.VecEnvironment(
+            TASKS_CONFIG, n_envs, n_workers=n_envs, byte_mode=byte_mode,
+            seed=seed)
+        try:
+            # the learner always says the same token
+            token = ord(' ') if byte_mode else 0
+            vec_outputs = [vec_env.reset()]
+            vec_rewards = []
+            vec_switches = []
+            for _ in range(n_steps):
+                outputs, rewards, task_switches = vec_env.step(
+                    [token] * n_envs)
+                vec_outputs.append(outputs)
+                vec_rewards.append(rewards)
+                vec_switches.append(task_switches)
+        finally:
+            vec_env.close()
+        # each worker runs its environment as it would run in-process
+        for i in range(n_envs):
+            random.seed(seed + i)
+            env = vec_environment.create_environment(TASKS_CONFIG, byte_mode)
+            learner_token = vec_environment.decode_token(token, byte_mode)
+            output, reward = env.next(None)
+            self.assertEqual(vec_outputs[0][i],
+                             vec_environment.encode_token(output, byte_mode))
+            for t in range(n_steps):
+                switches = env._task_switch_count
+                output, reward = env.next(learner_token)
+                self.assertEqual(
+                    vec_outputs[t + 1][i],
+                    vec_environment.encode_token(output, byte_mode))
+                self.assertEqual(vec_rewards[t][i], reward)
+                self.assertEqual(vec_switches[t][i],
+                                 env._task_switch_count != switches)
+
+    def testByteMode(self):
+        self.do_test_matches_environment(True)
+
+    def testBitMode(self):
+        self.do_test_matches_environment(False)
+
+    def testErrors(self):
+        vec_env = vec_environment.VecEnvironment(TASKS_CONFIG, 3, n_workers=2)
+        try:
+            self.assertRaises(RuntimeError, vec_env.step, b'   ')
+            self.assertEqual(3, len(vec_env.reset()))
+            self.assertRaises(ValueError, vec_env.step, b'  ')
+            # the environment rejects characters out of the byte range
+            self.assertRaises(RuntimeError, vec_env.step, [0x3b1] * 3)
+            outputs, rewards, task_switches = vec_env.step(b'   ')
+            self.assertEqual(3, len(outputs))
+        finally:
+            vec_env.close()
+
+
+def main():
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+# Copyright (c) 2016-present, Facebook, Inc.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree. An additional grant
+# of patent rights can be found in the PATENTS file in the same directory.
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import logging
+import multiprocessing
+import random
+import traceback
+
+from core.config_loader import create_tasks_from_config
+from core.environment import Environment
+from core.serializer import StandardSerializer
+
+# learner token standing for "no token" (the first step after a reset)
+NO_TOKEN = -1
+
+# commands sent to the workers (the data itself goes through shared memory)
+_RESET = b'r'
+_STEP = b's'
+_CLOSE = b'c'
+_OK = b'k'
+
+
+def create_environment(tasks_config_file, byte_mode=True, scramble=False,
+                       max_reward_per_task=2147483647):
+    '''Creates an Environment with its own task scheduler, built from the
+    given tasks configuration file (as run.py does).'''
+    return Environment(StandardSerializer(),
+                       create_tasks_from_config(tasks_config_file),
+                       scramble, max_reward_per_task, byte_mode)
+
+
+def encode_token(token, byte_mode):
+    '''Maps a token of the environment to the integer in the shared
+    arrays: the character code in byte mode, the bit value in bit mode.'''
+    return ord(token) if byte_mode else int(token)
+
+
+def decode_token(code, byte_mode):
+    '''Inverse of encode_token (NO_TOKEN becomes None).'''
+    if code == NO_TOKEN:
+        return None
+    return chr(code) if byte_mode else '1' if code else '0'
+
+
+class VecEnvironment(object):
+    '''
+    Runs N independent environments, each one with its own task scheduler
+    built from the same tasks configuration file, in worker processes.
+
+    Learner tokens, environment tokens, rewards and task switch flags are
+    exchanged through shared-memory arrays (available as the `learner_tokens`,
+    `outputs`, `rewards` and `task_switches` attributes, which support the
+    buffer protocol), so only a one-byte command travels through the pipes.
+    Tokens are integers: character codes in byte mode and bit values in bit
+    mode.
+
+    :param tasks_config_file: json or python tasks configuration file.
+    :param n_envs: number of environments.
+    :param n_workers: number of worker processes (by default, one per
+        environment up to the number of CPUs). Each of them steps a
+        contiguous slice of the environments.
+    :param seed: if given, each worker seeds the random module with it plus
+        the index of its first environment, otherwise from the OS.
+    '''
+    def __init__(self, tasks_config_file, n_envs, n_workers=None,
+                 byte_mode=True, scramble=False,
+                 max_reward_per_task=2147483647, seed=None):
+        if n_envs < 1:
+            raise ValueError("At least one environment is needed")
+        if n_workers is None:
+            n_workers = multiprocessing.cpu_count()
+        n_workers = max(1, min(n_workers, n_envs))
+        self.n_envs = n_envs
+        self.byte_mode = byte_mode
+        self.logger = logging.getLogger(__name__)
+        self.learner_tokens = multiprocessing.RawArray('i', n_envs)
+        self.outputs = multiprocessing.RawArray('i', n_envs)
+        self.rewards = multiprocessing.RawArray('d', n_envs)
+        self.task_switches = multiprocessing.RawArray('b', n_envs)
+        self._connections = []
+        self._workers = []
+        for i in range(n_workers):
+            start = i * n_envs // n_workers
+            stop = (i + 1) * n_envs // n_workers
+            connection, worker_connection = multiprocessing.Pipe()
+            worker = multiprocessing.Process(
+                target=_run_worker,
+                args=(worker_connection, tasks_config_file, start, stop,
+                      self.learner_tokens, self.outputs, self.rewards,
+                      self.task_switches, byte_mode, scramble,
+                      max_reward_per_task,
+                      None if seed is None else seed + start))
+            worker.daemon = True
+            worker.start()
+            worker_connection.close()
+            self._connections.append(connection)
+            self._workers.append(worker)
+        self._needs_reset = True
+
+    def reset(self):
+        '''(Re)creates all the environments and runs their first step
+        (without any learner token). Returns the list of tokens they
+        output.'''
+        self._command(_RESET)
+        self._needs_reset = False
+        return self.outputs[:]
+
+    def step(self, tokens):
+        '''Sends one learner token to each environment and runs one step on
+        all of them.
+
+        :param tokens: a sequence of `n_envs` integer tokens, or a bytes-like
+            buffer with one token per byte.
+        :returns: a tuple ``(outputs, rewards, task_switches)`` of lists with
+            the token output by each environment, its reward, and whether it
+            started a new task during the step.
+        '''
+        if self._needs_reset:
+            raise RuntimeError("reset() must be called before step()")
+        if isinstance(tokens, (bytes, bytearray, memoryview)):
+            tokens = bytearray(tokens)
+        if len(tokens) != self.n_envs:
+            raise ValueError("Expected {0} tokens, got {1}".format(
+                self.n_envs, len(tokens)))
+        self.learner_tokens[:] = tokens
+        self._command(_STEP)
+        return (self.outputs[:], self.rewards[:],
+                [bool(s) for s in self.task_switches])
+
+    def close(self):
+        '''Stops the worker processes.'''
+        for connection in self._connections:
+            try:
+                connection.send_bytes(_CLOSE)
+            except (IOError, OSError):
+                # the worker is already gone
+                pass
+            connection.close()
+        for worker in self._workers:
+            worker.join()
+        self._connections = []
+        self._workers = []
+
+    def _command(self, command):
+        # all the workers run the command in parallel
+        for connection in self._connections:
+            connection.send_bytes(command)
+        errors = []
+        for connection in self._connections:
+            reply = connection.recv_bytes()
+            if reply != _OK:
+                errors.append(reply.decode('utf-8'))
+        if errors:
+            raise RuntimeError("Environment worker failed:\n{0}".format(
+                '\n'.join(errors)))
+
+
+def _run_worker(connection, tasks_config_file, start, stop, learner_tokens,
+                outputs, rewards, task_switches, byte_mode, scramble,
+                max_reward_per_task, seed):
+    '''Main loop of a worker process, stepping environments [start, stop)
+    on request.'''
+    # forked workers inherit the random state: make them diverge
+    random.seed(seed)
+    envs = []
+    while True:
+        command = connection.recv_bytes()
+        if command == _CLOSE:
+            break
+        try:
+            if command == _RESET:
+                envs = [create_environment(tasks_config_file, byte_mode,
+                                           scramble, max_reward_per_task)
+                        for _ in range(start, stop)]
+            for i, env in enumerate(envs, start):
+                if command == _RESET:
+                    learner_token = None
+                else:
+                    learner_token = decode_token(learner_tokens[i], byte_mode)
+                switch_count = env._task_switch_count
+                output, reward = env.next(learner_token)
+                outputs[i] = encode_token(output, byte_mode)
+                rewards[i] = reward
+                task_switches[i] = env._task_switch_count != switch_count
+            connection.send_bytes(_OK)
+        except Exception:
+            connection.send_bytes(traceback.format_exc().encode('utf-8'))
+    connection.close()
@@ -1,5 +1,273 @@
-from FAdo.fa import *
+import copy
 import math
+import random
+import threading
+
+from core.cache import LRUCache
+
+
+class NgramMatcher(object):
+    """
+    Matcher of a table of n-grams, compiled into tables.
+
+    The n-grams form a trie-like NFA without any loops (one chain of states per n-gram, numbered from 1 in the
+    order of the table, the initial state being 0). Looping on the initial state makes it a matcher, which finds the
+    n-grams anywhere in a string. The states of its determinization are the sets of NFA states reachable after
+    reading a string (they always contain the initial state), and are numbered from 0 (just the initial state): this
+    is the Aho-Corasick automaton of the n-grams, with its failure transitions resolved into a dense transition
+    array over the 26 uppercase letters (plus one column for any other symbol, which goes back to the initial state).
+    """
+
+    sigma = [chr(ord('A') + i) for i in range(26)]
+    _sigma_index = dict((symbol, i) for i, symbol in enumerate(sigma))
+
+    def __init__(self, ngram_table):
+        # the NFA: the targets of the initial state for each symbol, the transition (symbol, target) of the other
+        # non-final states, the distance of each state from the initial state, the final states, and the symbols
+        # of the n-grams (in order, with repetitions)
+        self.initial_delta = {}
+        self.chain_delta = {}
+        self.state_depth_dict = {0: 0}
+        self.final = set()
+        self.alphabet = []
+        state = 1
+        for string in ngram_table:
+            source_state = 0
+            for i in range(len(string)):
+                if source_state == 0:
+                    self.initial_delta.setdefault(string[i], []).append(state)
+                else:
+                    self.chain_delta[source_state] = (string[i], state)
+                self.alphabet.append(string[i])
+                self.state_depth_dict[state] = i + 1
+                if i == len(string) - 1:
+                    self.final.add(state)
+                source_state = state
+                state += 1
+        self.symbol_index = self._sigma_index
+        extra_symbols = set(self.alphabet).difference(self._sigma_index)
+        if extra_symbols:
+            self.symbol_index = dict(self._sigma_index)
+            for symbol in sorted(extra_symbols):
+                self.symbol_index[symbol] = len(self.symbol_index)
+        self.other_symbol = len(self.symbol_index)
+        self._determinize()
+
+    def _determinize(self):
+        """
+        builds the tables of the states reachable from the initial one
+        """
+        # NFA states in each state, NFA final states in it and the largest depth among them (0 if there are none),
+        # (depth, symbols) of the NFA states of each state with outgoing transitions, and transitions
+        self.states = []
+        self.finals = []
+        self.final_depth = []
+        self.outgoing = []
+        self.transitions = []
+        state_ids = {}
+
+        def add_state(nfa_states):
+            state_ids[nfa_states] = len(self.states)
+            self.states.append(nfa_states)
+            return state_ids[nfa_states]
+
+        add_state(frozenset([0]))
+        # any state goes where the initial state goes, and then maybe further along the chains of its NFA states
+        initial_targets = dict((symbol, frozenset(targets + [0])) for symbol, targets in self.initial_delta.items())
+        initial_row = [0] * (self.other_symbol + 1)
+        for symbol, targets in initial_targets.items():
+            initial_row[self.symbol_index[symbol]] = state_ids.get(targets) or add_state(targets)
+        i = 0
+        while i < len(self.states):
+            nfa_states = self.states[i]
+            finals = [s for s in nfa_states if s in self.final]
+            self.finals.append(frozenset(finals))
+            self.final_depth.append(max([self.state_depth_dict[f] for f in finals]) if finals else 0)
+            outgoing = []
+            chain_targets = {}
+            for s in nfa_states:
+                if s == 0:
+                    if self.initial_delta:
+                        outgoing.append((0, list(self.initial_delta)))
+                elif s in self.chain_delta:
+                    symbol, target = self.chain_delta[s]
+                    outgoing.append((self.state_depth_dict[s], [symbol]))
+                    chain_targets.setdefault(symbol, []).append(target)
+            self.outgoing.append(outgoing)
+            row = list(initial_row)
+            for symbol, targets in chain_targets.items():
+                targets = initial_targets[symbol].union(targets) if symbol in initial_targets \
+                    else frozenset(targets + [0])
+                row[self.symbol_index[symbol]] = state_ids.get(targets) or add_state(targets)
+            self.transitions.append(row)
+            i += 1
+
+    def next_state(self, state, symbol):
+        """
+        :return: the state reached from the given one with the symbol
+        """
+        return self.transitions[state][self.symbol_index.get(symbol, self.other_symbol)]
+
+    def get_available_transition_symbols(self, state, min_depth):
+        """
+        :return: the set of symbols of the transitions from the NFA states of at least min_depth in the given state
+        """
+        symbols = set()
+        for depth, state_symbols in self.outgoing[state]:
+            if depth >= min_depth:
+                symbols.update(state_symbols)
+        return symbols
+
+    def has_final(self, state, min_depth=1):
+        """
+        :return: whether the state contains a final NFA state of at least min_depth (final states have a depth of 1
+        or more)
+        """
+        return self.final_depth[state] >= max(min_depth, 1)
+
+    def find_ngram(self, string):
+        """
+        :return: whether any n-gram occurs in the string
+        """
+        transitions = self.transitions
+        final_depth = self.final_depth
+        index = self.symbol_index
+        other = self.other_symbol
+        state = 0
+        for symbol in string:
+            state = transitions[state][index.get(symbol, other)]
+            if final_depth[state]:
+                return True  # a single match is enough
+        return False
+
+
+class UniformStringSampler(object):
+    """
+    Draws strings of a given length uniformly among all the strings of uppercase letters of that length that a
+    MiniTasksAutomaton accepts (or among all those it rejects), without retries.
+
+    is_string_correct is simulated by the product of the compiled positive and negative matchers, whose states also
+    keep the number of characters not yet covered by a positive n-gram (when everything has to be covered) and the
+    final states not yet visited (when all the n-grams are required). The strings accepted from each of its states
+    are counted by dynamic programming on the length, and a string is drawn by unranking a single random number
+    against those counts. The letters that occur in no n-gram all behave the same, so they are handled as a single
+    class.
+    """
+
+    _dead = None
+
+    def __init__(self, automaton):
+        self._positive = automaton.positive_automaton
+        self._negative = automaton.negative_automaton
+        self._require_all = automaton.logical_op == automaton._and_string
+        self._require_cover = not automaton.anything_allowed
+        self._max_depth = max(self._positive.state_depth_dict.values())
+        symbols = set(self._positive.alphabet).union(self._negative.alphabet)
+        # (the automata only see uppercase letters)
+        self._classes = [[symbol] for symbol in NgramMatcher.sigma if symbol in symbols]
+        others = [symbol for symbol in NgramMatcher.sigma if symbol not in symbols]
+        if others:
+            self._classes.append(others)
+        self._n_symbols = len(NgramMatcher.sigma)
+        initial = (0, 0, frozenset(self._positive.final) if self._require_all else frozenset(), 0)
+        self._states = [self._dead, initial]
+        self._transitions = [[0] * len(self._classes)]
+        self._explore()
+        # number of strings of each length accepted from each state (extended as longer strings are asked for, by
+        # any of the threads sharing the sampler)
+        self._counts = [[int(self._is_accepting(state)) for state in self._states]]
+        self._counts_lock = threading.Lock()
+
+    def _step(self, state, symbol):
+        positive_state, uncovered, missing, negative_state = state
+        negative_state = self._negative.next_state(negative_state, symbol)
+        if self._negative.final_depth[negative_state]:
+            return self._dead  # rejected whatever comes next
+        positive_state = self._positive.next_state(positive_state, symbol)
+        if self._require_cover:
+            # as in _eval_positive, the uncovered characters get covered by an n-gram ending here if it is long enough
+            if self._positive.final_depth[positive_state] >= uncovered + 1:
+                uncovered = 0
+            else:
+                uncovered += 1
+                if uncovered >= self._max_depth:
+                    return self._dead  # no n-gram can cover them anymore
+        if missing:
+            missing = missing.difference(self._positive.finals[positive_state])
+        return positive_state, uncovered, missing, negative_state
+
+    def _is_accepting(self, state):
+        return state is not self._dead and state[1] == 0 and not state[2]
+
+    def _explore(self):
+        """
+        finds the states reachable from the initial one and their transitions for each class of symbols
+        """
+        state_ids = {self._dead: 0, self._states[1]: 1}
+        i = 1
+        while i < len(self._states):
+            row = []
+            for symbols in self._classes:
+                target = self._step(self._states[i], symbols[0])
+                if target not in state_ids:
+                    state_ids[target] = len(self._states)
+                    self._states.append(target)
+                row.append(state_ids[target])
+            self._transitions.append(row)
+            i += 1
+
+    def _count(self, length):
+        """
+        :return: the number of accepted strings of the given length from each state
+        """
+        if len(self._counts) <= length:
+            with self._counts_lock:
+                while len(self._counts) <= length:
+                    previous = self._counts[-1]
+                    weights = [len(symbols) for symbols in self._classes]
+                    self._counts.append([sum(weight * previous[target] for weight, target in zip(weights, row))
+                                         for row in self._transitions])
+        return self._counts[length]
+
+    def count(self, length, correct=True):
+        """
+        :return: the number of strings of the given length that are correct (or wrong)
+        """
+        accepted = self._count(length)[1]
+        return accepted if correct else self._n_symbols ** length - accepted
+
+    def sample(self, length, correct=True, count=1):
+        """
+        draws strings uniformly among the correct (or wrong) strings of the given length
+        :param length:
+        :param correct: whether to draw correct strings or wrong ones
+        :param count: the number of strings to draw (independently)
+        :return: the list of strings (empty if there is no such string)
+        """
+        total = self.count(length, correct)
+        if total == 0:
+            return []
+        for k in range(length + 1):
+            self._count(k)
+        return [self._unrank(random.randrange(total), length, correct) for _ in range(count)]
+
+    def _unrank(self, rank, length, correct):
+        """
+        :return: the string with the given rank among the correct (or wrong) strings of the given length
+        """
+        chrs = []
+        state = 1
+        for remaining in range(length - 1, -1, -1):
+            counts = self._counts[remaining]
+            for symbols, target in zip(self._classes, self._transitions[state]):
+                n = counts[target] if correct else self._n_symbols ** remaining - counts[target]
+                if rank < n * len(symbols):
+                    chrs.append(symbols[rank // n])
+                    rank %= n
+                    state = target
+                    break
+                rank -= n * len(symbols)
+        return ''.join(chrs)
 
 
 class MiniTasksAutomaton(object):
@@ -25,6 +293,8 @@ class MiniTasksAutomaton(object):
         self.negative_automaton, self.negative_state_depth_dict, self.negative_alphabet = self._build_automaton(self.negative_table)
         self.remaining_alphabet = set(self._sigma).difference(self.positive_alphabet).difference(self.negative_alphabet)
         #self._distribute_remaining_alphabet_symbols()
+        # UniformStringSampler for each logical operation, built when needed (and shared by the copies)
+        self._samplers = {}
 
     def _distribute_remaining_alphabet_symbols(self):
         """
@@ -45,50 +315,28 @@ class MiniTasksAutomaton(object):
                 self.negative_alphabet.append(symbol)
         return
 
-    def _is_in_final_state(self, automaton, state):
-        for f in automaton.Final:
-            if f in state:
-                return True
-        return False
-
-    def _is_in_final_state_with_sufficient_depth(self, automaton, state, state_depth_table, min_depth):
-        for f in automaton.Final:
-            if f in state:
-                if state_depth_table[f] >= min_depth:
-                    return True
-        return False
-
     def _build_automaton(self, ngram_table):
         """
-        # builds a trie-like automaton without any loops
+        # builds a matcher of the n-grams (see NgramMatcher)
         :param ngram_table: the ngrams which will form the trie
         :return: automaton, association table from state to its distance from initial state, alphabet of the n-grams
         """
-        nfa = NFA()
-
-        nfa.setSigma(self._sigma)
-        initial_state = 0
-        state_depth_dict = {initial_state: 0}
-        nfa.addState(initial_state)
-        nfa.addInitial(initial_state)
-        state = 1
-        alphabet = []
-
-        for string in ngram_table:
-            source_state = initial_state
-
-            for i in range(len(string)):
-                # loop on initial state is added during usage of the automaton to increase efficiency
-                nfa.addState(state)
-                nfa.addTransition(source_state, string[i], state)
-                alphabet.append(string[i])
-                state_depth_dict[state] = i + 1
-                if i == len(string) - 1:
-                    nfa.addFinal(state)
-                source_state = state
-                state += 1
+        matcher = NgramMatcher(ngram_table)
+        # (the alphabet gets shuffled while generating, the matcher keeps its own)
+        return matcher, matcher.state_depth_dict, list(matcher.alphabet)  # state_depth_dict will be useful for accepting
 
-        return nfa, state_depth_dict, alphabet  # state_depth_dict will be useful for accepting
+    def copy(self, logical_op):
+        """
+        makes an automaton for the same description, sharing the compiled n-gram matchers (which are never modified)
+        :param logical_op:
+        :return: the new automaton
+        """
+        other = copy.copy(self)
+        other.logical_op = logical_op
+        # the generation shuffles the alphabets in place
+        other.positive_alphabet = list(self.positive_alphabet)
+        other.negative_alphabet = list(self.negative_alphabet)
+        return other
 
     def _parse_positive_from_description(self):
         """
@@ -144,31 +392,6 @@ class MiniTasksAutomaton(object):
 
         return False
 
-    def _get_available_transition_symbols(self, automaton, state_depth_dict, from_states, min_depth):
-        """
-        computes which symbols are available for making a transition if the reachable states are at least of min_depth
-        assumes epsilon-closure has been performed on the from_states
-        assumes a trie-like structure of states
-        :param automaton:
-        :param state_depth_dict:
-        :param from_states:
-        :param min_depth:
-        :return: the set of symbols
-        """
-        assert(len(from_states) != 0)
-        symbols = set()
-        for state in from_states:
-            if state_depth_dict[state] < min_depth:
-                continue
-            if state not in automaton.delta:
-                continue
-            transition = automaton.delta[state]
-            assert len(transition) > 0
-            for symbol in transition:
-                symbols.add(symbol)  # assumes the target state has a greater depth than the source state
-
-        return symbols
-
     def _get_correct_not_string(self, length, current_chrs):
         """
         this function simulates a negative automaton (automaton for not strings) and if it should make
@@ -182,21 +405,20 @@ class MiniTasksAutomaton(object):
         """
         chrs = []
         automaton = self.negative_automaton
-        state = automaton.epsilonClosure(automaton.Initial)
-        initial = state.copy()
+        state = 0
 
         # to avoid a bug that it puts two almost not strings together to form a full not string
         for c in current_chrs:
-            state = automaton.evalSymbol(state, c).union(initial)
+            state = automaton.next_state(state, c)
 
         alphabet_to_use = self.negative_alphabet
 
         for pos in range(length):
             random.shuffle(alphabet_to_use)
             for symbol in alphabet_to_use:
-                try_state = automaton.evalSymbol(state, symbol)
-                if not self._is_in_final_state(automaton, try_state):
-                    state = try_state.union(initial)  # loop to be a matcher automaton
+                try_state = automaton.next_state(state, symbol)
+                if not automaton.has_final(try_state):
+                    state = try_state
                     chrs.append(symbol)
                     break
 
@@ -215,16 +437,15 @@ class MiniTasksAutomaton(object):
         """
         chrs = []
         automaton = self.positive_automaton
-        initial = automaton.epsilonClosure(automaton.Initial)
 
         alphabet_to_use = self.positive_alphabet
 
         for pos in range(length):
             random.shuffle(alphabet_to_use)
             for symbol in alphabet_to_use:
-                try_state = automaton.evalSymbol(state, symbol)
-                if not self._is_in_final_state(automaton, try_state):
-                    state = try_state.union(initial)  # loop to be a matcher automaton
+                try_state = automaton.next_state(state, symbol)
+                if not automaton.has_final(try_state):
+                    state = try_state
                     chrs.append(symbol)
                     break
 
@@ -246,17 +467,44 @@ class MiniTasksAutomaton(object):
 
         return chrs
 
-    def get_correct_string(self, length):
+    def get_correct_string(self, length, uniform=False):
         """
         Generate a string accepted by the automaton
+        :param length: approximate length of the string (exact length if uniform)
+        :param uniform: whether to draw it uniformly among the correct strings of the given length (if there is none,
+        it is generated as usual)
         :return: the generated string
         """
+        if uniform:
+            strings = self.sample_strings(length, True)
+            if strings:
+                return strings[0]
         return self._get_string(length)
 
+    def get_sampler(self):
+        """
+        :return: the UniformStringSampler of the automaton
+        """
+        sampler = self._samplers.get(self.logical_op)
+        if sampler is None:
+            # the copies of a cached automaton share their samplers: keep the first one built
+            sampler = self._samplers.setdefault(self.logical_op, UniformStringSampler(self))
+        return sampler
+
+    def sample_strings(self, length, correct=True, count=1):
+        """
+        Draw strings uniformly among the correct (or wrong) strings of the given length
+        :param length:
+        :param correct:
+        :param count: the number of strings to draw
+        :return: the list of strings (empty if there is no such string)
+        """
+        return self.get_sampler().sample(length, correct, count)
+
     def _find_symbol_which_leads_to_earliest_state(self, automaton, state, symbols, states_to_try):
         for possible_state in states_to_try:
             for symbol in symbols:
-                target = automaton.evalSymbol(state, symbol)
+                target = automaton.states[automaton.next_state(state, symbol)]
                 if possible_state in target:
                     return symbol
         return None
@@ -270,9 +518,8 @@ class MiniTasksAutomaton(object):
         """
         current = last_confirmed = -1  # the symbols get confirmed up to current when a final state is visited
         automaton = self.positive_automaton
-        state = automaton.epsilonClosure(automaton.Initial)
-        initial = state.copy()
-        missing_states = automaton.Final.copy()  # when doing "and" generation, all final states must be visited
+        state = 0
+        missing_states = automaton.final.copy()  # when doing "and" generation, all final states must be visited
         chrs = []  # will hold the generated string
         attractor_state = None  # useful when doing "and" generation and we want to force visiting certain final state
 
@@ -286,16 +533,15 @@ class MiniTasksAutomaton(object):
                     # random: do not insert the "anything" strings always
                     if random.random() > 0.5 or len(self.negative_table) == 0:
                         newchrs = self._get_correct_anything_string_simple(int(math.ceil(random.random() * 5)))
-                        state = initial.copy()
+                        state = 0
                     else:
                         newchrs = self._get_correct_not_string(int(math.ceil(random.random() * 5)), chrs)
-                        state = initial.copy()
+                        state = 0
                     current = last_confirmed = current + len(newchrs)
                     chrs.extend(newchrs)
 
             if len(self.positive_table) > 0:
-                symbols = self._get_available_transition_symbols(automaton, self.positive_state_depth_dict, state,
-                                                                 current - last_confirmed)
+                symbols = automaton.get_available_transition_symbols(state, current - last_confirmed)
 
                 next_symbol = None
                 pick_next_symbol_randomly = True
@@ -319,9 +565,7 @@ class MiniTasksAutomaton(object):
 
                     else:
                         if self.anything_allowed \
-                                or self._is_in_final_state_with_sufficient_depth(automaton, state,
-                                                                                 self.positive_state_depth_dict,
-                                                                                 current-last_confirmed+1):
+                                or automaton.has_final(state, current-last_confirmed+1):
                             # finish generating only after generating the rest of the last n-gram
                             break
 
@@ -331,12 +575,11 @@ class MiniTasksAutomaton(object):
                     assert(len(symbols) > 0)
                     next_symbol = random.sample(symbols, 1)[0]
 
-                state = automaton.evalSymbol(state, next_symbol).union(initial)
-                missing_states = missing_states.difference(state)
+                state = automaton.next_state(state, next_symbol)
+                missing_states = missing_states.difference(automaton.finals[state])
                 chrs.append(next_symbol)
                 current += 1
-                if self._is_in_final_state_with_sufficient_depth(automaton, state, self.positive_state_depth_dict,
-                                                                 current-last_confirmed):
+                if automaton.has_final(state, current-last_confirmed):
                     confirm_last_pick = True
 
                 if confirm_last_pick:
@@ -389,7 +632,7 @@ class MiniTasksAutomaton(object):
         :return:
         """
 
-        if len(self.negative_table) == 0 and len(self.positive_automaton.Final) == 0:
+        if len(self.negative_table) == 0 and len(self.positive_automaton.final) == 0:
             return ""  # can happen if there's just "anything" as the language description
 
         insert_not_string = False
@@ -483,14 +726,20 @@ class MiniTasksAutomaton(object):
         assert(not self.is_string_correct(string))
         return string
 
-    def get_wrong_string(self, length, randomization=1.0):
+    def get_wrong_string(self, length, randomization=1.0, uniform=False):
         """
         returns a string not accepted by function is_string_correct
         :param randomization:
+        :param uniform: whether to draw it uniformly among the wrong strings of the given length (if there is none,
+        it is generated as usual)
         :return:
         """
         string = None
-        if(randomization == 1.0):
+        if uniform:
+            strings = self.sample_strings(length, False)
+            if strings:
+                string = strings[0]
+        elif(randomization == 1.0):
             string = self._get_random_wrong_string(length)
         if(string == None):
             string = self._get_almost_correct_string(length)
@@ -505,24 +754,26 @@ class MiniTasksAutomaton(object):
 
         require_all = self.logical_op == self._and_string
         if require_all:
-            missing_final_states = set(self.positive_automaton.Final)
+            missing_final_states = set(self.positive_automaton.final)
 
         automaton = self.positive_automaton
-        ilist = automaton.epsilonClosure(automaton.Initial)
-        initial = ilist.copy()
+        transitions = automaton.transitions
+        final_depth = automaton.final_depth
+        index = automaton.symbol_index
+        other = automaton.other_symbol
+        state = 0
         last_confirmed = -1
 
-        for i in range(len(string)):
-            ilist = automaton.evalSymbol(ilist, string[i]).union(initial)  # loop here to be a matcher automaton
-            if not ilist:
-                return False
-            for f in automaton.Final:
-                if f in ilist:
-                    if require_all:
-                        missing_final_states.discard(f)
-                    if last_confirmed + self.positive_state_depth_dict[f] >= i:
-                        # > condition is true if there's more than one match
-                        last_confirmed = i  # there is no unmatched character in word up to position i
+        for i, symbol in enumerate(string):
+            # (the states always contain the initial state of the NFA, so they are never empty)
+            state = transitions[state][index.get(symbol, other)]
+            depth = final_depth[state]
+            if depth:
+                if require_all:
+                    missing_final_states.difference_update(automaton.finals[state])
+                if last_confirmed + depth >= i:
+                    # > condition is true if there's more than one match
+                    last_confirmed = i  # there is no unmatched character in word up to position i
 
         if last_confirmed + 1 != len(string) and not self.anything_allowed:
             # there is an unmatched character at position last_confirmed + 1
@@ -540,15 +791,7 @@ class MiniTasksAutomaton(object):
         :rtype: bool
         """
 
-        automaton = self.negative_automaton
-        ilist = automaton.epsilonClosure(automaton.Initial)
-        initial = ilist.copy()
-
-        for i in range(len(string)):
-            ilist = automaton.evalSymbol(ilist, string[i]).union(initial)  # loop here to be a matcher automaton
-            if self._is_in_final_state(automaton, ilist):
-                return True  # a single match is enough
-        return False
+        return self.negative_automaton.find_ngram(string)
 
     def is_string_correct(self, string):
         """
@@ -567,14 +810,43 @@ class MiniTasksAutomaton(object):
         return True
 
 
+# the compiled automata of the descriptions built lately (the mini tasks draw short descriptions over 26 letters,
+# which repeat often)
+AUTOMATON_CACHE_SIZE = 1024
+_automaton_cache = LRUCache(AUTOMATON_CACHE_SIZE)
+
+
 def build_automaton(description, logical_op):
     """
     builds an automaton that is used for generating and recognizing the given language
+    (the parsing and the compilation of the description are cached)
     :param description:
     :param logical_op:
     :return:
     """
-    return MiniTasksAutomaton(description, logical_op)
+    template = _automaton_cache.get(description)
+    if template is None:
+        template = MiniTasksAutomaton(description, logical_op)
+        _automaton_cache.put(description, template)
+    return template.copy(logical_op)
+
+
+def automaton_cache_info():
+    """
+    :return: the CacheInfo (hits, misses, evictions, maximum and current size) of the cache of build_automaton
+    """
+    return _automaton_cache.info()
+
+
+def clear_automaton_cache(maxsize=None):
+    """
+    empties the cache of build_automaton and resets its counters
+    :param maxsize: new maximum number of automata kept (None to keep the current one)
+    :return: None
+    """
+    _automaton_cache.clear()
+    if maxsize is not None:
+        _automaton_cache.maxsize = maxsize
 
 # obj = build_automaton("ZJA J Y","or")
 # obj.is_string_correct("ZJAJD")
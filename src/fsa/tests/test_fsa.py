@@ -1,6 +1,56 @@
+import itertools
 import random
+import threading
 import unittest
-from src.fsa import build_automaton
+from FAdo.fa import NFA
+from src.fsa import build_automaton, automaton_cache_info, clear_automaton_cache, AUTOMATON_CACHE_SIZE, NgramMatcher, \
+    UniformStringSampler
+
+
+def nfa_from_ngrams(obj, ngram_table):
+    # the NFA the n-grams were matched with before being compiled into tables
+    nfa = NFA()
+    nfa.setSigma(obj._sigma)
+    nfa.addState(0)
+    nfa.addInitial(0)
+    state = 1
+    for string in ngram_table:
+        source_state = 0
+        for i in range(len(string)):
+            nfa.addState(state)
+            nfa.addTransition(source_state, string[i], state)
+            if i == len(string) - 1:
+                nfa.addFinal(state)
+            source_state = state
+            state += 1
+    return nfa
+
+
+def nfa_is_string_correct(obj, string):
+    # positive n-grams
+    automaton = nfa_from_ngrams(obj, obj.positive_table)
+    missing_final_states = set(automaton.Final)
+    ilist = initial = automaton.epsilonClosure(automaton.Initial)
+    last_confirmed = -1
+    for i in range(len(string)):
+        ilist = automaton.evalSymbol(ilist, string[i]).union(initial)
+        for f in automaton.Final:
+            if f in ilist:
+                missing_final_states.discard(f)
+                if last_confirmed + obj.positive_state_depth_dict[f] >= i:
+                    last_confirmed = i
+    if last_confirmed + 1 != len(string) and not obj.anything_allowed:
+        return False
+    if obj.logical_op == "and" and missing_final_states:
+        return False
+    # negative n-grams
+    automaton = nfa_from_ngrams(obj, obj.negative_table)
+    ilist = initial = automaton.epsilonClosure(automaton.Initial)
+    for i in range(len(string)):
+        ilist = automaton.evalSymbol(ilist, string[i]).union(initial)
+        if any(f in ilist for f in automaton.Final):
+            return False
+    return True
 
 
 class TestFSA(unittest.TestCase):
@@ -257,6 +307,95 @@ class TestFSA(unittest.TestCase):
             string = obj.get_correct_string(random.randint(1, 20))
             self.assertTrue(obj.is_string_correct(string))
 
+    def test_fsa_same_as_nfa(self):
+        rng = random.Random(0)
+        for description, logical_op in (("C", "and"), ("XYX", "or"), ("FAB GG MIL", "or"), ("A AB ABC", "and"),
+                                        ("ABA BAB", "and"), ("AB CD anything", "and"),
+                                        ("MNO KL not CF not ABC anything", "and"), ("anything", "or")):
+            obj = build_automaton(description, logical_op)
+            symbols = [c for c in description if c.isupper()] + ['Q', 'Z']
+            for _ in range(500):
+                string = ''.join(rng.choice(symbols)
+                                 for _ in range(rng.randint(0, 12)))
+                self.assertEqual(nfa_is_string_correct(obj, string), obj.is_string_correct(string),
+                                 (description, logical_op, string))
+
+    def test_fsa_cache(self):
+        clear_automaton_cache(2)
+        try:
+            obj = build_automaton("AB not XY anything", "and")
+            other = build_automaton("AB not XY anything", "or")
+            self.assertEqual((1, 1, 0, 2, 1), automaton_cache_info())
+            # the compiled matchers are shared, the rest is not
+            self.assertIs(obj.positive_automaton, other.positive_automaton)
+            self.assertEqual("or", other.logical_op)
+            obj.negative_alphabet.append("Z")
+            self.assertEqual(["X", "Y"], other.negative_alphabet)
+            build_automaton("CD", "and")
+            build_automaton("EF", "and")
+            self.assertEqual((1, 3, 1, 2, 2), automaton_cache_info())
+        finally:
+            clear_automaton_cache(AUTOMATON_CACHE_SIZE)
+
+    def test_fsa_uniform_counts(self):
+        for description, logical_op in (("C", "and"), ("XYX", "or"), ("A AB ABC", "and"), ("ABA BAB", "and"),
+                                        ("AB CD anything", "and"), ("MNO KL not CF not ABC anything", "and"),
+                                        ("anything", "or")):
+            obj = build_automaton(description, logical_op)
+            for length in range(4):
+                n_correct = sum(obj.is_string_correct(''.join(string))
+                                for string in itertools.product(NgramMatcher.sigma, repeat=length))
+                self.assertEqual(n_correct, obj.get_sampler().count(length, True))
+                self.assertEqual(26 ** length - n_correct, obj.get_sampler().count(length, False))
+            for correct in (True, False):
+                strings = obj.sample_strings(12, correct, 50)
+                self.assertEqual(50 if obj.get_sampler().count(12, correct) else 0, len(strings))
+                for string in strings:
+                    self.assertEqual(12, len(string))
+                    self.assertEqual(correct, obj.is_string_correct(string))
+
+    def test_fsa_uniform_sample(self):
+        obj = build_automaton("AB C", "or")
+        # the correct strings of length 2 are AB and CC
+        self.assertEqual([], obj.sample_strings(3, False, 0))
+        counts = {}
+        for string in obj.sample_strings(2, True, 2000):
+            counts[string] = counts.get(string, 0) + 1
+        self.assertEqual(["AB", "CC"], sorted(counts))
+        self.assertGreater(min(counts.values()), 850)
+        self.assertEqual([], build_automaton("ABC", "and").sample_strings(2, True))
+        self.assertTrue(build_automaton("ABC", "and").is_string_correct(
+            build_automaton("ABC", "and").get_correct_string(2, uniform=True)))
+
+    def test_fsa_uniform_threads(self):
+        # threads drawing strings of growing lengths from copies of the same cached automaton share its sampler
+        clear_automaton_cache()
+        description = "MNO KL not CF not ABC anything"
+        expected = [UniformStringSampler(build_automaton(description, "and")).count(length) for length in range(60)]
+        errors = []
+
+        def sample():
+            obj = build_automaton(description, "and")
+            for length in range(60):
+                for string in obj.sample_strings(length, True):
+                    if len(string) != length or not obj.is_string_correct(string):
+                        errors.append(string)
+        threads = [threading.Thread(target=sample) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([], errors)
+        sampler = build_automaton(description, "and").get_sampler()
+        self.assertEqual(expected, [sampler.count(length) for length in range(60)])
+
+    def test_fsa_wrong_string_uniform(self):
+        obj = build_automaton("AB CD", "and")
+        for length in range(1, 10):
+            string = obj.get_wrong_string(length, 0, uniform=True)
+            self.assertEqual(length, len(string))
+            self.assertFalse(obj.is_string_correct(string))
+
 # obj = build_automaton("AB anything", "or")  # this is not handled
 
 # obj = build_automaton("AB CF", "and")
@@ -14,6 +14,27 @@ from __future__ import print_function
 from __future__ import unicode_literals
 from os.path import dirname, basename, isfile
 import glob
+import importlib
+import sys
 modules = glob.glob(dirname(__file__) + "/*.py")
-for m in [basename(f)[:-3] for f in modules if isfile(f)]:
-    __import__('learners.' + m)
+_learner_modules = [basename(f)[:-3] for f in modules
+                    if isfile(f) and basename(f) != '__init__.py']
+if sys.version_info < (3, 5):
+    # asyncio learners need Python 3.5+
+    _learner_modules = [m for m in _learner_modules
+                        if not m.startswith('async_')]
+
+
+def __getattr__(name):
+    # since Python 3.7, the modules are only imported when first used (e.g.
+    # learners.human_learner), so that loading one learner does not import
+    # the dependencies of all the others
+    if name in _learner_modules:
+        return importlib.import_module('learners.' + name)
+    raise AttributeError("module 'learners' has no attribute '{0}'"
+                         .format(name))
+
+
+if sys.version_info < (3, 7):
+    for m in _learner_modules:
+        __import__('learners.' + m)
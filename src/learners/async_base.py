@@ -0,0 +1,123 @@
+# Copyright (c) 2016-present, Facebook, Inc.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree. An additional grant
+# of patent rights can be found in the PATENTS file in the same directory.
+
+'''
+Learners for `core.async_session.AsyncSession` (Python 3.5+).
+'''
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import subprocess
+
+from learners import remote_protocol
+
+
+class AsyncBaseLearner(object):
+    async def start(self):
+        # set up whatever needs the event loop (e.g. connections)
+        pass
+
+    async def try_reward(self, reward):
+        if reward is not None:
+            await self.reward(reward)
+
+    async def reward(self, reward):
+        pass
+
+    async def next(self, input):
+        return input
+
+    def set_view(self, view):
+        pass
+
+
+class SyncLearnerAdapter(AsyncBaseLearner):
+    '''Runs a (fast) blocking learner in an AsyncSession.'''
+    def __init__(self, learner):
+        self.learner = learner
+
+    async def try_reward(self, reward):
+        self.learner.try_reward(reward)
+
+    async def next(self, input):
+        return self.learner.next(input)
+
+
+class AsyncRemoteLearner(AsyncBaseLearner):
+    '''
+    Non-blocking version of `learners.base.RemoteLearner`, over
+    `zmq.asyncio`, speaking the same protocols. The handshake happens when
+    the session starts.
+    '''
+    def __init__(self, cmd, port, address=None, context=None):
+        try:
+            import zmq
+            import zmq.asyncio
+        except ImportError:
+            raise ImportError("Must have zeromq for remote learner.")
+
+        if address is None:
+            address = '*'
+
+        if port is None:
+            port = 5556
+        elif int(port) < 1 or int(port) > 65535:
+            raise ValueError("Invalid port number: %s" % port)
+
+        self.context = context if context is not None else \
+            zmq.asyncio.Context()
+        self.socket = self.context.socket(zmq.PAIR)
+        if '://' in address:
+            self.socket.bind(address)
+        else:
+            self.socket.bind("tcp://%s:%s" % (address, port))
+        # launch learner
+        if cmd is not None:
+            subprocess.Popen((cmd + ' ' + str(port)).split())
+        self.protocol = None
+        self._reward = 0
+        self._window = []
+        self._silent_token = None
+        self._silent_steps = 0
+
+    async def start(self):
+        if self.protocol is not None:
+            return
+        # handshake (negotiating the version of the protocol)
+        handshake_in = await self.socket.recv()
+        requested = remote_protocol.parse_hello(handshake_in)
+        self.protocol = min(requested, remote_protocol.LATEST_PROTOCOL)
+        if handshake_in != remote_protocol.HELLO:
+            await self.socket.send(remote_protocol.make_hello(self.protocol))
+
+    async def try_reward(self, reward):
+        reward = reward if reward is not None else 0
+        if self.protocol == remote_protocol.PROTOCOL_TEXT:
+            await self.socket.send_string(str(reward))
+        else:
+            # sent along with the environment token
+            self._reward = reward
+
+    async def next(self, inp):
+        if self.protocol == remote_protocol.PROTOCOL_TEXT:
+            await self.socket.send_string(str(inp))
+            reply = await self.socket.recv()
+            return reply.decode('utf-8')
+        self._window.append((ord(inp), self._reward))
+        self._reward = 0
+        if self._silent_steps:
+            # the learner already told us what it says in this step
+            self._silent_steps -= 1
+            return self._silent_token
+        await self.socket.send(remote_protocol.pack_window(self._window))
+        del self._window[:]
+        token_code, self._silent_steps = remote_protocol.unpack_reply(
+            await self.socket.recv())
+        self._silent_token = chr(token_code)
+        return self._silent_token
@@ -11,6 +11,8 @@ from __future__ import print_function
 from __future__ import unicode_literals
 import subprocess
 
+from learners import remote_protocol
+
 
 class BaseLearner(object):
     def try_reward(self, reward):
@@ -28,7 +30,13 @@ class BaseLearner(object):
 
 
 class RemoteLearner(BaseLearner):
-    def __init__(self, cmd, port, address=None):
+    '''
+    Learner running in another process, connected through a zmq socket (see
+    `learners.remote_protocol`). `address` can also be a full zmq endpoint
+    (such as `ipc:///tmp/learner` or, with a shared `context`,
+    `inproc://learner`), in which case the port is not used.
+    '''
+    def __init__(self, cmd, port, address=None, context=None):
         try:
             import zmq
         except ImportError:
@@ -42,25 +50,56 @@ class RemoteLearner(BaseLearner):
         elif int(port) < 1 or int(port) > 65535:
             raise ValueError("Invalid port number: %s" % port)
 
-        self.context = zmq.Context()
+        self.context = context if context is not None else zmq.Context()
         self.socket = self.context.socket(zmq.PAIR)
-        self.socket.bind("tcp://%s:%s" % (address, port))
+        if '://' in address:
+            self.socket.bind(address)
+        else:
+            self.socket.bind("tcp://%s:%s" % (address, port))
 
         # launch learner
         if cmd is not None:
             subprocess.Popen((cmd + ' ' + str(port)).split())
-        handshake_in = self.socket.recv().decode('utf-8')
-        assert handshake_in == 'hello'  # handshake
+        # handshake (negotiating the version of the protocol)
+        handshake_in = self.socket.recv()
+        requested = remote_protocol.parse_hello(handshake_in)
+        self.protocol = min(requested, remote_protocol.LATEST_PROTOCOL)
+        if handshake_in != remote_protocol.HELLO:
+            # the learner asked for a version: tell it which one we speak
+            self.socket.send(remote_protocol.make_hello(self.protocol))
+        # binary protocol state: the reward of the current step, the steps
+        # not sent yet and the lookahead declared by the learner
+        self._reward = 0
+        self._window = []
+        self._silent_token = None
+        self._silent_steps = 0
 
     # send to learner, and get response;
     def next(self, inp):
-        self.socket.send_string(str(inp))
-        reply = self.receive_socket()
-        return reply
+        if self.protocol == remote_protocol.PROTOCOL_TEXT:
+            self.socket.send_string(str(inp))
+            reply = self.receive_socket()
+            return reply
+        self._window.append((ord(inp), self._reward))
+        self._reward = 0
+        if self._silent_steps:
+            # the learner already told us what it says in this step
+            self._silent_steps -= 1
+            return self._silent_token
+        self.socket.send(remote_protocol.pack_window(self._window))
+        del self._window[:]
+        token_code, self._silent_steps = remote_protocol.unpack_reply(
+            self.socket.recv())
+        self._silent_token = chr(token_code)
+        return self._silent_token
 
     def try_reward(self, reward):
         reward = reward if reward is not None else 0
-        self.socket.send_string(str(reward))
+        if self.protocol == remote_protocol.PROTOCOL_TEXT:
+            self.socket.send_string(str(reward))
+        else:
+            # sent along with the environment token
+            self._reward = reward
 
     def receive_socket(self):
         reply = self.socket.recv()
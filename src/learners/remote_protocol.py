@@ -0,0 +1,136 @@
+# Copyright (c) 2016-present, Facebook, Inc.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree. An additional grant
+# of patent rights can be found in the PATENTS file in the same directory.
+
+'''
+Protocols spoken between the RemoteLearner and a learner running in another
+process.
+
+The learner starts with a handshake: `hello` asks for the original text
+protocol (for every step, the environment sends the reward and the
+environment token as two text messages, and the learner replies with its
+token), while `hello <version>` asks for a binary protocol, and the
+environment replies `hello <version>` with the version it agreed on (the
+highest one it supports that is not above the one asked for).
+
+Version 1 frames (little-endian):
+
+- environment to learner: `W`, uint32 `n`, and `n` times (uint8 token,
+  float64 reward). These are the environment tokens and rewards of all the
+  steps since the previous frame; the learner replies to the last one.
+- learner to environment: `R`, uint8 token, uint32 `silent_steps`. The
+  token is the reply to the last step and, as a lookahead, it will also be
+  the learner token for the next `silent_steps` steps, which the
+  environment runs without waiting for the learner. Their tokens and
+  rewards are sent together in the next frame.
+
+Tokens are sent as their character code (which is below 256 both for bits
+and for bytes).
+'''
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import struct
+
+PROTOCOL_TEXT = 0
+PROTOCOL_BINARY = 1
+# the most recent version that this side implements
+LATEST_PROTOCOL = PROTOCOL_BINARY
+
+HELLO = b'hello'
+WINDOW = b'W'
+REPLY = b'R'
+
+_window_header = struct.Struct('<cI')
+_reply = struct.Struct('<cBI')
+
+
+def make_hello(version=None):
+    if version is None:
+        return HELLO
+    return HELLO + ' {0}'.format(version).encode('ascii')
+
+
+def parse_hello(message):
+    '''Returns the protocol version asked for in a handshake message.'''
+    fields = message.split()
+    if not fields or fields[0] != HELLO or len(fields) > 2:
+        raise ValueError("Invalid handshake: {0!r}".format(message))
+    if len(fields) == 1:
+        return PROTOCOL_TEXT
+    try:
+        return int(fields[1])
+    except ValueError:
+        raise ValueError("Invalid protocol version in handshake: {0!r}"
+                         .format(message))
+
+
+def pack_window(steps):
+    '''Frames a list of (token code, reward) pairs.'''
+    n = len(steps)
+    values = [value for step in steps for value in step]
+    return struct.pack('<cI' + 'Bd' * n, WINDOW, n, *values)
+
+
+def unpack_window(frame):
+    '''Returns the list of (token code, reward) pairs in a frame.'''
+    kind, n = _window_header.unpack_from(frame)
+    if kind != WINDOW:
+        raise ValueError("Unexpected frame type {0!r}".format(kind))
+    values = struct.unpack_from('<' + 'Bd' * n, frame, _window_header.size)
+    return list(zip(values[::2], values[1::2]))
+
+
+def pack_reply(token_code, silent_steps=0):
+    return _reply.pack(REPLY, token_code, silent_steps)
+
+
+def unpack_reply(frame):
+    '''Returns a tuple (token code, silent steps).'''
+    kind, token_code, silent_steps = _reply.unpack(frame)
+    if kind != REPLY:
+        raise ValueError("Unexpected frame type {0!r}".format(kind))
+    return token_code, silent_steps
+
+
+class EnvironmentConnection(object):
+    '''
+    Learner side of the protocols, over a connected zmq PAIR socket.
+
+    :param version: protocol version to ask for (the one actually used is
+        in the `version` attribute after the handshake).
+    '''
+    def __init__(self, socket, version=LATEST_PROTOCOL):
+        self.socket = socket
+        if version == PROTOCOL_TEXT:
+            self.socket.send(make_hello())
+            self.version = PROTOCOL_TEXT
+        else:
+            self.socket.send(make_hello(version))
+            self.version = parse_hello(self.socket.recv())
+
+    def receive(self):
+        '''Returns the list of (environment token, reward) of the steps
+        since the last reply.'''
+        if self.version == PROTOCOL_TEXT:
+            reward = float(self.socket.recv())
+            token = self.socket.recv().decode('utf-8')
+            return [(token, reward)]
+        return [(chr(code), reward)
+                for code, reward in unpack_window(self.socket.recv())]
+
+    def reply(self, token, silent_steps=0):
+        '''Sends the learner token for the last step received. In the binary
+        protocol, the same token is also used for the next `silent_steps`
+        steps.'''
+        if self.version == PROTOCOL_TEXT:
+            if silent_steps:
+                raise ValueError("The text protocol has no lookahead")
+            self.socket.send_string(token)
+        else:
+            self.socket.send(pack_reply(ord(token), silent_steps))
@@ -0,0 +1,292 @@
+# Copyright (c) 2016-present, Facebook, Inc.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree. An additional grant
+# of patent rights can be found in the PATENTS file in the same directory.
+
+'''
+Shared-memory transport for learners running on the same host as the
+environment, as an alternative to the zmq sockets of the RemoteLearner.
+
+Both sides map the same file, which holds two single-producer,
+single-consumer ring buffers: one with the steps of the environment (token,
+whether it expects a reply, reward) and one with the replies of the learner
+(token, silent steps). The semantics are those of the binary protocol in
+`learners.remote_protocol`: the learner replies with its token and can
+declare that it will keep saying it for the next `silent_steps` steps,
+which then run without waiting for it.
+
+Waiting for the other side spins for a while and then sleeps with an
+exponential backoff, so a fast peer is served with low latency while an idle
+one does not burn the CPU. While sleeping, it also checks that the other
+side has not closed the channel nor died (both sides write their pid in the
+header), and raises EOFError if so.
+'''
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import errno
+import mmap
+import multiprocessing
+import os
+import struct
+import subprocess
+import tempfile
+import time
+
+from learners.base import BaseLearner
+
+MAGIC = b'CAIR'
+VERSION = 2
+DEFAULT_CAPACITY = 4096
+
+# magic, version, capacity, learner attached flag, closed flag, pid of the
+# environment, pid of the learner
+_header = struct.Struct('<4sIIIIII')
+_flag = struct.Struct('<I')
+_ATTACHED_OFFSET = 12
+_CLOSED_OFFSET = 16
+_ENVIRONMENT_PID_OFFSET = 20
+_LEARNER_PID_OFFSET = 24
+_counter = struct.Struct('<Q')
+# environment token, whether a reply is expected, reward
+_step = struct.Struct('<BBd')
+# learner token, silent steps
+_reply = struct.Struct('<BI')
+# the header and each counter have a cache line of their own
+_LINE = 64
+
+try:
+    _yield = os.sched_yield
+except AttributeError:  # Python 2 or not POSIX
+    def _yield():
+        time.sleep(0)
+
+
+def _pid_exists(pid):
+    '''Whether there is a process with this pid (always True where it cannot
+    be checked).'''
+    if os.name == 'nt':
+        # os.kill would terminate the process
+        return True
+    try:
+        os.kill(pid, 0)
+    except OSError as e:
+        return e.errno != errno.ESRCH
+    return True
+
+
+def _ring_size(capacity, slot):
+    return 2 * _LINE + capacity * slot.size
+
+
+class RingBuffer(object):
+    '''A single-producer, single-consumer ring of fixed-size slots in a
+    shared buffer, with the write counter and the read counter in front of
+    the slots.'''
+    def __init__(self, channel, offset, capacity, slot):
+        self._channel = channel
+        self._buffer = channel.buffer
+        self._write_offset = offset
+        self._read_offset = offset + _LINE
+        self._data_offset = offset + 2 * _LINE
+        self._capacity = capacity
+        self._slot = slot
+
+    def _load(self, offset):
+        return _counter.unpack_from(self._buffer, offset)[0]
+
+    def put(self, *values):
+        seq = self._load(self._write_offset)
+        if seq - self._load(self._read_offset) >= self._capacity:
+            self._channel.wait(lambda: seq - self._load(self._read_offset) <
+                               self._capacity)
+        self._slot.pack_into(self._buffer, self._data_offset +
+                             (seq % self._capacity) * self._slot.size,
+                             *values)
+        # publish the slot only once it is written
+        _counter.pack_into(self._buffer, self._write_offset, seq + 1)
+
+    def get(self):
+        seq = self._load(self._read_offset)
+        if self._load(self._write_offset) <= seq:
+            self._channel.wait(lambda: self._load(self._write_offset) > seq)
+        values = self._slot.unpack_from(
+            self._buffer,
+            self._data_offset + (seq % self._capacity) * self._slot.size)
+        _counter.pack_into(self._buffer, self._read_offset, seq + 1)
+        return values
+
+
+class SharedMemoryChannel(object):
+    '''
+    The memory-mapped file shared by the environment (which creates it) and
+    the learner (which attaches to it).
+
+    If the other side is a child process, `peer_process` can be set to its
+    Popen object, whose exit is detected even before it is reaped.
+    '''
+    # busy-wait iterations (useless with a single CPU, where the other side
+    # cannot run meanwhile), iterations yielding the CPU, and sleep bounds
+    # (in seconds) after them
+    SPIN_ITERATIONS = 2000 if multiprocessing.cpu_count() > 1 else 0
+    YIELD_ITERATIONS = 200
+    MIN_SLEEP = 0.00001
+    MAX_SLEEP = 0.001
+
+    def __init__(self, path, create=False, capacity=DEFAULT_CAPACITY):
+        self.path = path
+        self._created = create
+        self._closed = False
+        if create:
+            size = _LINE + _ring_size(capacity, _step) + \
+                _ring_size(capacity, _reply)
+            # the file only shows up at its path once it is initialized
+            self._file = open(path + '.tmp', 'w+b')
+            self._file.truncate(size)
+            self.buffer = mmap.mmap(self._file.fileno(), 0)
+            _header.pack_into(self.buffer, 0, MAGIC, VERSION, capacity, 0, 0,
+                              os.getpid(), 0)
+            os.rename(path + '.tmp', path)
+        else:
+            self._file = open(path, 'r+b')
+            self.buffer = mmap.mmap(self._file.fileno(), 0)
+            magic, version, capacity = _header.unpack_from(self.buffer, 0)[:3]
+            if magic != MAGIC or version != VERSION:
+                self.buffer.close()
+                self._file.close()
+                raise ValueError("{0} is not a learner channel of version {1}"
+                                 .format(path, VERSION))
+        self.capacity = capacity
+        self.steps = RingBuffer(self, _LINE, capacity, _step)
+        self.replies = RingBuffer(
+            self, _LINE + _ring_size(capacity, _step), capacity, _reply)
+        self.peer_process = None
+        if not create:
+            _flag.pack_into(self.buffer, _LEARNER_PID_OFFSET, os.getpid())
+            _flag.pack_into(self.buffer, _ATTACHED_OFFSET, 1)
+
+    def is_attached(self):
+        return _flag.unpack_from(self.buffer, _ATTACHED_OFFSET)[0] == 1
+
+    def is_closed(self):
+        return _flag.unpack_from(self.buffer, _CLOSED_OFFSET)[0] == 1
+
+    def is_peer_alive(self):
+        '''Whether the process on the other side is still running (or has
+        not attached yet).'''
+        if self.peer_process is not None:
+            return self.peer_process.poll() is None
+        pid = _flag.unpack_from(self.buffer, _LEARNER_PID_OFFSET if
+                                self._created else _ENVIRONMENT_PID_OFFSET)[0]
+        return pid == 0 or _pid_exists(pid)
+
+    def wait(self, condition):
+        '''Waits until the condition holds (raises EOFError if the other
+        side closes the channel or dies in the meantime).'''
+        for _ in range(self.SPIN_ITERATIONS):
+            if condition():
+                return
+        for _ in range(self.YIELD_ITERATIONS):
+            if condition():
+                return
+            _yield()
+        delay = self.MIN_SLEEP
+        while not condition():
+            closed = self.is_closed()
+            if closed or not self.is_peer_alive():
+                # the other side may have met the condition before going
+                if condition():
+                    return
+                raise EOFError("The learner channel was closed" if closed
+                               else "The other side of the learner channel "
+                               "died")
+            time.sleep(delay)
+            delay = min(2 * delay, self.MAX_SLEEP)
+
+    def close(self):
+        # (mmap objects have no closed attribute in Python 2)
+        if self._closed:
+            return
+        self._closed = True
+        _flag.pack_into(self.buffer, _CLOSED_OFFSET, 1)
+        self.buffer.close()
+        self._file.close()
+        if self._created:
+            os.remove(self.path)
+
+
+class SharedMemoryRemoteLearner(BaseLearner):
+    '''
+    Learner running in another process on the same host, connected through a
+    SharedMemoryChannel. `address` is the path of the file to map (by
+    default, one in the temporary directory), which is also passed as an
+    argument to the learner command. The port is not used.
+    '''
+    def __init__(self, cmd, port=None, address=None,
+                 capacity=DEFAULT_CAPACITY):
+        if address is None:
+            address = os.path.join(tempfile.gettempdir(),
+                                   'learner-{0}.shm'.format(os.getpid()))
+        self.channel = SharedMemoryChannel(address, True, capacity)
+        # launch learner
+        if cmd is not None:
+            self.channel.peer_process = subprocess.Popen(
+                (cmd + ' ' + address).split())
+        # handshake: wait for the learner to attach
+        self.channel.wait(self.channel.is_attached)
+        self._reward = 0
+        self._silent_token = None
+        self._silent_steps = 0
+
+    def try_reward(self, reward):
+        # sent along with the environment token
+        self._reward = reward if reward is not None else 0
+
+    def next(self, inp):
+        expects_reply = not self._silent_steps
+        self.channel.steps.put(ord(inp), expects_reply, self._reward)
+        self._reward = 0
+        if not expects_reply:
+            # the learner already told us what it says in this step
+            self._silent_steps -= 1
+            return self._silent_token
+        token_code, self._silent_steps = self.channel.replies.get()
+        self._silent_token = chr(token_code)
+        return self._silent_token
+
+    def set_view(self, view):
+        pass
+
+    def close(self):
+        self.channel.close()
+
+
+class SharedMemoryEnvironmentConnection(object):
+    '''
+    Learner side of the shared-memory transport, with the same interface as
+    `learners.remote_protocol.EnvironmentConnection`.
+    '''
+    def __init__(self, path):
+        self.channel = SharedMemoryChannel(path)
+
+    def receive(self):
+        '''Returns the list of (environment token, reward) of the steps
+        since the last reply.'''
+        steps = []
+        while True:
+            token_code, expects_reply, reward = self.channel.steps.get()
+            steps.append((chr(token_code), reward))
+            if expects_reply:
+                return steps
+
+    def reply(self, token, silent_steps=0):
+        '''Sends the learner token for the last step received, which is also
+        used for the next `silent_steps` steps.'''
+        self.channel.replies.put(ord(token), silent_steps)
+
+    def close(self):
+        self.channel.close()
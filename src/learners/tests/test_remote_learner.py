@@ -0,0 +1,104 @@
+# Copyright (c) 2016-present, Facebook, Inc.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree. An additional grant
+# of patent rights can be found in the PATENTS file in the same directory.
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+import zmq
+from learners.base import RemoteLearner
+import learners.remote_protocol as remote_protocol
+
+
+def run_learner(context, endpoint, version, silent_steps, n_frames, received):
+    '''A learner that alternates between saying 'b' and 'a', declaring
+    itself silent for `silent_steps` after each reply.'''
+    socket = context.socket(zmq.PAIR)
+    socket.setsockopt(zmq.LINGER, 0)
+    socket.connect(endpoint)
+    connection = remote_protocol.EnvironmentConnection(socket, version)
+    received.append(connection.version)
+    for i in range(n_frames):
+        received.append(connection.receive())
+        connection.reply('a' if i % 2 else 'b', silent_steps)
+    socket.close()
+
+
+class TestRemoteLearner(unittest.TestCase):
+
+    def run_session(self, endpoint, version, silent_steps, n_frames,
+                    context=None):
+        context = context or zmq.Context()
+        received = []
+        learner_thread = threading.Thread(
+            target=run_learner, args=(context, endpoint, version,
+                                      silent_steps, n_frames, received))
+        learner_thread.start()
+        learner = RemoteLearner(None, None, endpoint, context)
+        # the first frame has a single step, the others the lookahead too
+        n_steps = 1 + (n_frames - 1) * (silent_steps + 1)
+        steps = [(('0', '1', 'x')[i % 3], (i % 3) - 1) for i in range(n_steps)]
+        outputs = []
+        for token, reward in steps:
+            learner.try_reward(reward)
+            outputs.append(learner.next(token))
+        learner_thread.join()
+        learner.socket.close(linger=0)
+        return learner, received, steps, outputs
+
+    def testBinaryProtocol(self):
+        silent_steps = 3
+        learner, received, steps, outputs = self.run_session(
+            'inproc://test-binary', remote_protocol.LATEST_PROTOCOL,
+            silent_steps, 5)
+        self.assertEqual(remote_protocol.PROTOCOL_BINARY, learner.protocol)
+        self.assertEqual(remote_protocol.PROTOCOL_BINARY, received[0])
+        frames = received[1:]
+        self.assertEqual([1] + [silent_steps + 1] * 4,
+                         [len(frame) for frame in frames])
+        self.assertEqual(steps, [step for frame in frames for step in frame])
+        self.assertEqual(['b'] * 4 + ['a'] * 4 + ['b'] * 4 + ['a'] * 4 + ['b'],
+                         outputs)
+
+    def testTextProtocol(self):
+        learner, received, steps, outputs = self.run_session(
+            'inproc://test-text', remote_protocol.PROTOCOL_TEXT, 0, 4)
+        self.assertEqual(remote_protocol.PROTOCOL_TEXT, learner.protocol)
+        self.assertEqual(steps, [frame[0] for frame in received[1:]])
+        self.assertEqual(['b', 'a', 'b', 'a'], outputs)
+
+    def testNegotiation(self):
+        # a learner speaking a newer version gets the one we have
+        learner, received, steps, outputs = self.run_session(
+            'inproc://test-newer', remote_protocol.LATEST_PROTOCOL + 1, 0, 2)
+        self.assertEqual(remote_protocol.LATEST_PROTOCOL, learner.protocol)
+        self.assertEqual(remote_protocol.LATEST_PROTOCOL, received[0])
+        self.assertRaises(ValueError, remote_protocol.parse_hello, b'hi')
+        self.assertRaises(ValueError, remote_protocol.parse_hello, b'hello x')
+
+    def testIpc(self):
+        path = tempfile.mkdtemp()
+        try:
+            endpoint = 'ipc://' + os.path.join(path, 'learner')
+            learner, received, steps, outputs = self.run_session(
+                endpoint, remote_protocol.LATEST_PROTOCOL, 2, 3)
+            self.assertEqual(steps,
+                             [step for frame in received[1:] for step in frame])
+        finally:
+            shutil.rmtree(path)
+
+
+def main():
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+# Copyright (c) 2016-present, Facebook, Inc.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree. An additional grant
+# of patent rights can be found in the PATENTS file in the same directory.
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+import learners.shared_memory as shared_memory
+
+SRC_DIR = os.path.dirname(os.path.dirname(
+    os.path.abspath(shared_memory.__file__)))
+
+# a learner that dies after receiving the first step, without closing the
+# channel
+DYING_LEARNER = '''
+import os
+import sys
+import time
+sys.path.insert(0, {0!r})
+from learners.shared_memory import SharedMemoryEnvironmentConnection
+while not os.path.exists(sys.argv[1]):
+    time.sleep(0.001)
+SharedMemoryEnvironmentConnection(sys.argv[1]).receive()
+os._exit(0)
+'''.format(SRC_DIR)
+
+
+def run_learner(path, silent_steps, n_replies, received):
+    '''A learner that alternates between saying 'b' and 'a', declaring
+    itself silent for `silent_steps` after each reply.'''
+    while not os.path.exists(path):
+        time.sleep(0.001)
+    connection = shared_memory.SharedMemoryEnvironmentConnection(path)
+    try:
+        for i in range(n_replies):
+            received.append(connection.receive())
+            connection.reply('a' if i % 2 else 'b', silent_steps)
+        # wait for the environment to go away
+        connection.receive()
+    except EOFError:
+        received.append(None)
+    finally:
+        connection.close()
+
+
+class TestSharedMemory(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def run_session(self, silent_steps, n_replies, capacity):
+        path = os.path.join(self.path, 'learner.shm')
+        received = []
+        learner_thread = threading.Thread(
+            target=run_learner, args=(path, silent_steps, n_replies,
+                                      received))
+        learner_thread.start()
+        learner = shared_memory.SharedMemoryRemoteLearner(
+            None, address=path, capacity=capacity)
+        # the first reply is for a single step, the others for the lookahead
+        n_steps = 1 + (n_replies - 1) * (silent_steps + 1)
+        steps = [(('0', '1', 'x')[i % 3], (i % 3) - 1) for i in range(n_steps)]
+        outputs = []
+        for token, reward in steps:
+            learner.try_reward(reward)
+            outputs.append(learner.next(token))
+        learner.close()
+        learner_thread.join()
+        self.assertFalse(os.path.exists(path))
+        # the learner noticed that the environment closed the channel
+        self.assertIsNone(received.pop())
+        return received, steps, outputs
+
+    def testSteps(self):
+        received, steps, outputs = self.run_session(0, 5, 16)
+        self.assertEqual([[step] for step in steps], received)
+        self.assertEqual(['b', 'a', 'b', 'a', 'b'], outputs)
+
+    def testLookahead(self):
+        # the lookahead does not fit in the rings
+        silent_steps = 20
+        received, steps, outputs = self.run_session(silent_steps, 3, 8)
+        self.assertEqual([1, silent_steps + 1, silent_steps + 1],
+                         [len(frame) for frame in received])
+        self.assertEqual(steps, [step for frame in received for step in frame])
+        self.assertEqual(['b'] * (silent_steps + 1) +
+                         ['a'] * (silent_steps + 1) + ['b'], outputs)
+
+    def write_dying_learner(self):
+        script = os.path.join(self.path, 'dying_learner.py')
+        with open(script, 'w') as f:
+            f.write(DYING_LEARNER)
+        return script
+
+    def testLaunchedLearnerDies(self):
+        path = os.path.join(self.path, 'learner.shm')
+        learner = shared_memory.SharedMemoryRemoteLearner(
+            '{0} {1}'.format(sys.executable, self.write_dying_learner()),
+            address=path)
+        try:
+            self.assertRaises(EOFError, learner.next, '0')
+        finally:
+            learner.close()
+
+    def testLearnerDies(self):
+        # the learner is not a child of the environment: its pid is checked
+        path = os.path.join(self.path, 'learner.shm')
+        process = subprocess.Popen([sys.executable,
+                                    self.write_dying_learner(), path])
+        # reap the learner as soon as it exits
+        reaper = threading.Thread(target=process.wait)
+        reaper.start()
+        learner = shared_memory.SharedMemoryRemoteLearner(None, address=path)
+        try:
+            self.assertRaises(EOFError, learner.next, '0')
+        finally:
+            learner.close()
+            reaper.join()
+
+    def testInvalidFile(self):
+        path = os.path.join(self.path, 'other')
+        with open(path, 'wb') as f:
+            f.write(b'\0' * 256)
+        self.assertRaises(ValueError,
+                          shared_memory.SharedMemoryEnvironmentConnection,
+                          path)
+
+
+def main():
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
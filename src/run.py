@@ -13,13 +13,16 @@ import os
 import logging
 import logging.config
 import operator
+import random
 from optparse import OptionParser
 from core.serializer import StandardSerializer
 from core.environment import Environment
-from core.config_loader import JSONConfigLoader, PythonConfigLoader
-import learners
+from core.config_loader import create_tasks_from_config
 from core.session import Session
 
+REMOTE_LEARNER = 'learners.base.RemoteLearner'
+SHM_REMOTE_LEARNER = 'learners.shared_memory.SharedMemoryRemoteLearner'
+
 
 def main():
     setup_logging()
@@ -47,8 +50,14 @@ def main():
     op.add_option('--learner-port',
                   default=5556, type=int,
                   help='Port on which to accept remote learner.')
+    op.add_option('--learner-transport', default='zmq',
+                  choices=('zmq', 'shm'),
+                  help='How RemoteLearner talks to the learner process: '
+                  'zmq sockets or, for learners on the same host, a shared '
+                  'memory file (given by --learner-address).')
     op.add_option('--learner-address',
-                  help='Network address on which the remote learner listens.')
+                  help='Network address on which the remote learner listens '
+                  '(or a full zmq endpoint such as ipc:///tmp/learner).')
     op.add_option('--max-reward-per-task',
                   default=2147483647, type=int,
                   help='Maximum reward that we can give to a learner for'
@@ -57,16 +66,61 @@ def main():
                   help='Uses standard output instead of curses library.')
     op.add_option('--bit-mode', action='store_true', default=False,
                   help='Environment receives input in bytes.')
+    op.add_option('--headless', action='store_true', default=False,
+                  help='Runs without any view and without delays between '
+                  'the steps, and reports the steps per second at the end.')
+    op.add_option('--max-steps', default=None, type=int,
+                  help='Stops a headless run after this number of steps.')
+    op.add_option('--max-seconds', default=None, type=float,
+                  help='Stops a headless run after this wall-clock time.')
+    op.add_option('--metrics-file',
+                  help='File where metrics (per-task reward and time, steps '
+                  'per second, ...) are appended periodically while the '
+                  'session runs.')
+    op.add_option('--metrics-interval', default=10, type=float,
+                  help='Seconds between two records of the metrics file.')
+    op.add_option('--profile', action='store_true', default=False,
+                  help='Times the phases of the environment steps (input, '
+                  'triggers, task handlers, output...) per task and prints '
+                  'them at exit.')
+    op.add_option('--pregenerate', default=0, type=int,
+                  help='Generates this many instances of each task ahead of '
+                  'time in worker processes, for the tasks that support it '
+                  '(0 generates them when the tasks start).')
+    op.add_option('--pregenerate-workers', default=1, type=int,
+                  help='Number of worker processes generating instances.')
+    op.add_option('--pregenerate-seed', default=0, type=int,
+                  help='Seed of the instances generated ahead of time (the '
+                  'same seed gives the same instances).')
+    op.add_option('--seed', default=None, type=int,
+                  help='Seed of the random generator (drawn at random and '
+                  'logged if not given).')
+    op.add_option('--record', metavar='FILE',
+                  help='Records the steps of the session, with the seed, in '
+                  'an episode file that can be replayed without the learner '
+                  '(see core.recorder).')
     opt, args = op.parse_args()
     if len(args) == 0:
         op.error("Tasks schedule configuration file required.")
+    if opt.headless and is_human_learner(opt.learner):
+        op.error("A human learner cannot be run headless.")
     # retrieve the task configuration file
     tasks_config_file = args[0]
     logger = logging.getLogger(__name__)
     logger.info("Starting new evaluation session")
+    seed = opt.seed
+    if seed is None:
+        seed = random.SystemRandom().randint(0, 2 ** 31 - 1)
+    logger.info("Random seed: {0}".format(seed))
+    random.seed(seed)
     # we choose how the environment will produce and interpret
     # the bit signal
     serializer = StandardSerializer()
+    if opt.learner_transport == 'shm':
+        if opt.learner != REMOTE_LEARNER:
+            op.error("Only {0} can use the shm transport."
+                     .format(REMOTE_LEARNER))
+        opt.learner = SHM_REMOTE_LEARNER
     # create a learner (the human learner takes the serializer)
     learner = create_learner(opt.learner, serializer,
                              opt.learner_cmd, opt.learner_port, opt.learner_address, not opt.bit_mode)
@@ -76,8 +130,49 @@ def main():
 
     env = Environment(serializer, task_scheduler, opt.scramble,
                       opt.max_reward_per_task, not opt.bit_mode)
+    profiler = None
+    if opt.profile:
+        from core.profiler import StepProfiler
+        profiler = StepProfiler()
+        env.set_profiler(profiler)
     # a learning session
     session = Session(env, learner, opt.time_delay)
+    recorder = None
+    if opt.record:
+        from core.recorder import EpisodeRecorder
+        recorder = EpisodeRecorder(opt.record, not opt.bit_mode, seed=seed)
+        recorder.attach(env, session)
+    pregenerator = None
+    if opt.pregenerate > 0:
+        from core.pregeneration import InstancePregenerator, set_pregenerator
+        pregenerator = InstancePregenerator(opt.pregenerate_seed,
+                                            opt.pregenerate,
+                                            opt.pregenerate_workers)
+        set_pregenerator(pregenerator)
+    metrics_writer = None
+    if opt.metrics_file:
+        from core.metrics import MetricsWriter
+        metrics_writer = MetricsWriter(session, opt.metrics_file,
+                                       opt.metrics_interval)
+        metrics_writer.start()
+    try:
+        run_session(opt, env, session, learner, serializer)
+    finally:
+        if metrics_writer is not None:
+            metrics_writer.stop()
+        if pregenerator is not None:
+            set_pregenerator(None)
+            pregenerator.close()
+        if recorder is not None:
+            recorder.close()
+        if profiler is not None:
+            profiler.report()
+
+
+def run_session(opt, env, session, learner, serializer):
+    if opt.headless:
+        run_headless(session, opt.output, opt.max_steps, opt.max_seconds)
+        return
     # setup view
     view = create_view(opt.view, opt.learner, env, session, serializer, opt.show_world,
                        opt.curses, not opt.bit_mode)
@@ -99,6 +194,19 @@ def main():
         view.finalize()
 
 
+def run_headless(session, output_file, max_steps, max_seconds):
+    try:
+        steps_per_sec = session.run_headless(max_steps, max_seconds)
+    finally:
+        save_results(session, output_file)
+    print('Total time: {0}; Total reward: {1}; Steps/sec: {2:.1f}'.format(
+        session.get_total_time(), session.get_total_reward(), steps_per_sec))
+
+
+def is_human_learner(learner_type):
+    return learner_type.split('.')[0:2] == ['learners', 'human_learner']
+
+
 def create_view(view_type, learner_type, env, session, serializer, show_world, use_curses, byte_mode):
     if not use_curses:
         from view.win_console import StdInOutView, StdOutView
@@ -118,13 +226,14 @@ def create_view(view_type, learner_type, env, session, serializer, show_world, u
 
 def create_learner(learner_type, serializer, learner_cmd, learner_port=None, learner_address=None, byte_mode=False):
     if learner_type.split('.')[0:2] == ['learners', 'human_learner']:
+        from learners import human_learner
         c = learner_type.split('.')[2]
         if c == 'HumanLearner':
-            return learners.human_learner.HumanLearner(serializer, byte_mode)
+            return human_learner.HumanLearner(serializer, byte_mode)
         elif c == 'ImmediateHumanLearner':
-            return learners.human_learner.ImmediateHumanLearner(serializer, byte_mode)
+            return human_learner.ImmediateHumanLearner(serializer, byte_mode)
         elif c == 'HaltOnDotHumanLearner':
-            return learners.human_learner.HaltOnDotHumanLearner(serializer, byte_mode)
+            return human_learner.HaltOnDotHumanLearner(serializer, byte_mode)
     else:
         # dynamically load the class given by learner_type
         # separate the module from the class name
@@ -138,26 +247,6 @@ def create_learner(learner_type, serializer, learner_cmd, learner_port=None, lea
         return c(learner_cmd, learner_port, learner_address) if 'RemoteLearner' in cname else c()
 
 
-def create_tasks_from_config(tasks_config_file):
-    ''' Returns a TaskScheduler based on either:
-
-        - a json configuration file.
-        - a python module with a function create_tasks that does the job
-        of returning the task scheduler.
-    '''
-    fformat = tasks_config_file.split('.')[-1]
-    if fformat == 'json':
-        config_loader = JSONConfigLoader()
-    elif fformat == 'py':
-        config_loader = PythonConfigLoader()
-    else:
-        raise RuntimeError("Unknown configuration file format '.{fformat}' of"
-                           " {filename}"
-                           .format(fformat=fformat,
-                                   filename=tasks_config_file))
-    return config_loader.create_tasks(tasks_config_file)
-
-
 def save_results(session, output_file):
     if session.get_total_time() == 0:
         # nothing to save
@@ -4,7 +4,6 @@
 # This source code is licensed under the BSD-style license found in the
 # LICENSE_CHALLENGE file in the root directory of this source tree.
 
-import os
 import random
 import re
 import string
@@ -12,6 +11,7 @@ from contextlib import contextmanager
 
 from core.task import Task
 from core.task import on_message, on_start, on_timeout
+from tasks.challenge.round1.dictionary import get_word_list
 from tasks.challenge.round1.task_generator import TaskGenerator
 
 DICTIONARY_FILE = 'res/dict_gsl.txt'
@@ -590,13 +590,8 @@ class Micro5Sub18Task(FeedbackMappingTaskMixin, MicroMappingTask):
 
 
 def load_dictionary(file_name):
-    current_dir = os.path.dirname(__file__)
-    file_path = os.path.join(current_dir, '../../../' + file_name)
-    with open(file_path) as f:
-        content = f.readlines()
-
-    return [x.strip() for x in content
-            if not any(map(lambda forbidden: forbidden in x.strip(), load_dictionary.forbidden_strings))]
+    # the file is only read once per process, and the words without the forbidden strings are cached
+    return get_word_list(file_name).select(load_dictionary.forbidden_strings)
 
 load_dictionary.forbidden_strings = []
 
@@ -1049,12 +1044,27 @@ class Micro15Task(MicroBase):
         return TaskGenerator(micro15_question, '', None, ';')
 
 
+class SharedTask(object):
+    '''
+    Class attribute holding an instance of a task, shared by the instances of the class (and of its subclasses) and
+    only created when it is first used rather than when the module is imported.
+    '''
+    def __init__(self, task_class):
+        self.task_class = task_class
+        self.task = None
+
+    def __get__(self, obj, owner):
+        if self.task is None:
+            self.task = self.task_class()
+        return self.task
+
+
 class Micro16Task(MicroBase):
     reg_answer_end = r'\.'
-    m8 = Micro9Sub2Task()
-    m9 = Micro10Task()
-    m10 = Micro11Task()
-    m11 = Micro12Task()
+    m8 = SharedTask(Micro9Sub2Task)
+    m9 = SharedTask(Micro10Task)
+    m10 = SharedTask(Micro11Task)
+    m11 = SharedTask(Micro12Task)
 
     def get_task_generator(self):
         tasks = [self.m8, self.m9, self.m10, self.m11]
@@ -1064,10 +1074,10 @@ class Micro16Task(MicroBase):
 
 class Micro19Task(MicroBase):
     reg_answer_end = r'\.'
-    m10 = Micro10Task()
-    m11 = Micro11Task()
-    m12 = Micro12Task()
-    m14 = Micro14Task()
+    m10 = SharedTask(Micro10Task)
+    m11 = SharedTask(Micro11Task)
+    m12 = SharedTask(Micro12Task)
+    m14 = SharedTask(Micro14Task)
     FAILED_TASK_TOLERANCE = 2.0
     synonyms = {'say': ['say', 'print', 'write'],
                 'and': ['and', 'together with', '&', 'also'],
@@ -13,6 +13,7 @@ import random
 import string
 
 import tasks.competition.messages as msg
+from core.pregeneration import generate_instance
 from core.task import on_message, on_start, on_timeout
 from fsa import build_automaton
 from tasks.competition.base import BaseTask
@@ -83,10 +84,13 @@ class TaskSetBase(BaseTask):
 
     @staticmethod
     def get_task(max_length_of_description, max_nr_of_groups, max_length_of_verify, description_type,
-                 not_portion=None, subset_size=None, without_anything=None):
+                 not_portion=None, subset_size=None, without_anything=None, uniform_verify=None):
         '''
         TODO: generovat incorrect z distribuce correct
         TODO: pridat minimalni delku
+
+        With uniform_verify, the verify string is drawn uniformly among the correct (or wrong) strings of its length
+        instead of being generated from the description (wrong strings are then rarely near misses).
         '''
         not_portion = not_portion or 0
         subset_size = subset_size or 13
@@ -141,9 +145,9 @@ class TaskSetBase(BaseTask):
 
         verify_length = random.randint(1, max_length_of_verify)
         if is_correct:
-            verify = automaton.get_correct_string(verify_length)
+            verify = automaton.get_correct_string(verify_length, uniform=bool(uniform_verify))
         else:
-            verify = automaton.get_wrong_string(verify_length, 0)
+            verify = automaton.get_wrong_string(verify_length, 0, uniform=bool(uniform_verify))
         return (is_correct, "description: {}; verify: {}.".format(complete_description, verify))
 
     def __init__(self, world=None):
@@ -155,14 +159,18 @@ class TaskSetBase(BaseTask):
         self.not_portion = None
         self.subset_size = None
         self.without_anything = None
+        # verify strings drawn uniformly among the correct (or wrong) ones of their length
+        self.uniform_verify = True
 
     @on_start()
     def give_instructions(self, event):
         if not self.max_length_of_description or not self.max_nr_of_groups or not self.max_length_of_verify or not self.description_type:
             raise AttributeError("Some of the TaskSet attributes are not set!")
 
-        is_correct, task = TaskSetBase.get_task(self.max_length_of_description, self.max_nr_of_groups, self.max_length_of_verify,
-                                                self.description_type, self.not_portion, self.subset_size, self.without_anything)
+        # generated ahead of time if an InstancePregenerator is installed
+        is_correct, task = generate_instance(generate_task_set_instance, self.max_length_of_description,
+                                             self.max_nr_of_groups, self.max_length_of_verify, self.description_type, self.not_portion,
+                                             self.subset_size, self.without_anything, self.uniform_verify)
 
         self.answer = "true" if is_correct else "false"
         self.give_away_message = 'Wrong. The right answer is: {}.'.format(self.answer)
@@ -190,6 +198,14 @@ class TaskSetBase(BaseTask):
         self.set_result(False, self.give_away_message)
 
 
+def generate_task_set_instance(*args):
+    '''
+    TaskSetBase.get_task as a module-level function, which (unlike a static method on Python 2) can be pickled to be
+    run by the workers of an InstancePregenerator.
+    '''
+    return TaskSetBase.get_task(*args)
+
+
 class TaskSet1(TaskSetBase):
 
     def __init__(self, world=None):
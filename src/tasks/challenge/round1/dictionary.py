@@ -0,0 +1,93 @@
+# Copyright (c) 2017-present, GoodAI
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE_CHALLENGE file in the root directory of this source tree.
+
+'''
+Process-wide access to the word lists in res/: each file is read once, indexed by word length and character class,
+and the selections of words without some forbidden substrings are cached.
+'''
+
+import os
+import re
+import string
+import threading
+from collections import defaultdict
+
+from core.cache import LRUCache
+
+RES_DIR = os.path.join(os.path.dirname(__file__), '../../..')
+
+# the sets of characters of the character classes (a word is in a class if all its characters are)
+CHAR_CLASSES = {
+    'lower': frozenset(string.ascii_lowercase),
+    'alpha': frozenset(string.ascii_letters),
+    'word': frozenset(string.ascii_letters + "-'"),
+}
+
+# number of selections (forbidden strings, length, character class) kept per word list
+SELECTION_CACHE_SIZE = 64
+
+
+class WordList(object):
+    '''
+    The words of a word list (in the order of the file), with the words of each length and of each character class
+    precomputed.
+    '''
+
+    def __init__(self, words):
+        self.words = tuple(words)
+        by_length = defaultdict(list)
+        by_class = dict((char_class, []) for char_class in CHAR_CLASSES)
+        for word in self.words:
+            by_length[len(word)].append(word)
+            chars = set(word)
+            for char_class, class_chars in CHAR_CLASSES.items():
+                if chars <= class_chars:
+                    by_class[char_class].append(word)
+        self.by_length = dict((length, tuple(words)) for length, words in by_length.items())
+        self.by_class = dict((char_class, tuple(words)) for char_class, words in by_class.items())
+        # the same, as sets to filter the selections by class
+        self._class_sets = dict((char_class, frozenset(words)) for char_class, words in by_class.items())
+        self._selections = LRUCache(SELECTION_CACHE_SIZE)
+
+    def __len__(self):
+        return len(self.words)
+
+    def select(self, forbidden_strings=(), length=None, char_class=None):
+        '''
+        The words (in the order of the file) containing none of the forbidden strings, of the given length and
+        character class (if any).
+        '''
+        forbidden_strings = frozenset(forbidden_strings)
+        key = (forbidden_strings, length, char_class)
+        words = self._selections.get(key)
+        if words is None:
+            words = self.words
+            if length is not None:
+                words = self.by_length.get(length, ())
+            if char_class is not None:
+                class_words = self._class_sets[char_class]
+                words = tuple(word for word in words if word in class_words)
+            if forbidden_strings:
+                # a single pass of one pattern matching any of the forbidden strings
+                forbidden = re.compile('|'.join(re.escape(s) for s in sorted(forbidden_strings)))
+                words = tuple(word for word in words if not forbidden.search(word))
+            self._selections.put(key, words)
+        return words
+
+
+_word_lists = {}
+_word_lists_lock = threading.Lock()
+
+
+def get_word_list(file_name):
+    '''The WordList of a file relative to the src directory (e.g. res/dict_gsl.txt), read the first time only.'''
+    with _word_lists_lock:
+        word_list = _word_lists.get(file_name)
+        if word_list is None:
+            with open(os.path.join(RES_DIR, file_name)) as f:
+                word_list = WordList(line.strip() for line in f)
+            _word_lists[file_name] = word_list
+        return word_list
@@ -0,0 +1,49 @@
+# Copyright (c) 2017-present, GoodAI
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE_CHALLENGE file in the root directory of this source tree.
+
+import os
+import unittest
+
+from tasks.challenge.round1.dictionary import get_word_list, RES_DIR, WordList
+
+DICTIONARY_FILE = 'res/dict_gsl.txt'
+
+
+def read_words(file_name):
+    with open(os.path.join(RES_DIR, file_name)) as f:
+        return [x.strip() for x in f.readlines()]
+
+
+class TestDictionary(unittest.TestCase):
+
+    def test_loaded_once(self):
+        word_list = get_word_list(DICTIONARY_FILE)
+        self.assertIs(word_list, get_word_list(DICTIONARY_FILE))
+        self.assertEqual(read_words(DICTIONARY_FILE), list(word_list.select()))
+
+    def test_forbidden_strings(self):
+        words = read_words(DICTIONARY_FILE)
+        word_list = get_word_list(DICTIONARY_FILE)
+        for forbidden_strings in (['say', 'and', 'or'], ['a'], ['e', 'old-', 'I'], ['.*']):
+            expected = [x for x in words if not any(map(lambda forbidden: forbidden in x, forbidden_strings))]
+            selection = word_list.select(forbidden_strings)
+            self.assertEqual(expected, list(selection))
+            # the selection is cached
+            self.assertIs(selection, word_list.select(reversed(forbidden_strings)))
+
+    def test_indexes(self):
+        word_list = WordList(['one', 'Two', 'three', 'four-five', "six's", '7', 'eight'])
+        self.assertEqual(('one', 'Two'), word_list.by_length[3])
+        self.assertEqual(('one', 'three', 'eight'), word_list.by_class['lower'])
+        self.assertEqual(('one', 'Two', 'three', 'eight'), word_list.by_class['alpha'])
+        self.assertEqual(('three', 'eight'), word_list.select(length=5, char_class='lower'))
+        self.assertEqual(('eight',), word_list.select(['r'], length=5, char_class='lower'))
+        self.assertEqual((), word_list.select(length=10))
+        self.assertEqual(7, len(word_list))
+
+
+if __name__ == '__main__':
+    unittest.main()
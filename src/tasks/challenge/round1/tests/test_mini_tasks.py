@@ -11,6 +11,8 @@ import core.environment as environment
 import core.serializer as serializer
 import tasks.challenge.round1.challenge_mini as comm_ai_mini
 from core.scheduler import ConsecutiveTaskScheduler
+from core.pregeneration import InstancePregenerator
+from fsa import build_automaton, MiniTasksAutomaton
 from learners.base import BaseLearner
 from tasks.challenge.round1.tests.test_micro_tasks import EnvironmentByteMessenger, FixedLearner
 from tasks.competition.tests.helpers import SingleTaskScheduler
@@ -106,6 +108,65 @@ class TestCommAIMiniTS5(TestCommAIMiniBase):
         self.task_set = comm_ai_mini.TaskSet5
 
 
+class TestUniformVerify(unittest.TestCase):
+
+    def test_uniform_verify(self):
+        for task_set in (comm_ai_mini.TaskSet1, comm_ai_mini.TaskSet2, comm_ai_mini.TaskSet3, comm_ai_mini.TaskSet4):
+            ts = task_set()
+            for _ in range(50):
+                is_correct, task = comm_ai_mini.TaskSetBase.get_task(
+                    ts.max_length_of_description, ts.max_nr_of_groups, ts.max_length_of_verify, ts.description_type,
+                    ts.not_portion, ts.subset_size, ts.without_anything, uniform_verify=True)
+                description, verify = re.match(r'description: (.*); verify: (.*)\.$', task).groups()
+                if description == "anything":
+                    # there is no wrong string to give
+                    continue
+                description = description.replace(' {} '.format(ts.description_type), ' ')
+                automaton = build_automaton(description, ts.description_type)
+                self.assertEqual(is_correct, automaton.is_string_correct(verify))
+
+
+class TestTaskSetsUniformVerify(unittest.TestCase):
+
+    def test_give_instructions(self):
+        sample_strings = MiniTasksAutomaton.sample_strings
+        calls = []
+
+        def counted_sample_strings(automaton, length, correct=True, count=1):
+            calls.append((length, correct))
+            return sample_strings(automaton, length, correct, count)
+        MiniTasksAutomaton.sample_strings = counted_sample_strings
+        try:
+            for task_set in (comm_ai_mini.TaskSet1, comm_ai_mini.TaskSet2, comm_ai_mini.TaskSet3,
+                             comm_ai_mini.TaskSet4, comm_ai_mini.TaskSet5):
+                del calls[:]
+                with commai_messenger(task_set, GridWorld) as m:
+                    m.read()
+                    self.assertTrue(m._env._task_scheduler.task.uniform_verify)
+                    self.assertEqual(1, len(calls))
+                    self.assertEqual(m._env._task_scheduler.task.answer == "true", calls[0][1])
+        finally:
+            MiniTasksAutomaton.sample_strings = sample_strings
+
+
+class TestPregeneration(unittest.TestCase):
+
+    def generate(self, seed):
+        ts = comm_ai_mini.TaskSet4()
+        args = (ts.max_length_of_description, ts.max_nr_of_groups, ts.max_length_of_verify, ts.description_type,
+                ts.not_portion, ts.subset_size, ts.without_anything, ts.uniform_verify)
+        with InstancePregenerator(seed, 4) as pregenerator:
+            return [pregenerator.get(comm_ai_mini.generate_task_set_instance, *args) for _ in range(10)]
+
+    def test_pregenerated_tasks(self):
+        tasks = self.generate(1)
+        self.assertEqual(tasks, self.generate(1))
+        for is_correct, task in tasks:
+            description, verify = re.match(r'description: (.*); verify: (.*)\.$', task).groups()
+            automaton = build_automaton(description.replace(' and ', ' '), 'and')
+            self.assertEqual(is_correct, automaton.is_string_correct(verify))
+
+
 def task_solved_successfuly(task):
     return task._env._last_result
 
@@ -124,12 +124,12 @@ class ConsoleView(BaseView):
         # listen to the updates in these channels
         self._learner_channel.sequence_updated.register(
             self.on_learner_sequence_updated)
-        self._learner_channel.message_updated.register(
-            self.on_learner_message_updated)
+        self._learner_channel.message_appended.register(
+            self.on_learner_message_appended)
         self._env_channel.sequence_updated.register(
             self.on_env_sequence_updated)
-        self._env_channel.message_updated.register(
-            self.on_env_message_updated)
+        self._env_channel.message_appended.register(
+            self.on_env_message_appended)
         if show_world:
             # register a handler to plot the world if show_world is active
             env.world_updated.register(
@@ -158,10 +158,11 @@ class ConsoleView(BaseView):
     def on_learner_token_updated(self, token):
         self._learner_channel.consume(token)
 
-    def on_learner_message_updated(self, message):
-        # we use the fact that messages arrive character by character
-        if self._learner_channel.get_text():
-            self.input_buffer += self._learner_channel.get_text()[-1]
+    def on_learner_message_appended(self, update):
+        # only the new characters matter (the history is kept in our own
+        # buffer, so we ignore the channel being cleared)
+        if update.delta and not update.reset:
+            self.input_buffer += update.delta
             self.input_buffer = self.input_buffer[-self._scroll_msg_length:]
             learner_input = self.channel_to_str(
                 self.input_buffer + ' ',
@@ -176,10 +177,9 @@ class ConsoleView(BaseView):
         self._win.addstr(self._learner_seq_y, 0, learner_input.encode(code).decode(code))
         self._win.refresh()
 
-    def on_env_message_updated(self, message):
-        if self._env_channel.get_text():
-            self.output_buffer += \
-                self._env_channel.get_text()[-1]
+    def on_env_message_appended(self, update):
+        if update.delta and not update.reset:
+            self.output_buffer += update.delta
             self.output_buffer = self.output_buffer[-self._scroll_msg_length:]
             env_output = self.channel_to_str(
                 self.output_buffer,
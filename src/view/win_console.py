@@ -144,12 +144,12 @@ class StdInOutView(WinBaseView):
         # listen to the updates in these channels
         self._learner_channel.sequence_updated.register(
             self.on_learner_sequence_updated)
-        self._learner_channel.message_updated.register(
-            self.on_learner_message_updated)
+        self._learner_channel.message_appended.register(
+            self.on_learner_message_appended)
         self._env_channel.sequence_updated.register(
             self.on_env_sequence_updated)
-        self._env_channel.message_updated.register(
-            self.on_env_message_updated)
+        self._env_channel.message_appended.register(
+            self.on_env_message_appended)
         if show_world:
             # register a handler to plot the world if show_world is active
             env.world_updated.register(
@@ -180,10 +180,11 @@ class StdInOutView(WinBaseView):
     def on_learner_token_updated(self, token):
         self._learner_channel.consume(token)
 
-    def on_learner_message_updated(self, message):
-        # we use the fact that messages arrive character by character
-        if self._learner_channel.get_text():
-            self.input_buffer += self._learner_channel.get_text()[-1]
+    def on_learner_message_appended(self, update):
+        # only the new characters matter (the history is kept in our own
+        # buffer, so we ignore the channel being cleared)
+        if update.delta and not update.reset:
+            self.input_buffer += update.delta
             self.input_buffer = self.input_buffer[-self._scroll_msg_length:]
             self._learner_input = self.channel_to_str(
                 self.input_buffer + ' ',
@@ -199,10 +200,9 @@ class StdInOutView(WinBaseView):
             self.input_buffer + ' ',
             self._learner_channel.get_undeserialized())
 
-    def on_env_message_updated(self, message):
-        if self._env_channel.get_text():
-            self.output_buffer += \
-                self._env_channel.get_text()[-1]
+    def on_env_message_appended(self, update):
+        if update.delta and not update.reset:
+            self.output_buffer += update.delta
             self.output_buffer = self.output_buffer[-self._scroll_msg_length:]
             self._env_output = self.channel_to_str(
                 self.output_buffer,